@@ -0,0 +1,112 @@
+"""
+Сравнение TelethonChatGetterTry и PyrogramChatGetterTry под синтетической нагрузкой.
+Сеть заменена задержкой `latency` на запрос, считаются время и число сетевых запросов.
+
+    python -m bench.bench_getters
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import types
+
+from telethon.tl import types as tl_types
+
+from bench.common import Timer, report
+from tele_bridge.pyro.try_get import PyrogramChatGetterTry
+from tele_bridge.tele.resolver import TelethonEntityResolver
+from tele_bridge.tele.try_get import TelethonChatGetterTry
+
+
+class PyrogramClient:
+    """Пир попадает в storage после первого resolve_peer, как в Pyrogram"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = 0
+        self.storage = self
+        self.peers: dict[int, object] = {}
+
+    async def get_peer_by_id(self, peer_id: int):
+        return self.peers[peer_id]
+
+    async def resolve_peer(self, peer_id: int):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        self.peers[peer_id] = peer = tl_types.InputPeerChannel(peer_id, 1)
+        return peer
+
+
+def telethon_getter(latency: float) -> tuple[TelethonChatGetterTry, list[int]]:
+    resolver = TelethonEntityResolver(None)
+    requests = []
+
+    async def get_channels(input_channels):
+        requests.append(len(input_channels))
+        await asyncio.sleep(latency)
+        return [
+            tl_types.Channel(id=channel.channel_id, title="", photo=tl_types.ChatPhotoEmpty(), date=None)
+            for channel in input_channels
+        ]
+
+    resolver._get_channels = get_channels
+    return TelethonChatGetterTry("chat", 1, resolver), requests
+
+
+def telethon_message(peer_id: int):
+    m = types.SimpleNamespace(
+        chat_id=-1000000000000 - peer_id,
+        sender_id=None,
+        chat=None,
+        input_chat=tl_types.InputPeerChannel(peer_id, 1),
+    )
+    return types.SimpleNamespace(m=m)
+
+
+def pyrogram_message(client: PyrogramClient, peer_id: int):
+    m = types.SimpleNamespace(_client=client, chat=types.SimpleNamespace(id=peer_id), from_user=None, sender_chat=None)
+    return types.SimpleNamespace(m=m)
+
+
+async def run(messages: int, peers: int, concurrency: int, latency: float):
+    rnd = random.Random(0)
+    peer_ids = [rnd.randint(1, peers) for _ in range(messages)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def drive(getter, make_message):
+        async def one(peer_id):
+            async with semaphore:
+                await getter.try_get_chat(make_message(peer_id))
+
+        with Timer() as timer:
+            await asyncio.gather(*(one(peer_id) for peer_id in peer_ids))
+        return timer.elapsed
+
+    telethon, telethon_requests = telethon_getter(latency)
+    telethon_time = await drive(telethon, telethon_message)
+
+    client = PyrogramClient(latency)
+    pyrogram = PyrogramChatGetterTry("chat", 2)
+    pyrogram_time = await drive(pyrogram, lambda peer_id: pyrogram_message(client, peer_id))
+
+    report("chat getters", [
+        ("messages / peers / concurrency / latency", f"{messages} / {peers} / {concurrency} / {latency * 1000:.1f} ms"),
+        ("telethon", f"{telethon_time:.3f}s, {messages / telethon_time:,.0f} msg/s, "
+                     f"{len(telethon_requests)} requests for {sum(telethon_requests)} peers"),
+        ("pyrogram", f"{pyrogram_time:.3f}s, {messages / pyrogram_time:,.0f} msg/s, {client.requests} requests"),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--peers", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.peers, args.concurrency, args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+KeywordMatcher на 10k ключевых слов против перебора слов на каждое сообщение.
+
+    python -m bench.bench_keywords
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import string
+
+from bench.common import Timer, report
+from tele_bridge.keywords import KeywordMatcher
+
+
+def random_word(rnd: random.Random) -> str:
+    return "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 10)))
+
+
+def run(keywords: int, owners: int, messages: int, text_words: int):
+    rnd = random.Random(0)
+    vocabulary = [random_word(rnd) for _ in range(keywords)]
+    sets = {owner: vocabulary[owner::owners] for owner in range(owners)}
+    texts = [
+        " ".join(rnd.choice(vocabulary) if rnd.random() < 0.05 else random_word(rnd) for _ in range(text_words))
+        for _ in range(messages)
+    ]
+
+    matcher = KeywordMatcher()
+    for owner, words in sets.items():
+        matcher.add(owner, words)
+    with Timer() as compile_timer:
+        matcher.compile()
+
+    with Timer() as matcher_timer:
+        matched = [matcher.match(text) for text in texts]
+
+    naive_messages = max(1, messages // 20)
+    with Timer() as naive_timer:
+        naive = [
+            {owner for owner, words in sets.items() if any(word in text.casefold() for word in words)}
+            for text in texts[:naive_messages]
+        ]
+    assert naive == matched[:naive_messages]
+
+    with Timer() as update_timer:
+        for owner in range(100):
+            matcher.add(owners + owner, [random_word(rnd) for _ in range(5)])
+        matcher.match(texts[0])
+
+    matcher_rate = messages / matcher_timer.elapsed
+    naive_rate = naive_messages / naive_timer.elapsed
+    report("keyword matcher", [
+        ("keywords / owners / messages / words per text", f"{keywords} / {owners} / {messages} / {text_words}"),
+        ("compile", f"{compile_timer.elapsed * 1000:.1f} ms"),
+        ("automaton", f"{matcher_rate:,.0f} msg/s ({matcher_timer.elapsed / messages * 1e6:.1f} us/msg)"),
+        ("naive loop", f"{naive_rate:,.0f} msg/s ({naive_timer.elapsed / naive_messages * 1e6:.1f} us/msg)"),
+        ("speedup", f"{matcher_rate / naive_rate:.1f}x"),
+        ("100 owners added + recompile", f"{update_timer.elapsed * 1000:.1f} ms"),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keywords", type=int, default=10_000)
+    parser.add_argument("--owners", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=5_000)
+    parser.add_argument("--text-words", type=int, default=40)
+    args = parser.parse_args()
+    run(args.keywords, args.owners, args.messages, args.text_words)
+
+
+if __name__ == "__main__":
+    main()
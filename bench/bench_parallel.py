@@ -0,0 +1,98 @@
+"""
+Пропускная способность ParallelDownloader против локального фейкового DC.
+Каждое соединение отвечает на getFile с задержкой `latency` и ограничено полосой `bandwidth`,
+как одно MTProto-соединение к DC; сравнивается одно соединение с несколькими.
+
+    python -m bench.bench_parallel
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import types
+
+from telethon.tl import types as tl_types
+
+from bench.common import Timer, report
+from tele_bridge.tele.parallel import PART_SIZE, ParallelDownloader
+
+
+class FakeSender:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+
+    def is_connected(self):
+        return True
+
+    async def disconnect(self):
+        pass
+
+
+class FakeDC:
+    """Отдаёт части файла, соединение передаёт одну часть за раз"""
+
+    def __init__(self, file_size: int, latency: float, bandwidth: float):
+        self.data = bytes(file_size)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.session = types.SimpleNamespace(dc_id=2)
+        self.requests = 0
+
+    async def _call(self, sender: FakeSender, request):
+        self.requests += 1
+        chunk = self.data[request.offset:request.offset + request.limit]
+        await asyncio.sleep(self.latency)
+        async with sender.lock:
+            await asyncio.sleep(len(chunk) / self.bandwidth)
+        return tl_types.upload.File(type=tl_types.storage.FilePartial(), mtime=0, bytes=chunk)
+
+
+def make_document(size: int) -> tl_types.Document:
+    return tl_types.Document(
+        id=1, access_hash=2, file_reference=b"", date=None, mime_type="application/octet-stream",
+        size=size, dc_id=2, attributes=[],
+    )
+
+
+async def measure(connections: int, file_size: int, latency: float, bandwidth: float) -> tuple[float, int]:
+    dc = FakeDC(file_size, latency, bandwidth)
+    downloader = ParallelDownloader(dc, connections)
+    downloader._senders[2] = [FakeSender() for _ in range(connections)]
+    received = 0
+    with Timer() as timer:
+        async for chunk in downloader.iter_download(make_document(file_size)):
+            received += len(chunk)
+    assert received == file_size
+    return timer.elapsed, dc.requests
+
+
+def run(file_mb: int, latency: float, bandwidth_mb: float, connections: list[int]):
+    file_size = file_mb * 1024 * 1024
+    bandwidth = bandwidth_mb * 1024 * 1024
+    rows = [
+        ("file / part / latency / bandwidth per connection",
+         f"{file_mb} MB / {PART_SIZE // 1024} KB / {latency * 1000:.0f} ms / {bandwidth_mb} MB/s"),
+    ]
+    baseline = None
+    for count in connections:
+        elapsed, requests = asyncio.run(measure(count, file_size, latency, bandwidth))
+        baseline = baseline or elapsed
+        rows.append((
+            f"{count} connection(s)",
+            f"{file_mb / elapsed:.1f} MB/s, {elapsed:.2f} s, {requests} requests, {baseline / elapsed:.1f}x",
+        ))
+    report("parallel download", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file-mb", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--bandwidth-mb", type=float, default=8)
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    run(args.file_mb, args.latency, args.bandwidth_mb, args.connections)
+
+
+if __name__ == "__main__":
+    main()
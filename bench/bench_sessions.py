@@ -0,0 +1,101 @@
+"""
+Конвертация 100k строк сессий Pyrogram в Telethon: iter_convert против прежнего пути
+(struct по MemoryStorage, DataCenter на каждую строку, StringSession из Telethon).
+
+    python -m bench.bench_sessions
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import ipaddress
+import random
+import struct
+
+from pyrogram.session.internals import DataCenter
+from pyrogram.storage import MemoryStorage
+from telethon.crypto import AuthKey
+from telethon.sessions import StringSession
+
+from bench.common import Timer, report
+from tele_bridge.sessions.converter import PYROGRAM_FORMATS, ConvertedSession, SessionFormat, iter_convert
+
+
+def make_strings(count: int, invalid_share: float) -> list[str]:
+    rnd = random.Random(0)
+    layouts = [(session_format, layout) for session_format, layout in PYROGRAM_FORMATS.values()]
+    strings = []
+    for _ in range(count):
+        session_format, layout = rnd.choice(layouts)
+        auth_key = rnd.randbytes(256)
+        if session_format is SessionFormat.PYROGRAM:
+            packed = layout.pack(rnd.randint(1, 5), 777, False, auth_key, rnd.randint(1, 2 ** 40), False)
+        else:
+            packed = layout.pack(rnd.randint(1, 5), False, auth_key, rnd.randint(1, 2 ** 31), False)
+        session_string = base64.urlsafe_b64encode(packed).decode().rstrip("=")
+        if rnd.random() < invalid_share:
+            session_string = session_string[:-3]
+        strings.append(session_string)
+    return strings
+
+
+def legacy_convert(session_string: str) -> str:
+    """Путь до iter_convert: TeleBridgeSession.from_pyrogram_string + to_telethon_string"""
+    if len(session_string) in [MemoryStorage.SESSION_STRING_SIZE, MemoryStorage.SESSION_STRING_SIZE_64]:
+        dc_id, test_mode, auth_key, user_id, is_bot = struct.unpack(
+            (MemoryStorage.OLD_SESSION_STRING_FORMAT
+             if len(session_string) == MemoryStorage.SESSION_STRING_SIZE else
+             MemoryStorage.OLD_SESSION_STRING_FORMAT_64),
+            base64.urlsafe_b64decode(session_string + "=" * (-len(session_string) % 4))
+        )
+    else:
+        dc_id, api_id, test_mode, auth_key, user_id, is_bot = struct.unpack(
+            MemoryStorage.SESSION_STRING_FORMAT,
+            base64.urlsafe_b64decode(session_string + "=" * (-len(session_string) % 4))
+        )
+    server_address, port = DataCenter(dc_id, False, False, False)
+
+    session = StringSession()
+    session._dc_id = dc_id
+    session._port = port
+    session._auth_key = AuthKey(auth_key)
+    session._server_address = ipaddress.ip_address(server_address).compressed
+    return session.save()
+
+
+def run(count: int, invalid_share: float):
+    strings = make_strings(count, invalid_share)
+
+    with Timer() as legacy_timer:
+        legacy = []
+        for session_string in strings:
+            try:
+                legacy.append(legacy_convert(session_string))
+            except (ValueError, struct.error):
+                legacy.append(None)
+
+    with Timer() as new_timer:
+        converted = [
+            result.output if isinstance(result, ConvertedSession) else None
+            for result in iter_convert(strings, to="telethon")
+        ]
+    assert converted == legacy
+
+    report("session conversion", [
+        ("sessions / invalid", f"{count} / {converted.count(None)}"),
+        ("legacy per-session path", f"{legacy_timer.elapsed:.2f} s ({count / legacy_timer.elapsed:,.0f} sessions/s)"),
+        ("iter_convert", f"{new_timer.elapsed:.2f} s ({count / new_timer.elapsed:,.0f} sessions/s)"),
+        ("speedup", f"{legacy_timer.elapsed / new_timer.elapsed:.1f}x"),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--invalid-share", type=float, default=0.01)
+    args = parser.parse_args()
+    run(args.count, args.invalid_share)
+
+
+if __name__ == "__main__":
+    main()
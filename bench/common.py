@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import pathlib
+import time
+import typing
+
+OUTPUT = pathlib.Path(__file__).resolve().parent.parent / "bench_output.txt"
+
+
+def report(name: str, rows: typing.Iterable[tuple[str, typing.Any]]):
+    """Печатает результаты и дописывает их в bench_output.txt в корне репозитория"""
+    lines = [f"## {name} ({time.strftime('%Y-%m-%d %H:%M:%S')})"]
+    lines += [f"{label}: {value}" for label, value in rows]
+    text = "\n".join(lines) + "\n\n"
+    print(text, end="")
+    with open(OUTPUT, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+class Timer:
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
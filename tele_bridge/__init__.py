@@ -1,3 +1,4 @@
+from .albums import MediaGroupAggregator
 from .base import BaseDispatcher
 from .bases.client import BaseClient
 from .bases.client_object import ClientObject
@@ -6,12 +7,26 @@ from .bases.message import MessageObject
 from .bases.proxy import Proxy, ProxyDict, ProxyType
 from .bases.try_get import ChatGetterTry
 from .dispatcher import Dispatcher
-from .methods import Methods, CachedMethods
+from .media_cache import MediaCache
+from .intake import IntakeOpts, IntakeStats, MessageIntake, OverflowPolicy
+from .cache import CacheStats, MethodCache
+from .observer import Observable, Observer, ObserverStats
+from .keywords import KeywordMatcher
+from .routing import ObserverFilter, RoutingIndex
+from .methods import Methods, CachedMethods, CacheOpts, DialogsCheckpoint
+from .pool import DispatcherPool, DispatcherState, PoolOpts
+from .record import MessageRecord
+from .recent import RecentMessages
+from .sharding import ShardedRunner, ShardOpts
 from .pyro.client import PyrogramClient
 from .pyro.client_object import PyrogramClientInterface
 from .pyro.message import PyrogramMessageObject
 from .pyro.try_get import PyrogramChatGetterTry
 from .sessions.tele_bridge_session import TeleBridgeSession
+from .sessions.converter import ConvertedSession, SessionError, SessionFormat
+from .sessions.dc_cache import DCAddressCache, DCEndpoint
+from .sessions.index import DuplicateSessionError, SessionIndex
+from .sessions.vault import SessionVault, SessionVaultError
 from .tele.client import TelethonClient
 from .tele.client_object import TelethonClientInterface
 from .tele.message import TelethonMessageObject
@@ -23,6 +38,12 @@ __all__ = (
     "ClientOpts",
     "BaseDispatcher",
     "Dispatcher",
+    "MediaGroupAggregator",
+    "MediaCache",
+    "IntakeOpts",
+    "IntakeStats",
+    "MessageIntake",
+    "OverflowPolicy",
     "ClientObject",
     "MessageObject",
     "Proxy",
@@ -30,6 +51,23 @@ __all__ = (
     "ProxyType",
     "ChatGetterTry",
     "CachedMethods",
+    "CacheOpts",
+    "DialogsCheckpoint",
+    "Observable",
+    "Observer",
+    "ObserverStats",
+    "ObserverFilter",
+    "RoutingIndex",
+    "KeywordMatcher",
+    "CacheStats",
+    "MethodCache",
+    "DispatcherPool",
+    "DispatcherState",
+    "PoolOpts",
+    "ShardedRunner",
+    "ShardOpts",
+    "MessageRecord",
+    "RecentMessages",
     "PyrogramClient",
     "PyrogramClientInterface",
     "PyrogramMessageObject",
@@ -39,4 +77,13 @@ __all__ = (
     "TelethonMessageObject",
     "TelethonChatGetterTry",
     "TeleBridgeSession",
+    "SessionVault",
+    "SessionIndex",
+    "DCAddressCache",
+    "DCEndpoint",
+    "DuplicateSessionError",
+    "SessionFormat",
+    "ConvertedSession",
+    "SessionError",
+    "SessionVaultError",
 )
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import asyncio
+import typing
+
+from cachetools import TTLCache
+from loguru import logger
+
+from .bases.message import MessageObject
+
+AlbumHandler: typing.TypeAlias = typing.Callable[[list[MessageObject]], typing.Awaitable[typing.Any]]
+
+# В одном альбоме не больше 10 элементов
+MAX_ALBUM_SIZE = 10
+
+
+class MediaGroupAggregator:
+    """
+    Собирает сообщения одного media group за окно `window` секунд и отдаёт их
+    обработчику одним списком. Уже отданные группы помнятся `seen_ttl` секунд,
+    опоздавшие части отбрасываются.
+    """
+
+    def __init__(
+            self,
+            handler: AlbumHandler,
+            window: float = 1.0,
+            seen_ttl: int = 60 * 10,
+            seen_maxsize: int = 10_000,
+            name: typing.Any = None,
+    ):
+        self.handler = handler
+        self.window = window
+        self.name = name
+        self.seen: TTLCache[typing.Hashable, bool] = TTLCache(maxsize=seen_maxsize, ttl=seen_ttl)
+        self._buffers: dict[typing.Hashable, list[MessageObject]] = {}
+        self._tasks: dict[typing.Hashable, asyncio.Task] = {}
+
+    def add(self, message: MessageObject) -> bool:
+        """True - сообщение принадлежит альбому и забрано агрегатором"""
+        media_group_id = message.get_media_group_id()
+        if not media_group_id:
+            return False
+        if media_group_id in self.seen:
+            logger.debug(f"[{self.name}] Media group ID {media_group_id} is already processed")
+            return True
+
+        buffer = self._buffers.setdefault(media_group_id, [])
+        buffer.append(message)
+        if len(buffer) >= MAX_ALBUM_SIZE:
+            self._schedule(media_group_id, 0)
+        elif media_group_id not in self._tasks:
+            self._schedule(media_group_id, self.window)
+        return True
+
+    def _schedule(self, media_group_id: typing.Hashable, delay: float):
+        if task := self._tasks.get(media_group_id):
+            task.cancel()
+        self._tasks[media_group_id] = asyncio.create_task(self._emit_later(media_group_id, delay))
+
+    async def _emit_later(self, media_group_id: typing.Hashable, delay: float):
+        if delay:
+            await asyncio.sleep(delay)
+        self._tasks.pop(media_group_id, None)
+        await self._emit(media_group_id)
+
+    async def _emit(self, media_group_id: typing.Hashable):
+        messages = self._buffers.pop(media_group_id, None)
+        if not messages:
+            return
+        self.seen[media_group_id] = True
+        messages.sort(key=lambda m: m.get_message_id())
+        try:
+            await self.handler(messages)
+        except Exception as e:
+            logger.exception(f"[{self.name}] Album handler failed for media group {media_group_id}: {e}")
+
+    async def flush(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        for media_group_id in list(self._buffers):
+            await self._emit(media_group_id)
+
+    async def stop(self, flush: bool = False):
+        if flush:
+            await self.flush()
+            return
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._buffers.clear()
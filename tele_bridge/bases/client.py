@@ -9,6 +9,10 @@ class BaseClient(SetAttribute):
 
         # Если инициализация не была проведена, выполняем её
         self._attribute_cache = {}
+        # Исходная сессия, по ней пул находит один auth key под разными аккаунтами
+        self.session_bridge = opts.session_bridge
+        # Прокси аккаунта, DC без прокси не проверяется
+        self.proxy_url = opts.proxy
         self._set_attr_timeout = opts.set_attr_timeout
         self.phone_number_error = opts.phone_number_error
         self.phone_code_error = opts.phone_code_error
@@ -1,20 +1,82 @@
 from __future__ import annotations
 
 import abc
+import asyncio
+import os
+import tempfile
+import typing
 from typing import Type
 
 from aiogram import types as aiogram_types
+from cachetools import LRUCache
+from loguru import logger
 
 from tele_bridge.bases.message import MessageObject
 from tele_bridge.bases.try_get import ChatGetterTry
+from tele_bridge.media_cache import MediaCache
+from tele_bridge.recent import RecentMessages
+
+
+# Лимит размера файла для загрузки через бота
+MAX_MEDIA_SIZE = 50 * 1024 * 1024
+# Кратно 4096 и не больше 512 КБ - максимальный размер одной части в upload.getFile
+STREAM_CHUNK_SIZE = 512 * 1024
 
 
 class ClientObject(abc.ABC):
+    # Сколько файлов аккаунт скачивает одновременно
+    max_concurrent_downloads: int = 4
+    max_media_size: int = MAX_MEDIA_SIZE
+    # None - системная временная папка
+    spool_dir: str | None = None
+    # Сколько сообщений из цепочек ответов и пересылок помнить
+    resolved_maxsize: int = 2048
 
-    def __init__(self, client):
+    def __init__(self, client, media_cache: MediaCache | None = None):
         self.client = client
+        self.entity_resolver = None
+        # Общий для нескольких аккаунтов кэш медиа, None - без кэша
+        self.media_cache = media_cache
+        # Заполняется диспетчером из входящих обновлений
+        self.recent_messages = RecentMessages()
+        # None - сообщение удалено
+        self.resolved_messages: LRUCache[tuple[int, int], MessageObject | None] = LRUCache(self.resolved_maxsize)
+        self.download_semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
         super().__init__()
 
+    async def close(self):
+        """Освобождает ресурсы клиента, вызывается при остановке диспетчера"""
+        pass
+
+    def is_too_big(self, size: int | None, message_id: typing.Any = None) -> bool:
+        if size and size > self.max_media_size:
+            logger.warning(f"[MSG ID {message_id}]: File size is too big: {size}")
+            return True
+        return False
+
+    def make_spool_path(self, filename: str | None) -> str:
+        suffix = os.path.splitext(filename or "")[1]
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix="tele_bridge_", dir=self.spool_dir)
+        os.close(fd)
+        return path
+
+    @staticmethod
+    def remove_spooled(medias: list[aiogram_types.InputMedia]):
+        """Удаляет временные файлы, созданные get_media_group(..., spool=True)"""
+        for media in medias:
+            if isinstance(media.media, aiogram_types.FSInputFile):
+                try:
+                    os.remove(media.media.path)
+                except FileNotFoundError:
+                    pass
+
+    async def _gather_downloads(self, coros: typing.Iterable[typing.Awaitable]) -> list:
+        async def limited(coro):
+            async with self.download_semaphore:
+                return await coro
+
+        return list(await asyncio.gather(*(limited(coro) for coro in coros)))
+
     @property
     @abc.abstractmethod
     def message_class(self) -> Type[MessageObject]:
@@ -37,8 +99,104 @@ class ClientObject(abc.ABC):
     ):
         pass
 
+    async def get_messages(self, chat_id: int, message_ids: list[int]) -> list[MessageObject | None]:
+        """
+        Сообщения по id в том же порядке: из recent_messages и resolved_messages, промахи - одним запросом.
+        Запрошенные сообщения кэшируются в resolved_messages, recent_messages пополняет только диспетчер.
+        """
+        found: dict[int, MessageObject | None] = {}
+        missing = []
+        for message_id in dict.fromkeys(message_ids):
+            key = (chat_id, message_id)
+            if (message := self.recent_messages.get(chat_id, message_id)) is not None:
+                found[message_id] = message
+            elif key in self.resolved_messages:
+                found[message_id] = self.resolved_messages[key]
+            else:
+                missing.append(message_id)
+        if missing:
+            for message_id, message in zip(missing, await self._fetch_messages(chat_id, missing)):
+                found[message_id] = self.resolved_messages[(chat_id, message_id)] = message
+        return [found[message_id] for message_id in message_ids]
+
+    @abc.abstractmethod
+    async def _fetch_messages(self, chat_id: int, message_ids: list[int]) -> list[MessageObject | None]:
+        """Запрос сообщений у Telegram, None на месте удалённых"""
+        pass
+
+    async def get_reply_to_message(self, message: MessageObject) -> MessageObject | None:
+        reply_to_message_id = message.get_reply_to_message_id()
+        if not reply_to_message_id:
+            return None
+        reply_to, = await self.get_messages(message.get_chat_id(), [reply_to_message_id])
+        return reply_to
+
+    async def _resolve_messages(
+            self,
+            keys: typing.Iterable[tuple[int, int]],
+    ) -> dict[tuple[int, int], MessageObject | None]:
+        """Сообщения по (chat_id, message_id): из resolved_messages, остальные - по запросу на чат"""
+        resolved: dict[tuple[int, int], MessageObject | None] = {}
+        missing: dict[int, list[int]] = {}
+        for key in dict.fromkeys(keys):
+            if key in self.resolved_messages:
+                resolved[key] = self.resolved_messages[key]
+            else:
+                missing.setdefault(key[0], []).append(key[1])
+
+        async def fetch(chat_id: int, message_ids: list[int]):
+            try:
+                messages = await self.get_messages(chat_id, message_ids)
+            except Exception as e:
+                # Ошибка не кэшируется, при следующем обращении запрос повторится
+                logger.warning(f"Failed to get messages {message_ids} from chat {chat_id}: {e}")
+                return
+            for message_id, message in zip(message_ids, messages):
+                resolved[(chat_id, message_id)] = message
+
+        await asyncio.gather(*(fetch(chat_id, message_ids) for chat_id, message_ids in missing.items()))
+        return resolved
+
+    async def get_reply_chains(
+            self,
+            messages: typing.Sequence[MessageObject],
+            depth: int = 5,
+    ) -> list[list[MessageObject]]:
+        """
+        Для каждого сообщения - цепочка сообщений, на которые оно отвечает, от ближайшего
+        к самому раннему, не длиннее depth. Каждый уровень всех цепочек - один запрос на чат.
+        """
+        chains: list[list[MessageObject]] = [[] for _ in messages]
+        current = list(enumerate(messages))
+        for _ in range(depth):
+            wanted = {
+                index: (message.get_chat_id(), reply_to_message_id)
+                for index, message in current
+                if (reply_to_message_id := message.get_reply_to_message_id())
+            }
+            if not wanted:
+                break
+            resolved = await self._resolve_messages(wanted.values())
+            current = []
+            for index, key in wanted.items():
+                if (reply_to := resolved.get(key)) is not None:
+                    chains[index].append(reply_to)
+                    current.append((index, reply_to))
+        return chains
+
+    async def get_reply_chain(self, message: MessageObject, depth: int = 5) -> list[MessageObject]:
+        chain, = await self.get_reply_chains([message], depth)
+        return chain
+
+    async def get_forward_origins(self, messages: typing.Sequence[MessageObject]) -> list[MessageObject | None]:
+        """Исходные сообщения пересылок из каналов, None - не переслано или недоступно"""
+        origins = [message.get_forward_origin() for message in messages]
+        resolved = await self._resolve_messages(origin for origin in origins if origin)
+        return [resolved.get(origin) if origin else None for origin in origins]
+
     @abc.abstractmethod
-    async def get_media_group(self, message: MessageObject) -> list[aiogram_types.InputMedia]:
+    async def get_media_group(self, message: MessageObject, spool: bool = False) -> list[aiogram_types.InputMedia]:
+        """spool=True - файлы пишутся во временную папку вместо памяти, см. remove_spooled"""
         pass
 
     @abc.abstractmethod
@@ -48,6 +206,35 @@ class ClientObject(abc.ABC):
     async def download_media_from_msg(self, msg: MessageObject) -> bytes:
         pass
 
+    async def _cached_download(
+            self,
+            msg: MessageObject,
+            download_to: typing.Callable[[str], typing.Awaitable[typing.Any]],
+    ) -> bytes | None:
+        """None - кэш выключен или у медиа нет стабильного идентификатора"""
+        if self.media_cache is None:
+            return None
+        key = msg.get_media_unique_id()
+        if not key:
+            return None
+        return await self.media_cache.get_or_download(key, download_to)
+
+    @abc.abstractmethod
+    def stream_media(self, msg: MessageObject, chunk_size: int = STREAM_CHUNK_SIZE) -> typing.AsyncIterator[bytes]:
+        """Медиа сообщения по частям chunk_size байт (последняя может быть меньше), без загрузки в память целиком"""
+        pass
+
+    @staticmethod
+    async def _rechunk(chunks: typing.AsyncIterable[bytes], chunk_size: int) -> typing.AsyncIterator[bytes]:
+        buffer = bytearray()
+        async for chunk in chunks:
+            buffer += chunk
+            while len(buffer) >= chunk_size:
+                yield bytes(buffer[:chunk_size])
+                del buffer[:chunk_size]
+        if buffer:
+            yield bytes(buffer)
+
     @abc.abstractmethod
     async def get_media_group_messages(self, message: MessageObject) -> list[MessageObject]:
         pass
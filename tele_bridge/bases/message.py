@@ -1,17 +1,65 @@
 from __future__ import annotations
 
 import abc
+import functools
+import typing
 
 from aiogram import types as aiogram_types
 from pyrogram import enums as pyro_enums
 from pyrogram import types as pyro_types
 
 
+def memoized(method):
+    """Запоминает результат метода без аргументов на время жизни MessageObject"""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self):
+        memo = self._memo
+        try:
+            return memo[name]
+        except KeyError:
+            value = memo[name] = method(self)
+            return value
+
+    return wrapper
+
+
 class MessageObject(abc.ABC):
+    __slots__ = ("m", "_memo")
+
+    # Методы без аргументов, значения которых попадают в snapshot() без префикса "get_"
+    SNAPSHOT_METHODS: typing.ClassVar[tuple[str, ...]] = (
+        "get_text",
+        "get_html_text",
+        "have_from_user",
+        "get_first_name",
+        "get_last_name",
+        "get_chat_id",
+        "get_chat_username",
+        "get_user_username",
+        "get_user_id",
+        "get_message_id",
+        "get_reply_to_message_id",
+        "get_message_link",
+        "has_media",
+        "get_media_group_id",
+        "get_media_file_size",
+        "get_media_file_id",
+        "get_media_type",
+        "get_file_name",
+    )
 
     def __init__(self, message):
+        self.m = message
+        self._memo: dict[str, typing.Any] = {}
         super().__init__()
 
+    @memoized
+    def snapshot(self) -> dict[str, typing.Any]:
+        """Все нормализованные поля сообщения за один проход"""
+        return {name.removeprefix("get_"): getattr(self, name)() for name in self.SNAPSHOT_METHODS}
+
     @abc.abstractmethod
     def get_text(self) -> str | None:
         pass
@@ -56,6 +104,11 @@ class MessageObject(abc.ABC):
     def get_reply_to_message_id(self):
         pass
 
+    @abc.abstractmethod
+    def get_forward_origin(self) -> tuple[int, int] | None:
+        """(chat_id, message_id) исходного сообщения, если оно переслано из канала"""
+        pass
+
     @abc.abstractmethod
     def get_message_link(self):
         pass
@@ -88,6 +141,11 @@ class MessageObject(abc.ABC):
     def get_file_name(self) -> str | None:
         pass
 
+    @abc.abstractmethod
+    def get_media_unique_id(self) -> str | None:
+        """Идентификатор файла, не меняющийся между сообщениями, ключ для MediaCache"""
+        pass
+
     @abc.abstractmethod
     def get_reply_markup(self) -> aiogram_types.InlineKeyboardButton | None:
         pass
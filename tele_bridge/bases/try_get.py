@@ -3,20 +3,45 @@ from __future__ import annotations
 import abc
 import typing
 
+from cachetools import TTLCache
+from loguru import logger
+
 from tele_bridge.bases.message import MessageObject
 
+GET_CHAT_ERRORS_BLOCKED_DISPATCHERS = TTLCache(maxsize=1000, ttl=60 * 3)
+
 
 class ChatGetterTry(abc.ABC):
 
     def __init__(
             self,
             get_type: typing.Literal["chat", "sender"],
-            account_id: int
+            account_id: int,
+            resolver: typing.Any = None,
     ):
         self.account_id = account_id
         self.get_type = get_type
+        # Общий для "chat" и "sender" резолвер аккаунта, см. ClientObject.entity_resolver
+        self.resolver = resolver
+        self.get_chat_errors = TTLCache(maxsize=5000, ttl=60 * 5)
+        self.get_input_chat_errors = TTLCache(maxsize=5000, ttl=60 * 3)
+        self.global_error_count = 0
         super().__init__()
 
+    def clear_cache(self):
+        self.get_chat_errors.clear()
+        self.get_input_chat_errors.clear()
+        self.global_error_count = 0
+
+    def is_blocked(self) -> bool:
+        return bool(GET_CHAT_ERRORS_BLOCKED_DISPATCHERS.get(self.account_id))
+
+    def _check_errors(self):
+        if self.global_error_count > 50:
+            logger.warning(f"{self.account_id}. Too many errors. Self blocked get chat for 3 minutes")
+            GET_CHAT_ERRORS_BLOCKED_DISPATCHERS[self.account_id] = True
+            self.global_error_count = 0
+
     @abc.abstractmethod
     async def try_get_chat(self, message: MessageObject):
         pass
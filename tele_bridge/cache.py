@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+import typing
+from dataclasses import dataclass
+
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+from loguru import logger
+
+Loader: typing.TypeAlias = typing.Callable[[], typing.Awaitable[typing.Any]]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale_hits: int = 0
+    evictions: int = 0
+    refreshes: int = 0
+
+
+class _StatsTTLCache(TTLCache):
+
+    def __init__(self, maxsize: int, ttl: float, stats: CacheStats):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.stats = stats
+
+    def popitem(self):
+        # Вызывается только при вытеснении по размеру, истечение TTL идёт мимо
+        self.stats.evictions += 1
+        return super().popitem()
+
+
+class MethodCache:
+    """
+    TTL кэш с защитой от одновременных промахов: на один ключ выполняется
+    не более одного запроса. При stale_ttl > 0 устаревшее значение отдаётся
+    сразу, а обновление идёт в фоне.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float = 0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = CacheStats()
+        self.cache = _StatsTTLCache(maxsize, ttl + stale_ttl, self.stats)
+        # Держит ссылки на загрузки, в том числе фоновые, пока они не завершатся
+        self._inflight: dict[typing.Hashable, asyncio.Future] = {}
+
+    def __len__(self):
+        return len(self.cache)
+
+    def clear(self):
+        self.cache.clear()
+
+    def invalidate(self, key: typing.Hashable):
+        self.cache.pop(key, None)
+
+    async def get_or_load(self, key: typing.Hashable, loader: Loader):
+        entry = self.cache.get(key)
+        if entry is not None:
+            value, fresh_until = entry
+            if time.monotonic() < fresh_until:
+                self.stats.hits += 1
+                return value
+            self.stats.stale_hits += 1
+            if key not in self._inflight:
+                self.stats.refreshes += 1
+                self._start_load(key, loader).add_done_callback(functools.partial(self._refreshed, key))
+            return value
+
+        self.stats.misses += 1
+        return await asyncio.shield(self._start_load(key, loader))
+
+    def _start_load(self, key: typing.Hashable, loader: Loader) -> asyncio.Future:
+        future = self._inflight.get(key)
+        if future is None:
+            # Загрузка в отдельной задаче: отмена одного вызывающего не отменяет остальных
+            future = asyncio.ensure_future(self._run_loader(key, loader))
+            self._inflight[key] = future
+            future.add_done_callback(functools.partial(self._loaded, key))
+        return future
+
+    async def _run_loader(self, key: typing.Hashable, loader: Loader):
+        value = await loader()
+        self.cache[key] = (value, time.monotonic() + self.ttl)
+        return value
+
+    def _loaded(self, key: typing.Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Все ожидающие могли быть отменены, помечаем исключение полученным
+        if not future.cancelled():
+            future.exception()
+
+    @staticmethod
+    def _refreshed(key: typing.Hashable, future: asyncio.Future):
+        if not future.cancelled() and (e := future.exception()) is not None:
+            logger.warning(f"Cache refresh of {key} failed: {e}")
+
+
+def cached_method(cache: str, name: str):
+    """Кэширует результат метода в MethodCache из атрибута `cache` экземпляра"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            method_cache: MethodCache = getattr(self, cache)
+            return await method_cache.get_or_load(
+                hashkey(name, *args, **kwargs),
+                lambda: func(self, *args, **kwargs),
+            )
+
+        return wrapper
+
+    return decorator
@@ -8,10 +8,12 @@ from loguru import logger
 from telethon import TelegramClient
 from telethon.custom import Message
 
+from .albums import MediaGroupAggregator
 from .base import BaseDispatcher
 from .bases.account import AccountProtocol
 from .bases.client_object import ClientObject
 from .bases.message import MessageObject
+from .intake import IntakeOpts, MessageIntake
 from .methods import CachedMethods
 from .observer import Observable
 
@@ -36,22 +38,20 @@ class Dispatcher(BaseDispatcher, Observable, CachedMethods):
             self,
             account: AccountProtocol,
             client_object: ClientObject,
+            intake_opts: IntakeOpts | None = None,
+            album_window: float = 1.0,
+            concurrent: bool = False,
+            observer_timeout: float | None = None,
     ):
+        """concurrent и observer_timeout - режим рассылки наблюдателям, см. Observable"""
         super().__init__(client_object.client)
+        Observable.__init__(self, concurrent=concurrent, timeout=observer_timeout)
         self.account = account
         self.client_object = client_object
-        self.chat_getter = client_object.chat_getter_try("chat", account.id)
-        self.sender_getter = client_object.chat_getter_try("sender", account.id)
-        self.processing_media_group_ids = set()
-
-    def need_skip_media(self, msg_object: MessageObject) -> bool:
-        media_group_id = msg_object.get_media_group_id()
-        if media_group_id:
-            if media_group_id in self.processing_media_group_ids:
-                logger.debug(f"Media group ID {media_group_id} is already being processed")
-                return True
-            self.processing_media_group_ids.add(media_group_id)
-        return False
+        self.chat_getter = client_object.chat_getter_try("chat", account.id, client_object.entity_resolver)
+        self.sender_getter = client_object.chat_getter_try("sender", account.id, client_object.entity_resolver)
+        self.intake = MessageIntake(self.process_message, intake_opts, account.id)
+        self.albums = MediaGroupAggregator(self.album_handler, album_window, name=account.id)
 
     async def message_handler(self, client: TelegramClient, _message: Message):
         msg_object = self.client_object.message_class(_message)
@@ -59,29 +59,55 @@ class Dispatcher(BaseDispatcher, Observable, CachedMethods):
         msg_id = msg_object.get_message_id()
         chat_id = msg_object.get_chat_id()
 
-        # if self.need_skip_media(msg_object):
-        #     return
-
         logger.debug(f"Received message: {msg_id} from chat: {chat_id}")
+        self.client_object.recent_messages.add(msg_object)
+        await self.intake.put(msg_object)
+
+    async def process_message(self, msg_object: MessageObject, album: list[MessageObject] | None = None):
+        if album is not None:
+            await self.dispatch(msg_object, album=album)
+            return
         await self.chat_getter.try_get_chat(msg_object)
         await self.sender_getter.try_get_chat(msg_object)
+        if self.albums.add(msg_object):
+            return
+        await self.dispatch(msg_object)
+
+    async def album_handler(self, messages: list[MessageObject]):
+        """
+        Альбом уходит наблюдателям одним событием: сообщение с подписью и album=все части.
+        Рассылается через воркер чата, поэтому не пересекается с другими сообщениями чата,
+        но приходит после сообщений, полученных за время окна сборки.
+        """
+        head = next((m for m in messages if m.get_text()), messages[0])
+        self.client_object.recent_messages.seal_group(head.get_chat_id(), head.get_media_group_id())
+        await self.intake.put(head, album=messages)
 
     async def start(self):
         self.add_handler(self.message_handler)
+        self.intake.start()
         await super().start()
         await self.client.send_message("me", "Dispatcher started")
         # await self.log_all_chats()  # Log all chats at start
 
+    async def stop(self):
+        await super().stop()
+        await self.intake.stop()
+        await self.albums.stop()
+        await self.client_object.close()
+
     async def restart(self):
         try:
             try:
                 await self.client.stop()
             except Exception as e:
                 logger.warning(f"[{self.account.id}] Dispatcher stop failed: {e}")
+            await self.client_object.close()
             if not await self.client.has_handlers():
                 logger.info(f"[{self.account.id}] Dispatcher has no handlers")
                 self.client.add_message_handler(self.message_handler)
             await asyncio.sleep(1)
+            self.intake.start()
             await self.client.start()
             logger.success(f"[{self.account.id}] Dispatcher restarted")
         except Exception as e:
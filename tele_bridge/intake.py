@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import time
+import typing
+from collections import deque
+from dataclasses import dataclass
+
+from loguru import logger
+
+from .bases.message import MessageObject
+
+# Для альбома вызывается как handler(head, album=[все части])
+MessageHandler: typing.TypeAlias = typing.Callable[..., typing.Awaitable[typing.Any]]
+Album: typing.TypeAlias = list[MessageObject] | None
+
+
+class OverflowPolicy(str, enum.Enum):
+    # Выбросить самое старое сообщение из очереди воркера
+    DROP_OLDEST = "drop_oldest"
+    # Ждать свободного места (давление передаётся в обработчик обновлений клиента)
+    BLOCK = "block"
+    # Переложить во вспомогательный буфер, который дочитывается по мере освобождения очереди
+    SPILL = "spill"
+
+
+@dataclass
+class IntakeOpts:
+    workers: int = 4
+    # Размер очереди одного воркера
+    maxsize: int = 500
+    # По умолчанию без потерь, DROP_OLDEST/SPILL включаются явно
+    overflow: OverflowPolicy = OverflowPolicy.BLOCK
+    spill_maxsize: int = 10_000
+    # seconds, 0 - не логировать
+    report_interval: float = 60
+
+
+@dataclass
+class IntakeStats:
+    received: int = 0
+    processed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    spilled: int = 0
+    depth: int = 0
+    # seconds, время от постановки в очередь до начала обработки
+    last_lag: float = 0
+    max_lag: float = 0
+
+
+class MessageIntake:
+    """Ограниченная очередь входящих сообщений с сохранением порядка внутри чата"""
+
+    def __init__(self, handler: MessageHandler, opts: IntakeOpts | None = None, name: typing.Any = None):
+        self.handler = handler
+        self.opts = opts or IntakeOpts()
+        self.name = name
+        self._stats = IntakeStats()
+        self._queues: list[asyncio.Queue[tuple[float, MessageObject, Album]]] = [
+            asyncio.Queue(maxsize=self.opts.maxsize) for _ in range(self.opts.workers)
+        ]
+        self._spills: list[deque[tuple[float, MessageObject, Album]]] = [deque() for _ in range(self.opts.workers)]
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self._queues) + sum(len(spill) for spill in self._spills)
+
+    @property
+    def stats(self) -> IntakeStats:
+        self._stats.depth = self.depth
+        return self._stats
+
+    def _worker_index(self, message: MessageObject) -> int:
+        return hash(message.get_chat_id()) % self.opts.workers
+
+    async def put(self, message: MessageObject, album: list[MessageObject] | None = None):
+        """album - собранный альбом, обрабатывается тем же воркером, что и остальные сообщения чата"""
+        self._stats.received += 1
+        index = self._worker_index(message)
+        q = self._queues[index]
+        spill = self._spills[index]
+        item = (time.monotonic(), message, album)
+
+        if self.opts.overflow == OverflowPolicy.BLOCK:
+            await q.put(item)
+            return
+
+        if self.opts.overflow == OverflowPolicy.SPILL and (spill or q.full()):
+            if len(spill) >= self.opts.spill_maxsize:
+                spill.popleft()
+                self._stats.dropped += 1
+            spill.append(item)
+            self._stats.spilled += 1
+            return
+
+        if q.full():
+            q.get_nowait()
+            q.task_done()
+            self._stats.dropped += 1
+        q.put_nowait(item)
+
+    def _refill(self, index: int):
+        q = self._queues[index]
+        spill = self._spills[index]
+        while spill and not q.full():
+            q.put_nowait(spill.popleft())
+
+    async def _worker(self, index: int):
+        q = self._queues[index]
+        while True:
+            enqueued_at, message, album = await q.get()
+            self._refill(index)
+            lag = time.monotonic() - enqueued_at
+            self._stats.last_lag = lag
+            self._stats.max_lag = max(self._stats.max_lag, lag)
+            try:
+                if album is None:
+                    await self.handler(message)
+                else:
+                    await self.handler(message, album=album)
+                self._stats.processed += 1
+            except asyncio.CancelledError:
+                # Отменили сам воркер - выходим, иначе это отмена внутри обработчика
+                if asyncio.current_task().cancelling():
+                    raise
+                self._stats.failed += 1
+                logger.warning(f"[{self.name}] Message handler was cancelled")
+            except Exception as e:
+                self._stats.failed += 1
+                logger.exception(f"[{self.name}] Message handler failed: {e}")
+            finally:
+                q.task_done()
+
+    async def _reporter(self):
+        while True:
+            await asyncio.sleep(self.opts.report_interval)
+            stats = self.stats
+            logger.info(
+                f"[{self.name}] Intake depth {stats.depth}, lag {stats.last_lag:.3f}s (max {stats.max_lag:.3f}s), "
+                f"processed {stats.processed}, dropped {stats.dropped}, spilled {stats.spilled}"
+            )
+            self._stats.max_lag = 0
+
+    def start(self):
+        if self.running:
+            return
+        self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.opts.workers)]
+        if self.opts.report_interval:
+            self._tasks.append(asyncio.create_task(self._reporter()))
+
+    async def join(self):
+        for index, q in enumerate(self._queues):
+            while self._spills[index] or not q.empty():
+                await q.join()
+                self._refill(index)
+
+    async def stop(self, drain: bool = False):
+        if drain and self.running:
+            await self.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import typing
+from collections import deque
+
+K = typing.TypeVar("K", bound=typing.Hashable)
+
+
+class _Automaton:
+    """Автомат Ахо-Корасик над строками после casefold"""
+
+    def __init__(self, keywords: typing.Iterable[str]):
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        # Ключевые слова, заканчивающиеся в состоянии, с учётом суффиксных ссылок
+        self.output: list[tuple[str, ...]] = [()]
+
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                state = next_state
+            self.output[state] += (keyword,)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                fail = self.goto[fail].get(char, 0)
+                self.fail[next_state] = fail
+                self.output[next_state] += self.output[fail]
+
+    def search(self, text: str) -> set[str]:
+        goto, fail, output = self.goto, self.fail, self.output
+        found: set[str] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class KeywordMatcher(typing.Generic[K]):
+    """
+    Все наборы ключевых слов собираются в один автомат, текст проходится один раз.
+    Автомат пересобирается лениво при следующем match(), и только если появились
+    новые слова; удалённые слова просто перестают иметь владельцев.
+    """
+
+    def __init__(self):
+        self.keywords: dict[K, frozenset[str]] = {}
+        self.owners: dict[str, set[K]] = {}
+        self._automaton: _Automaton | None = None
+        self._compiled: set[str] = set()
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def add(self, owner: K, keywords: typing.Iterable[str]):
+        self.remove(owner)
+        keywords = frozenset(keyword.casefold() for keyword in keywords if keyword)
+        self.keywords[owner] = keywords
+        for keyword in keywords:
+            self.owners.setdefault(keyword, set()).add(owner)
+            if keyword not in self._compiled:
+                self._automaton = None
+
+    def remove(self, owner: K):
+        for keyword in self.keywords.pop(owner, ()):
+            owners = self.owners.get(keyword)
+            if owners is None:
+                continue
+            owners.discard(owner)
+            if not owners:
+                del self.owners[keyword]
+        # Не даём автомату бесконечно копить удалённые слова
+        if self._automaton is not None and len(self._compiled) > 2 * len(self.owners) + 1000:
+            self._automaton = None
+
+    def compile(self):
+        self._compiled = set(self.owners)
+        self._automaton = _Automaton(self._compiled)
+
+    def match(self, text: str | None) -> set[K]:
+        if not text or not self.owners:
+            return set()
+        if self._automaton is None:
+            self.compile()
+        matched: set[K] = set()
+        for keyword in self._automaton.search(text.casefold()):
+            matched.update(self.owners.get(keyword, ()))
+        return matched
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import mmap
+import os
+import typing
+from collections import OrderedDict
+from pathlib import Path
+
+from loguru import logger
+
+# Получает путь, по которому нужно сохранить файл
+Downloader: typing.TypeAlias = typing.Callable[[str], typing.Awaitable[typing.Any]]
+
+_PART_SUFFIX = ".part"
+
+
+class MediaCache:
+    """
+    Дисковый кэш медиа по стабильному идентификатору файла (см. MessageObject.get_media_unique_id).
+    Вытеснение LRU по суммарному размеру, чтение через mmap, одновременные загрузки
+    одного файла объединяются в одну.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = 2 * 1024 ** 3):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._load_index()
+
+    def __contains__(self, key: str) -> bool:
+        return self._name(key) in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _load_index(self):
+        files = []
+        for path in self.directory.iterdir():
+            if not path.is_file():
+                continue
+            if path.name.endswith(_PART_SUFFIX):
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            files.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._index[name] = size
+            self.total_bytes += size
+        self._evict()
+
+    def _touch(self, name: str):
+        self._index.move_to_end(name)
+        try:
+            os.utime(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self._index) > 1:
+            name, size = self._index.popitem(last=False)
+            self.total_bytes -= size
+            self._path(name).unlink(missing_ok=True)
+
+    def open(self, key: str) -> mmap.mmap | None:
+        """Отображение файла в память, закрывает вызывающий. Пустой файл - None"""
+        name = self._name(key)
+        if name not in self._index:
+            return None
+        self._touch(name)
+        if not self._index[name]:
+            return None
+        with open(self._path(name), "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, key: str) -> bytes | None:
+        name = self._name(key)
+        if name not in self._index:
+            return None
+        mapped = self.open(key)
+        if mapped is None:
+            return b""
+        with mapped:
+            return mapped[:]
+
+    def remove(self, key: str):
+        name = self._name(key)
+        size = self._index.pop(name, None)
+        if size is not None:
+            self.total_bytes -= size
+            self._path(name).unlink(missing_ok=True)
+
+    async def get_or_download(self, key: str, download: Downloader) -> bytes:
+        data = self.read(key)
+        if data is not None:
+            self.hits += 1
+            return data
+
+        future = self._inflight.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.ensure_future(self._download(key, download))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Файл может быть уже вытеснен другой загрузкой, поэтому данные берутся из результата
+        return await asyncio.shield(future)
+
+    async def _download(self, key: str, download: Downloader) -> bytes:
+        name = self._name(key)
+        part_path = self._path(name + _PART_SUFFIX)
+        try:
+            result = await download(str(part_path))
+            # Загрузчик может сохранить файл не по переданному пути
+            if isinstance(result, str) and result != str(part_path):
+                os.replace(result, part_path)
+            os.replace(part_path, self._path(name))
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+
+        data = self._path(name).read_bytes()
+        self.total_bytes += len(data) - self._index.pop(name, 0)
+        self._index[name] = len(data)
+        self._evict()
+        logger.debug(f"Media {key} cached, {len(data)} bytes")
+        return data
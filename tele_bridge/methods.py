@@ -1,27 +1,80 @@
+import datetime
 import typing
-from functools import partial
+from dataclasses import dataclass
 
-from asyncache import cachedmethod
-from cachetools import TTLCache
-from cachetools.keys import hashkey
 from loguru import logger
 from pyrogram import types
 
 from . import dispatcher
+from .cache import CacheStats, MethodCache, cached_method
 
 ChatID: typing.TypeAlias = int | str
 
 
+@dataclass
+class DialogsCheckpoint:
+    # Дата самого нового верхнего сообщения на момент последней синхронизации
+    offset_date: datetime.datetime | None = None
+
+
+def _dialog_date(dialog) -> datetime.datetime | None:
+    # pyrogram: Dialog.top_message, telethon: Dialog.message
+    top_message = getattr(dialog, "top_message", None) or getattr(dialog, "message", None)
+    return top_message.date if top_message else None
+
+
+def _dialog_pinned(dialog) -> bool:
+    return bool(getattr(dialog, "is_pinned", None) or getattr(dialog, "pinned", None))
+
+
 class Methods:
 
+    async def iter_dialogs(self: 'dispatcher.Dispatcher', limit=0) -> typing.AsyncIterator[types.Dialog]:
+        """Отдаёт диалоги по мере загрузки страниц, не собирая их в список"""
+        if hasattr(self.client, "iter_dialogs"):
+            dialogs = self.client.iter_dialogs(limit or None)
+        else:
+            dialogs = self.client.get_dialogs(limit)
+        async for dialog in dialogs:
+            yield dialog
+
+    async def iter_changed_dialogs(
+            self: 'dispatcher.Dispatcher',
+            checkpoint: DialogsCheckpoint | None = None,
+    ) -> typing.AsyncIterator[types.Dialog]:
+        """
+        Отдаёт только диалоги с новыми сообщениями после checkpoint.offset_date.
+        Диалоги приходят по убыванию даты, поэтому обход останавливается на первом
+        незакреплённом неизменённом диалоге. Checkpoint сдвигается, только если обход
+        дошёл до конца.
+        """
+        if checkpoint is None:
+            checkpoint = self.__dict__.setdefault("dialogs_checkpoint", DialogsCheckpoint())
+        since = checkpoint.offset_date
+        newest = since
+
+        async for dialog in self.iter_dialogs():
+            date = _dialog_date(dialog)
+            if since is not None and (date is None or date <= since):
+                if _dialog_pinned(dialog):
+                    continue
+                break
+            if date is not None and (newest is None or date > newest):
+                newest = date
+            yield dialog
+
+        checkpoint.offset_date = newest
+
     async def get_dialogs(self: 'dispatcher.Dispatcher', limit=0) -> list[types.Dialog]:
         logger.success("Get dialogs")
         dialogs: list[types.Dialog] = []
-        async for dialog in self.client.get_dialogs(limit):
+        async for dialog in self.iter_dialogs(limit):
             dialogs.append(dialog)
         return dialogs
 
     async def get_message(self: 'dispatcher.Dispatcher', chat_id: ChatID, message_id: int) -> types.Message:
+        if isinstance(chat_id, int) and (recent := self.client_object.recent_messages.get(chat_id, message_id)):
+            return recent.m
         logger.success("Get message")
         return await self.client.get_messages(chat_id, message_id)
 
@@ -30,22 +83,60 @@ class Methods:
         return await self.client.get_chat(chat_id)
 
 
+@dataclass
+class CacheOpts:
+    # seconds
+    long_ttl: int = 60 * 60 * 24
+    long_maxsize: int = 1024
+    medium_ttl: int = 60 * 60
+    medium_maxsize: int = 1024
+    short_ttl: int = 60
+    short_maxsize: int = 128
+    # seconds, сколько после short_ttl диалоги ещё отдаются из кэша, пока идёт фоновое обновление
+    dialogs_stale_ttl: int = 60 * 5
+
+
 class CachedMethods(Methods):
-    long_cache = TTLCache(maxsize=128, ttl=60 * 60 * 24)
-    medium_cache = TTLCache(maxsize=128, ttl=60 * 60)
-    short_cache = TTLCache(maxsize=128, ttl=60)
+    """Кэши создаются на экземпляр, поэтому у каждого аккаунта они свои"""
+    cache_opts: CacheOpts = CacheOpts()
+
+    def _get_method_cache(self, name: str, maxsize: int, ttl: int, stale_ttl: int = 0) -> MethodCache:
+        caches: dict[str, MethodCache] = self.__dict__.setdefault("_method_caches", {})
+        if name not in caches:
+            caches[name] = MethodCache(maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl)
+        return caches[name]
+
+    @property
+    def long_cache(self) -> MethodCache:
+        return self._get_method_cache("long", self.cache_opts.long_maxsize, self.cache_opts.long_ttl)
+
+    @property
+    def medium_cache(self) -> MethodCache:
+        return self._get_method_cache("medium", self.cache_opts.medium_maxsize, self.cache_opts.medium_ttl)
+
+    @property
+    def short_cache(self) -> MethodCache:
+        return self._get_method_cache(
+            "short",
+            self.cache_opts.short_maxsize,
+            self.cache_opts.short_ttl,
+            self.cache_opts.dialogs_stale_ttl,
+        )
+
+    def cache_stats(self) -> dict[str, CacheStats]:
+        return {name: cache.stats for name, cache in self.__dict__.get("_method_caches", {}).items()}
 
-    @cachedmethod(lambda self: self.short_cache, key=partial(hashkey, 'dialog'))
+    @cached_method("short_cache", "dialog")
     async def get_dialogs(self: 'dispatcher.Dispatcher', limit=0) -> list[types.Dialog]:
         logger.debug("No cached dialogs")
         return await super().get_dialogs(limit)
 
-    @cachedmethod(lambda self: self.medium_cache, key=partial(hashkey, 'message'))
+    @cached_method("medium_cache", "message")
     async def get_message(self: 'dispatcher.Dispatcher', chat_id: ChatID, message_id: int) -> types.Message:
         logger.debug("No cached message")
         return await super().get_message(chat_id, message_id)
 
-    @cachedmethod(lambda self: self.long_cache, key=partial(hashkey, 'chat'))
+    @cached_method("long_cache", "chat")
     async def get_chat(self: 'dispatcher.Dispatcher', chat_id: ChatID) -> types.Chat:
         logger.debug("No cached chat")
         return await super().get_chat(chat_id)
@@ -1,11 +1,25 @@
 from __future__ import annotations
 
 import abc
+import asyncio
+import bisect
+import itertools
+import time
+import typing
 from abc import ABC
+from dataclasses import dataclass, field
 from typing import Generic, TypeVar
 
+from loguru import logger
+
+from .bases.message import MessageObject
+from .routing import ObserverFilter, RoutingIndex
+
 T = TypeVar('T', bound='Observer')
 
+# seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
 
 class Observer(ABC):
     @abc.abstractmethod
@@ -16,18 +30,127 @@ class Observer(ABC):
         return await self.trigger(*args, **kwargs)
 
 
+@dataclass
+class ObserverStats:
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    total_time: float = 0
+    # Последний элемент - всё, что дольше LATENCY_BUCKETS[-1]
+    histogram: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def observe(self, latency: float):
+        self.calls += 1
+        self.total_time += latency
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+
+@dataclass
+class _Registration:
+    order: int
+    priority: int = 0
+    timeout: float | None = None
+    stats: ObserverStats = field(default_factory=ObserverStats)
+
+    @property
+    def sort_key(self) -> tuple[int, int]:
+        return -self.priority, self.order
+
+
 class Observable(Generic[T]):
-    def __init__(self):
-        self.observers: list[T] = []
+    """
+    concurrent=False - наблюдатели вызываются по очереди, исключение прерывает рассылку.
+    concurrent=True - наблюдатели одного приоритета вызываются одновременно, группы
+    приоритетов идут по убыванию; ошибки и таймауты одного не влияют на остальных.
+    dispatch(message) вызывает только наблюдателей, чей ObserverFilter подходит к сообщению.
+    """
 
-    def register(self, observer: T) -> None:
+    def __init__(self, concurrent: bool = False, timeout: float | None = None):
+        # dict как упорядоченное множество
+        self.observers: dict[T, _Registration] = {}
+        self.concurrent = concurrent
+        self.observer_timeout = timeout
+        self.routing: RoutingIndex[T] = RoutingIndex()
+        self._tiers: list[list[T]] | None = None
+        self._order = itertools.count()
+
+    def register(
+            self,
+            observer: T,
+            priority: int = 0,
+            timeout: float | None = None,
+            observer_filter: ObserverFilter | None = None,
+    ) -> None:
         if observer not in self.observers:
-            self.observers.append(observer)
+            self.observers[observer] = _Registration(
+                order=next(self._order),
+                priority=priority,
+                timeout=timeout,
+            )
+            self.routing.add(observer, observer_filter)
+            self._tiers = None
 
     def unregister(self, observer: T) -> None:
-        if observer in self.observers:
-            self.observers.remove(observer)
+        if self.observers.pop(observer, None) is not None:
+            self.routing.remove(observer)
+            self._tiers = None
+
+    def observer_stats(self) -> dict[T, ObserverStats]:
+        return {observer: registration.stats for observer, registration in self.observers.items()}
+
+    def _split_tiers(self, observers: typing.Iterable[T]) -> list[list[T]]:
+        ordered = sorted(observers, key=lambda observer: self.observers[observer].sort_key)
+        return [
+            list(group)
+            for _, group in itertools.groupby(ordered, key=lambda observer: self.observers[observer].priority)
+        ]
+
+    def _get_tiers(self) -> list[list[T]]:
+        if self._tiers is None:
+            self._tiers = self._split_tiers(self.observers)
+        return self._tiers
+
+    async def _notify(self, observer: T, *args, **kwargs):
+        registration = self.observers.get(observer)
+        if registration is None:
+            return
+        timeout = registration.timeout or self.observer_timeout
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(timeout):
+                await observer.trigger(*args, **kwargs)
+        except TimeoutError:
+            registration.stats.timeouts += 1
+            if not self.concurrent:
+                raise
+            logger.warning(f"Observer {observer!r} timed out after {timeout}s")
+        except Exception as e:
+            registration.stats.errors += 1
+            if not self.concurrent:
+                raise
+            logger.exception(f"Observer {observer!r} failed: {e}")
+        finally:
+            registration.stats.observe(time.monotonic() - started)
 
     async def trigger(self, *args, **kwargs) -> None:
-        for observer in self.observers:
-            await observer.trigger(*args, **kwargs)
+        await self._run(self._get_tiers(), *args, **kwargs)
+
+    async def dispatch(self, message: MessageObject, *args, **kwargs) -> None:
+        matched = self.routing.match(message)
+        if matched:
+            await self._run(self._split_tiers(matched), message, *args, **kwargs)
+
+    async def _run(self, tiers: list[list[T]], *args, **kwargs) -> None:
+        if not self.concurrent:
+            for tier in tiers:
+                for observer in tier:
+                    await self._notify(observer, *args, **kwargs)
+            return
+
+        for tier in tiers:
+            if len(tier) == 1:
+                await self._notify(tier[0], *args, **kwargs)
+                continue
+            async with asyncio.TaskGroup() as tg:
+                for observer in tier:
+                    tg.create_task(self._notify(observer, *args, **kwargs))
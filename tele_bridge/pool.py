@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import random
+import typing
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from loguru import logger
+
+from .sessions.dc_cache import DCAddressCache
+from .sessions.index import DuplicateSessionError, SessionIndex
+
+if typing.TYPE_CHECKING:
+    from .dispatcher import Dispatcher
+
+
+class DispatcherState(str, enum.Enum):
+    NEW = "new"
+    STARTING = "starting"
+    RUNNING = "running"
+    RESTARTING = "restarting"
+    STOPPING = "stopping"
+    STOPPED = "stopped"
+    FAILED = "failed"
+
+
+@dataclass
+class PoolOpts:
+    # Сколько диспетчеров запускается/останавливается одновременно
+    max_parallel: int = 20
+    # seconds, случайная задержка перед стартом каждого аккаунта
+    stagger: float = 0.5
+
+    restart_attempts: int = 5
+    # seconds
+    restart_backoff: float = 2
+    restart_backoff_max: float = 60
+
+    # Перед start_all проверить доступность и задержку DC аккаунтов без прокси.
+    # Только проверка: соединения закрываются, клиенты подключаются сами
+    warm_up: bool = False
+    # seconds
+    warm_up_timeout: float = 5
+
+
+class DispatcherPool(Mapping[int, "Dispatcher"]):
+    """
+    Реестр диспетчеров аккаунтов с ограниченным параллельным запуском.
+    Два аккаунта с одним auth key в пул не попадают: add() бросает DuplicateSessionError.
+    """
+
+    def __init__(self, opts: PoolOpts | None = None, dc_cache: DCAddressCache | None = None):
+        self.opts = opts or PoolOpts()
+        self.dc_cache = dc_cache if dc_cache is not None else DCAddressCache()
+        self.dispatchers: dict[int, Dispatcher] = {}
+        self.states: dict[int, DispatcherState] = {}
+        self.errors: dict[int, BaseException] = {}
+        self._semaphore = asyncio.Semaphore(self.opts.max_parallel)
+        self._restart_tasks: dict[int, asyncio.Task] = {}
+        self.sessions = SessionIndex()
+
+    def __getitem__(self, account_id: int) -> Dispatcher:
+        return self.dispatchers[account_id]
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self.dispatchers)
+
+    def __len__(self) -> int:
+        return len(self.dispatchers)
+
+    def get_state(self, account_id: int) -> DispatcherState | None:
+        return self.states.get(account_id)
+
+    def by_state(self, state: DispatcherState) -> list[int]:
+        return [account_id for account_id, s in self.states.items() if s == state]
+
+    async def add(self, dispatcher: Dispatcher, start: bool = True) -> Dispatcher:
+        """Добавляет диспетчер, останавливая прежний диспетчер этого аккаунта"""
+        account_id = dispatcher.account.id
+        session = getattr(dispatcher.client, "session_bridge", None)
+        if session is not None and (owner := self.sessions.find(session)) not in (None, account_id):
+            logger.error(f"[{account_id}] Refused: auth key is already used by account {owner}")
+            raise DuplicateSessionError(account_id, owner)
+
+        old_dispatcher = self.dispatchers.get(account_id)
+        if old_dispatcher is not None and old_dispatcher is not dispatcher:
+            await self.stop(account_id)
+
+        self.dispatchers[account_id] = dispatcher
+        self.sessions.remove(account_id)
+        if session is not None:
+            self.sessions.add(account_id, session)
+        self.states[account_id] = DispatcherState.NEW
+        self.errors.pop(account_id, None)
+        if start:
+            await self.start(account_id)
+        return dispatcher
+
+    async def remove(self, account_id: int) -> Dispatcher | None:
+        if account_id not in self.dispatchers:
+            return None
+        await self.stop(account_id)
+        self.states.pop(account_id, None)
+        self.errors.pop(account_id, None)
+        self.sessions.remove(account_id)
+        return self.dispatchers.pop(account_id)
+
+    async def start(self, account_id: int, stagger: bool = False) -> DispatcherState:
+        dispatcher = self.dispatchers[account_id]
+        # Задержка до семафора, иначе она занимает слоты max_parallel
+        if stagger and self.opts.stagger:
+            await asyncio.sleep(random.uniform(0, self.opts.stagger))
+        async with self._semaphore:
+            self.states[account_id] = DispatcherState.STARTING
+            self.dc_cache.apply(account_id, dispatcher.client)
+            try:
+                await dispatcher.start()
+            except Exception as e:
+                logger.warning(f"[{account_id}] Dispatcher start failed: {e}")
+                self._set_failed(account_id, e)
+                self._forget_endpoint(account_id)
+                self._schedule_restart(account_id)
+            else:
+                self.states[account_id] = DispatcherState.RUNNING
+                self.errors.pop(account_id, None)
+                self._record_endpoint(account_id)
+        return self.states[account_id]
+
+    async def stop(self, account_id: int) -> DispatcherState:
+        self._cancel_restart(account_id)
+        dispatcher = self.dispatchers[account_id]
+        async with self._semaphore:
+            self.states[account_id] = DispatcherState.STOPPING
+            try:
+                await dispatcher.stop()
+            except Exception as e:
+                logger.warning(f"[{account_id}] Dispatcher stop failed: {e}")
+                self._set_failed(account_id, e)
+            else:
+                self.states[account_id] = DispatcherState.STOPPED
+            finally:
+                # Отмена во время остановки не оставляет диспетчер в STOPPING
+                if self.states[account_id] == DispatcherState.STOPPING:
+                    self.states[account_id] = DispatcherState.STOPPED
+        return self.states[account_id]
+
+    async def restart(self, account_id: int) -> DispatcherState:
+        """Перезапуск через Dispatcher.restart с экспоненциальной задержкой между попытками"""
+        dispatcher = self.dispatchers[account_id]
+        for attempt in range(1, self.opts.restart_attempts + 1):
+            self.states[account_id] = DispatcherState.RESTARTING
+            try:
+                async with self._semaphore:
+                    self.dc_cache.apply(account_id, dispatcher.client)
+                    await dispatcher.restart()
+            except Exception as e:
+                self._set_failed(account_id, e)
+                self._forget_endpoint(account_id)
+                if attempt == self.opts.restart_attempts:
+                    break
+                delay = min(self.opts.restart_backoff * 2 ** (attempt - 1), self.opts.restart_backoff_max)
+                delay = random.uniform(delay / 2, delay)
+                logger.warning(
+                    f"[{account_id}] Restart attempt {attempt}/{self.opts.restart_attempts} failed. "
+                    f"Retry in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.states[account_id] = DispatcherState.RUNNING
+                self.errors.pop(account_id, None)
+                self._record_endpoint(account_id)
+                return self.states[account_id]
+
+        logger.error(f"[{account_id}] Dispatcher gave up after {self.opts.restart_attempts} restart attempts")
+        return self.states[account_id]
+
+    async def start_all(self, account_ids: typing.Iterable[int] | None = None) -> dict[int, DispatcherState]:
+        account_ids = list(self.dispatchers if account_ids is None else account_ids)
+        logger.info(f"Starting {len(account_ids)} dispatchers, max parallel {self.opts.max_parallel}")
+        if self.opts.warm_up:
+            await self.warm_up(account_ids)
+        await asyncio.gather(*(self.start(account_id, stagger=True) for account_id in account_ids))
+        self.dc_cache.save()
+        return {account_id: self.states[account_id] for account_id in account_ids}
+
+    async def warm_up(self, account_ids: typing.Iterable[int] | None = None):
+        """Задержка TCP до DC аккаунтов в dc_cache, аккаунты с прокси пропускаются"""
+        account_ids = self.dispatchers if account_ids is None else account_ids
+        sessions = {}
+        for account_id in account_ids:
+            client = self.dispatchers[account_id].client
+            session = getattr(client, "session_bridge", None)
+            if session is not None and not getattr(client, "proxy_url", None):
+                sessions[account_id] = session
+        if sessions:
+            await self.dc_cache.warm_up(sessions, self.opts.warm_up_timeout)
+
+    def _record_endpoint(self, account_id: int):
+        """Адрес, к которому клиент реально подключился, с учётом миграции DC"""
+        client = self.dispatchers[account_id].client
+        # Telethon хранит текущий DC в сессии, у Pyrogram берётся адрес исходной сессии
+        session = getattr(client, "session", None)
+        if all(hasattr(session, attr) for attr in ("dc_id", "server_address", "port")):
+            self.dc_cache.record(account_id, session.dc_id, session.server_address, session.port)
+        elif (session_bridge := getattr(client, "session_bridge", None)) is not None:
+            self.dc_cache.record(account_id, session_bridge.dc_id, session_bridge.ip, session_bridge.port)
+
+    def _forget_endpoint(self, account_id: int):
+        # Сохранённый адрес мог устареть, следующая попытка подключается по адресу из сессии
+        if self.dc_cache.get(account_id) is not None:
+            logger.debug(f"[{account_id}] Cached DC address dropped after failed connect")
+            self.dc_cache.forget(account_id)
+
+    async def stop_all(self, account_ids: typing.Iterable[int] | None = None) -> dict[int, DispatcherState]:
+        account_ids = list(self.dispatchers if account_ids is None else account_ids)
+        await asyncio.gather(*(self.stop(account_id) for account_id in account_ids))
+        return {account_id: self.states[account_id] for account_id in account_ids}
+
+    async def restart_failed(self) -> dict[int, DispatcherState]:
+        account_ids = self.by_state(DispatcherState.FAILED)
+        await asyncio.gather(*(self.restart(account_id) for account_id in account_ids))
+        return {account_id: self.states[account_id] for account_id in account_ids}
+
+    async def close(self):
+        await self.stop_all()
+
+    def _set_failed(self, account_id: int, error: BaseException):
+        self.states[account_id] = DispatcherState.FAILED
+        self.errors[account_id] = error
+
+    def _schedule_restart(self, account_id: int):
+        if not self.opts.restart_attempts or account_id in self._restart_tasks:
+            return
+        task = asyncio.create_task(self.restart(account_id))
+        self._restart_tasks[account_id] = task
+        task.add_done_callback(lambda _: self._restart_tasks.pop(account_id, None))
+
+    def _cancel_restart(self, account_id: int):
+        task = self._restart_tasks.pop(account_id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
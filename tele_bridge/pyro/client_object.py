@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import os
+import typing
 from typing import Type
 
 from aiogram import types as aiogram_types
-from aiogram.types import BufferedInputFile
+from aiogram.types import BufferedInputFile, FSInputFile
 from loguru import logger
 from pyrogram import enums as pyro_enums
+from pyrogram.types import Message as PyrogramMessage
 
 from tele_bridge import PyrogramClient
-from tele_bridge.bases.client_object import ClientObject
+from tele_bridge.bases.client_object import ClientObject, STREAM_CHUNK_SIZE
+from tele_bridge.media_cache import MediaCache
 from tele_bridge.pyro.message import PyrogramMessageObject
 from tele_bridge.pyro.try_get import PyrogramChatGetterTry
 
@@ -18,38 +22,54 @@ class PyrogramClientInterface(ClientObject):
     chat_getter_try: Type[PyrogramChatGetterTry] = PyrogramChatGetterTry
     client: PyrogramClient
 
-    def __init__(self, client: PyrogramClient):
-        super().__init__(client)
+    def __init__(self, client: PyrogramClient, media_cache: MediaCache | None = None):
+        super().__init__(client, media_cache)
 
-    async def get_media_group(self, message: PyrogramMessageObject) -> list[aiogram_types.InputMedia]:
-        text = None
-        chat_id = message.get_chat_id()
-        message_id = message.get_message_id()
+    async def _download_input_media(
+            self,
+            _message: PyrogramMessage,
+            spool: bool,
+            text: str | None = None,
+    ) -> aiogram_types.InputMedia | None:
+        media_attr = getattr(_message, _message.media.value)
+        if spool:
+            file_name = getattr(media_attr, "file_name", None)
+            path = await self.client.download_media(media_attr.file_id, file_name=self.make_spool_path(file_name))
+            buffer = FSInputFile(path, filename=file_name or os.path.basename(path))
+        else:
+            media = await self.client.download_media(media_attr.file_id, in_memory=True)
+            media.seek(0)
+            buffer = BufferedInputFile(file=media.read(), filename=media.name)
 
-        messages = await self.client.get_media_group(chat_id, message_id=message_id)
+        if _message.media == pyro_enums.MessageMediaType.PHOTO:
+            return aiogram_types.InputMediaPhoto(media=buffer, caption=text)
+        elif _message.media in (pyro_enums.MessageMediaType.VIDEO, pyro_enums.MessageMediaType.VIDEO_NOTE):
+            return aiogram_types.InputMediaVideo(media=buffer, caption=text)
+        elif _message.media == pyro_enums.MessageMediaType.AUDIO:
+            return aiogram_types.InputMediaAudio(media=buffer, caption=text)
+        elif _message.media == pyro_enums.MessageMediaType.VOICE:
+            return aiogram_types.InputMediaAudio(media=buffer, caption=text)
+        elif _message.media == pyro_enums.MessageMediaType.DOCUMENT:
+            return aiogram_types.InputMediaDocument(media=buffer, caption=text)
+        return None
 
-        medias = []
-        for _message in messages:
-            media_attr = getattr(_message, _message.media.value)
-            if hasattr(media_attr, "file_size") and media_attr.file_size:
-                if media_attr.file_size > 50 * 1024 * 1024:
-                    logger.warning(f"File size is too big: {media_attr.file_size}")
-                    continue
+    async def get_media_group(
+            self,
+            message: PyrogramMessageObject,
+            spool: bool = False,
+    ) -> list[aiogram_types.InputMedia]:
+        message_id = message.get_message_id()
 
-            media = await self.client.download_media(media_attr.file_id, in_memory=True)
-            media.seek(0)
-            buffer = BufferedInputFile(file=media.read(),
-                                       filename=media.name)
-            if _message.media == pyro_enums.MessageMediaType.PHOTO:
-                medias.append(aiogram_types.InputMediaPhoto(media=buffer, caption=text))
-            elif _message.media in (pyro_enums.MessageMediaType.VIDEO, pyro_enums.MessageMediaType.VIDEO_NOTE):
-                medias.append(aiogram_types.InputMediaVideo(media=buffer, caption=text))
-            elif _message.media == pyro_enums.MessageMediaType.AUDIO:
-                medias.append(aiogram_types.InputMediaAudio(media=buffer, caption=text))
-            elif _message.media == pyro_enums.MessageMediaType.VOICE:
-                medias.append(aiogram_types.InputMediaAudio(media=buffer, caption=text))
-            elif _message.media == pyro_enums.MessageMediaType.DOCUMENT:
-                medias.append(aiogram_types.InputMediaDocument(media=buffer, caption=text))
+        messages = [m.m for m in await self.get_media_group_messages(message)]
+        messages = [
+            _message for _message in messages
+            if _message.media and not self.is_too_big(
+                getattr(getattr(_message, _message.media.value), "file_size", None),
+                _message.id,
+            )
+        ]
+        medias = await self._gather_downloads(self._download_input_media(_message, spool) for _message in messages)
+        medias = [media for media in medias if media is not None]
         logger.debug(f"[MSG ID {message_id}]: Media group содержит {len(medias)} файла.")
         # logger.info(f"Prepared media group with содержимое {medias} items.")
         return medias
@@ -60,8 +80,29 @@ class PyrogramClientInterface(ClientObject):
         return media.read()
 
     async def download_media_from_msg(self, msg: PyrogramMessageObject) -> bytes:
-        return await self.download_media(msg.get_media_file_id())
+        file_id = msg.get_media_file_id()
+        cached = await self._cached_download(msg, lambda path: self.client.download_media(file_id, file_name=path))
+        if cached is not None:
+            return cached
+        return await self.download_media(file_id)
+
+    async def stream_media(
+            self,
+            msg: PyrogramMessageObject,
+            chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> typing.AsyncIterator[bytes]:
+        if not msg.has_media():
+            return
+        # Pyrogram отдаёт части по 1 МБ
+        async for chunk in self._rechunk(self.client.stream_media(msg.m), chunk_size):
+            yield chunk
+
+    async def _fetch_messages(self, chat_id: int, message_ids: list[int]) -> list[PyrogramMessageObject | None]:
+        messages = await self.client.get_messages(chat_id, message_ids=message_ids)
+        return [PyrogramMessageObject(m) if m is not None and not m.empty else None for m in messages]
 
     async def get_media_group_messages(self, message: PyrogramMessageObject) -> list[PyrogramMessageObject]:
-        messages = await self.client.get_media_group(message.get_chat_id(), message.get_message_id())
-        return [PyrogramMessageObject(m) for m in messages]
+        chat_id, media_group_id = message.get_chat_id(), message.get_media_group_id()
+        if media_group_id and self.recent_messages.is_sealed(chat_id, media_group_id):
+            return typing.cast(list[PyrogramMessageObject], self.recent_messages.get_group(chat_id, media_group_id))
+        return [PyrogramMessageObject(m) for m in await self.client.get_media_group(chat_id, message.get_message_id())]
@@ -5,18 +5,23 @@ from aiogram.utils.keyboard import InlineKeyboardBuilder
 from pyrogram import types as pyro_types
 from pyrogram.types import Message as PyrogramMessage
 
-from tele_bridge.bases.message import MessageObject
+from tele_bridge.bases.message import MessageObject, memoized
 
 
 class PyrogramMessageObject(MessageObject):
+    __slots__ = ()
+    m: PyrogramMessage
 
-    def __init__(self, message: PyrogramMessage):
-        super().__init__(message)
-        self.m = message
+    @memoized
+    def _media_attr(self):
+        if not self.m.media:
+            return None
+        return getattr(self.m, self.m.media.value, None)
 
     def get_text(self):
         return self.m.text or self.m.caption
 
+    @memoized
     def get_html_text(self):
         if self.m.text:
             return self.m.text.html
@@ -55,6 +60,11 @@ class PyrogramMessageObject(MessageObject):
     def get_reply_to_message_id(self):
         return self.m.reply_to_message_id
 
+    def get_forward_origin(self) -> tuple[int, int] | None:
+        if self.m.forward_from_chat and self.m.forward_from_message_id:
+            return self.m.forward_from_chat.id, self.m.forward_from_message_id
+        return None
+
     def get_message_link(self):
         return self.m.link
 
@@ -68,13 +78,13 @@ class PyrogramMessageObject(MessageObject):
         return self.m.poll
 
     def get_media_file_size(self):
-        media_attr = getattr(self.m, self.m.media.value)
+        media_attr = self._media_attr()
         if hasattr(media_attr, "file_size") and media_attr.file_size:
             return media_attr.file_size
         return None
 
     def get_media_file_id(self):
-        media_attr = getattr(self.m, self.m.media.value)
+        media_attr = self._media_attr()
         if hasattr(media_attr, "file_id") and media_attr.file_id:
             return media_attr.file_id
         return None
@@ -83,11 +93,18 @@ class PyrogramMessageObject(MessageObject):
         return self.m.media
 
     def get_file_name(self):
-        media_attr = getattr(self.m, self.m.media.value)
+        media_attr = self._media_attr()
         if hasattr(media_attr, "file_name") and media_attr.file_name:
             return media_attr.file_name
         return None
 
+    def get_media_unique_id(self):
+        media_attr = self._media_attr()
+        if hasattr(media_attr, "file_unique_id") and media_attr.file_unique_id:
+            return media_attr.file_unique_id
+        return None
+
+    @memoized
     def get_reply_markup(self) -> aiogram_types.InlineKeyboardMarkup | None:
         if self.m.reply_markup:
             try:
@@ -6,5 +6,39 @@ from tele_bridge.pyro.message import PyrogramMessageObject
 
 class PyrogramChatGetterTry(ChatGetterTry):
 
+    def _get_peer_id(self, message: PyrogramMessageObject) -> int | None:
+        m = message.m
+        if self.get_type == "chat":
+            peer = m.chat
+        else:
+            peer = m.from_user or m.sender_chat
+        return peer.id if peer else None
+
     async def try_get_chat(self, message: PyrogramMessageObject):
-        pass
+        if self.is_blocked():
+            return
+        client = message.m._client
+        peer_id = self._get_peer_id(message)
+        if peer_id is None:
+            return
+
+        get_chat_errors = self.get_chat_errors.get(peer_id)
+        if not get_chat_errors:
+            try:
+                # Пир уже в хранилище сессии - сеть не нужна
+                return await client.storage.get_peer_by_id(peer_id)
+            except KeyError:
+                pass
+            except Exception:
+                self.get_chat_errors[peer_id] = True
+                self.global_error_count += 1
+
+        input_chat_errors = self.get_input_chat_errors.get(peer_id)
+        if not input_chat_errors:
+            try:
+                return await client.resolve_peer(peer_id)
+            except Exception:
+                self.get_input_chat_errors[peer_id] = True
+                self.global_error_count += 1
+
+        self._check_errors()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import sys
+import typing
+from collections import OrderedDict
+
+from .bases.message import MessageObject
+
+MessageKey: typing.TypeAlias = tuple[int, int]
+GroupKey: typing.TypeAlias = tuple[int, int]
+
+# Примерный размер объекта сообщения без текста, bytes
+MESSAGE_OVERHEAD = 2048
+
+
+class RecentMessages:
+    """
+    Последние полученные сообщения аккаунта, индекс по (chat_id, message_id)
+    и по (chat_id, media_group_id). Самые старые вытесняются, когда сообщений
+    больше maxlen или их примерный размер больше max_bytes.
+    """
+
+    def __init__(self, maxlen: int = 5_000, max_bytes: int = 32 * 1024 * 1024):
+        self.maxlen = maxlen
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._messages: OrderedDict[MessageKey, MessageObject] = OrderedDict()
+        self._sizes: dict[MessageKey, int] = {}
+        self._groups: dict[GroupKey, set[int]] = {}
+        # Группы, все части которых уже есть в буфере
+        self._sealed: set[GroupKey] = set()
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __contains__(self, key: MessageKey) -> bool:
+        return key in self._messages
+
+    @staticmethod
+    def _estimate_size(message: MessageObject) -> int:
+        return MESSAGE_OVERHEAD + sys.getsizeof(message.get_text() or "")
+
+    def add(self, message: MessageObject):
+        chat_id, message_id = message.get_chat_id(), message.get_message_id()
+        key = (chat_id, message_id)
+        if key in self._messages:
+            # Повторное сообщение (например, после правки) заменяет старое, не снимая отметку группы
+            self._discard(key, unseal=False)
+        self._messages[key] = message
+        self._sizes[key] = size = self._estimate_size(message)
+        self.total_bytes += size
+        if media_group_id := message.get_media_group_id():
+            self._groups.setdefault((chat_id, media_group_id), set()).add(message_id)
+        while len(self._messages) > self.maxlen or (self.total_bytes > self.max_bytes and len(self._messages) > 1):
+            self._discard(next(iter(self._messages)))
+
+    def _discard(self, key: MessageKey, unseal: bool = True):
+        message = self._messages.pop(key)
+        self.total_bytes -= self._sizes.pop(key)
+        media_group_id = message.get_media_group_id()
+        if not media_group_id:
+            return
+        group_key = (key[0], media_group_id)
+        ids = self._groups.get(group_key)
+        if ids is None:
+            return
+        ids.discard(key[1])
+        if unseal:
+            self._sealed.discard(group_key)
+        if not ids:
+            del self._groups[group_key]
+
+    def get(self, chat_id: int, message_id: int) -> MessageObject | None:
+        message = self._messages.get((chat_id, message_id))
+        if message is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return message
+
+    def get_group(self, chat_id: int, media_group_id: int) -> list[MessageObject]:
+        ids = self._groups.get((chat_id, media_group_id), ())
+        return [self._messages[(chat_id, message_id)] for message_id in sorted(ids)]
+
+    def seal_group(self, chat_id: int, media_group_id: int):
+        """Отмечает, что в буфере собраны все части группы"""
+        if (chat_id, media_group_id) in self._groups:
+            self._sealed.add((chat_id, media_group_id))
+
+    def is_sealed(self, chat_id: int, media_group_id: int) -> bool:
+        return (chat_id, media_group_id) in self._sealed
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, fields
+
+from tele_bridge.bases.message import MessageObject
+
+_VERSION = 1
+_HEADER = struct.Struct("<BI")
+_INT = struct.Struct("<q")
+_LENGTH = struct.Struct("<I")
+
+
+@dataclass(frozen=True, slots=True)
+class MessageRecord:
+    """
+    Нормализованное сообщение без ссылок на клиент и TL объекты.
+    Можно класть в очереди, сохранять и передавать между процессами.
+    """
+    chat_id: int
+    message_id: int
+    account_id: int | None = None
+    user_id: int | None = None
+    reply_to_message_id: int | None = None
+    media_group_id: int | None = None
+    media_file_size: int | None = None
+
+    have_from_user: bool = False
+    has_media: bool = False
+
+    text: str | None = None
+    html_text: str | None = None
+    first_name: str | None = None
+    last_name: str | None = None
+    chat_username: str | None = None
+    user_username: str | None = None
+    message_link: str | None = None
+    media_file_id: str | None = None
+    # Значение pyrogram.enums.MessageMediaType
+    media_type: str | None = None
+    file_name: str | None = None
+
+    @classmethod
+    def from_message(cls, message: MessageObject, account_id: int | None = None) -> MessageRecord:
+        snapshot = message.snapshot()
+        media_type = snapshot["media_type"]
+        media_file_id = snapshot["media_file_id"]
+        media_group_id = snapshot["media_group_id"]
+        return cls(
+            chat_id=snapshot["chat_id"],
+            message_id=snapshot["message_id"],
+            account_id=account_id,
+            user_id=snapshot["user_id"],
+            reply_to_message_id=snapshot["reply_to_message_id"],
+            media_group_id=int(media_group_id) if media_group_id is not None else None,
+            media_file_size=snapshot["media_file_size"],
+            have_from_user=bool(snapshot["have_from_user"]),
+            has_media=bool(snapshot["has_media"]),
+            text=snapshot["text"],
+            html_text=snapshot["html_text"],
+            first_name=snapshot["first_name"],
+            last_name=snapshot["last_name"],
+            chat_username=snapshot["chat_username"],
+            user_username=snapshot["user_username"],
+            message_link=snapshot["message_link"],
+            media_file_id=str(media_file_id) if media_file_id is not None else None,
+            media_type=media_type.value if media_type is not None else None,
+            file_name=snapshot["file_name"],
+        )
+
+    def encode(self) -> bytes:
+        """
+        Формат: версия (1 байт), битовая маска полей (4 байта), затем присутствующие
+        поля по порядку объявления: int - 8 байт, str - длина (4 байта) и utf-8.
+        bool хранятся только в маске.
+        """
+        mask = 0
+        parts = []
+        for i, (name, kind) in enumerate(_FIELDS):
+            value = getattr(self, name)
+            if value is None or value is False:
+                continue
+            mask |= 1 << i
+            if kind is int:
+                parts.append(_INT.pack(value))
+            elif kind is str:
+                data = value.encode()
+                parts.append(_LENGTH.pack(len(data)))
+                parts.append(data)
+        return _HEADER.pack(_VERSION, mask) + b"".join(parts)
+
+    @classmethod
+    def decode(cls, data: bytes) -> MessageRecord:
+        version, mask = _HEADER.unpack_from(data)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported message record version: {version}")
+        offset = _HEADER.size
+        values = {}
+        for i, (name, kind) in enumerate(_FIELDS):
+            if not mask & (1 << i):
+                continue
+            if kind is int:
+                values[name] = _INT.unpack_from(data, offset)[0]
+                offset += _INT.size
+            elif kind is str:
+                length = _LENGTH.unpack_from(data, offset)[0]
+                offset += _LENGTH.size
+                values[name] = bytes(data[offset:offset + length]).decode()
+                offset += length
+            else:
+                values[name] = True
+        return cls(**values)
+
+
+_KINDS = {"int": int, "int | None": int, "bool": bool, "str | None": str}
+_FIELDS: tuple[tuple[str, type], ...] = tuple((f.name, _KINDS[f.type]) for f in fields(MessageRecord))
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import typing
+from dataclasses import dataclass
+
+from pyrogram import enums as pyro_enums
+
+from tele_bridge.bases.message import MessageObject
+from tele_bridge.keywords import KeywordMatcher
+
+O = typing.TypeVar("O", bound=typing.Hashable)
+
+
+@dataclass(frozen=True)
+class ObserverFilter:
+    """None - условие не проверяется"""
+    chat_ids: frozenset[int] | None = None
+    sender_ids: frozenset[int] | None = None
+    has_media: bool | None = None
+    media_types: frozenset[pyro_enums.MessageMediaType] | None = None
+    # Без учёта регистра, достаточно одного совпадения
+    keywords: frozenset[str] | None = None
+
+    def __post_init__(self):
+        for name in ("chat_ids", "sender_ids", "media_types", "keywords"):
+            value = getattr(self, name)
+            if value is not None and not isinstance(value, frozenset):
+                object.__setattr__(self, name, frozenset(value))
+        if self.keywords is not None:
+            object.__setattr__(self, "keywords", frozenset(k.casefold() for k in self.keywords))
+
+    def check(self, message: MessageObject, keyword_matched: bool | None = None) -> bool:
+        """keyword_matched - готовый результат KeywordMatcher, иначе слова ищутся в тексте"""
+        if self.chat_ids is not None and message.get_chat_id() not in self.chat_ids:
+            return False
+        if self.sender_ids is not None and message.get_user_id() not in self.sender_ids:
+            return False
+        if self.has_media is not None and message.has_media() != self.has_media:
+            return False
+        if self.media_types is not None and message.get_media_type() not in self.media_types:
+            return False
+        if self.keywords is not None:
+            if keyword_matched is None:
+                text = (message.get_text() or "").casefold()
+                keyword_matched = any(keyword in text for keyword in self.keywords)
+            if not keyword_matched:
+                return False
+        return True
+
+
+class RoutingIndex(typing.Generic[O]):
+    """
+    Индекс наблюдателей по chat_id, затем по sender_id, затем по ключевым словам.
+    Для сообщения проверяются только наблюдатели его чата, его отправителя,
+    наблюдатели с найденными в тексте словами и наблюдатели без фильтров.
+    """
+
+    def __init__(self):
+        self.filters: dict[O, ObserverFilter | None] = {}
+        self.by_chat: dict[int, set[O]] = {}
+        self.by_sender: dict[int, set[O]] = {}
+        self.keywords: KeywordMatcher[O] = KeywordMatcher()
+        self.wildcard: set[O] = set()
+
+    def __len__(self):
+        return len(self.filters)
+
+    def _buckets(self, observer_filter: ObserverFilter | None) -> typing.Iterator[set[O]]:
+        if observer_filter is not None and observer_filter.chat_ids is not None:
+            for chat_id in observer_filter.chat_ids:
+                yield self.by_chat.setdefault(chat_id, set())
+        elif observer_filter is not None and observer_filter.sender_ids is not None:
+            for sender_id in observer_filter.sender_ids:
+                yield self.by_sender.setdefault(sender_id, set())
+        elif observer_filter is None or observer_filter.keywords is None:
+            yield self.wildcard
+
+    def add(self, observer: O, observer_filter: ObserverFilter | None = None):
+        if observer in self.filters:
+            self.remove(observer)
+        self.filters[observer] = observer_filter
+        for bucket in self._buckets(observer_filter):
+            bucket.add(observer)
+        if observer_filter is not None and observer_filter.keywords is not None:
+            self.keywords.add(observer, observer_filter.keywords)
+
+    def remove(self, observer: O):
+        if observer not in self.filters:
+            return
+        observer_filter = self.filters.pop(observer)
+        self.keywords.remove(observer)
+        if observer_filter is not None and observer_filter.chat_ids is not None:
+            self._discard(self.by_chat, observer_filter.chat_ids, observer)
+        elif observer_filter is not None and observer_filter.sender_ids is not None:
+            self._discard(self.by_sender, observer_filter.sender_ids, observer)
+        else:
+            self.wildcard.discard(observer)
+
+    @staticmethod
+    def _discard(index: dict[int, set[O]], keys: typing.Iterable[int], observer: O):
+        for key in keys:
+            bucket = index.get(key)
+            if bucket is None:
+                continue
+            bucket.discard(observer)
+            if not bucket:
+                del index[key]
+
+    def match(self, message: MessageObject) -> list[O]:
+        keyword_hits = self.keywords.match(message.get_text()) if self.keywords else set()
+        candidates = self.wildcard.union(
+            self.by_chat.get(message.get_chat_id(), ()),
+            self.by_sender.get(message.get_user_id(), ()),
+            keyword_hits,
+        )
+        matched = []
+        for observer in candidates:
+            observer_filter = self.filters[observer]
+            if observer_filter is None or observer_filter.check(message, observer in keyword_hits):
+                matched.append(observer)
+        return matched
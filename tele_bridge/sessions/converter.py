@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import enum
+import functools
+import ipaddress
+import os
+import struct
+import typing
+from dataclasses import dataclass
+
+from .tele_bridge_session import TeleBridgeSession
+
+
+class SessionFormat(str, enum.Enum):
+    PYROGRAM_OLD = "pyrogram_old"
+    PYROGRAM_OLD_64 = "pyrogram_old_64"
+    PYROGRAM = "pyrogram"
+    TELETHON = "telethon"
+
+
+# Длина строки без "=" -> формат, совпадает с MemoryStorage
+PYROGRAM_FORMATS: dict[int, tuple[SessionFormat, struct.Struct]] = {
+    351: (SessionFormat.PYROGRAM_OLD, struct.Struct(">B?256sI?")),
+    356: (SessionFormat.PYROGRAM_OLD_64, struct.Struct(">B?256sQ?")),
+    362: (SessionFormat.PYROGRAM, struct.Struct(">BI?256sQ?")),
+}
+
+# Telethon StringSession: версия "1" + base64(dc_id, IPv4 или IPv6, port, auth key)
+TELETHON_VERSION = "1"
+TELETHON_LAYOUTS: dict[int, struct.Struct] = {
+    4: struct.Struct(">B4sH256s"),
+    16: struct.Struct(">B16sH256s"),
+}
+# Длина строки без версии -> длина IP
+TELETHON_IP_SIZES: dict[int, int] = {352: 4, 368: 16}
+
+
+@functools.cache
+def dc_address(dc_id: int, test_mode: bool = False) -> tuple[str, int]:
+    """IP и порт DC, DataCenter считается один раз на пару (dc_id, test_mode)"""
+    from pyrogram.session.internals import DataCenter
+
+    return DataCenter(dc_id, test_mode, False, False)
+
+
+def _b64decode(session_string: str) -> bytes:
+    return base64.b64decode(session_string + "=" * (-len(session_string) % 4), altchars=b"-_", validate=True)
+
+
+def decode_pyrogram_string(session_string: str) -> tuple[TeleBridgeSession, SessionFormat]:
+    """Разбор строки Pyrogram без MemoryStorage, ValueError - неверная строка"""
+    session_string = session_string.strip().rstrip("=")
+    known = PYROGRAM_FORMATS.get(len(session_string))
+    if known is None:
+        raise ValueError(f"Unknown session string length {len(session_string)}")
+    session_format, layout = known
+    try:
+        data = _b64decode(session_string)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid base64: {e}") from None
+
+    if session_format is SessionFormat.PYROGRAM:
+        dc_id, api_id, test_mode, auth_key, user_id, is_bot = layout.unpack(data)
+    else:
+        dc_id, test_mode, auth_key, user_id, is_bot = layout.unpack(data)
+        api_id = 0
+    try:
+        ip, port = dc_address(dc_id, test_mode)
+    except KeyError:
+        raise ValueError(f"Unknown DC {dc_id}") from None
+
+    session = TeleBridgeSession(
+        dc_id=dc_id,
+        auth_key=auth_key,
+        ip=ip,
+        port=port,
+        is_bot=is_bot,
+        test_mode=test_mode,
+        api_id=api_id,
+        user_id=user_id,
+    )
+    return session, session_format
+
+
+def decode_telethon_string(session_string: str) -> TeleBridgeSession:
+    """Разбор строки StringSession без Telethon, ValueError - неверная строка"""
+    session_string = session_string.strip()
+    if not session_string.startswith(TELETHON_VERSION):
+        raise ValueError("Not a Telethon session string")
+    ip_size = TELETHON_IP_SIZES.get(len(session_string) - 1)
+    if ip_size is None:
+        raise ValueError(f"Unknown session string length {len(session_string)}")
+    try:
+        data = _b64decode(session_string[1:])
+    except binascii.Error as e:
+        raise ValueError(f"Invalid base64: {e}") from None
+
+    try:
+        dc_id, ip, port, auth_key = TELETHON_LAYOUTS[ip_size].unpack(data)
+    except struct.error as e:
+        raise ValueError(f"Invalid session data: {e}") from None
+    if not any(auth_key):
+        raise ValueError("Session has no auth key")
+    return TeleBridgeSession(
+        dc_id=dc_id,
+        auth_key=auth_key,
+        ip=ipaddress.ip_address(ip).compressed,
+        port=port,
+    )
+
+
+def encode_telethon_string(session: TeleBridgeSession) -> str:
+    """То же, что StringSession.save(), без объектов Telethon и вычисления id ключа"""
+    ip = ipaddress.ip_address(session.ip).packed
+    packed = TELETHON_LAYOUTS[len(ip)].pack(session.dc_id, ip, session.port, session.auth_key)
+    return TELETHON_VERSION + base64.urlsafe_b64encode(packed).decode("ascii")
+
+
+def decode_session_string(session_string: str) -> tuple[TeleBridgeSession, SessionFormat]:
+    """Формат определяется по длине строки, длины Telethon и Pyrogram не пересекаются"""
+    session_string = session_string.strip()
+    if session_string.startswith(TELETHON_VERSION) and len(session_string) - 1 in TELETHON_IP_SIZES:
+        return decode_telethon_string(session_string), SessionFormat.TELETHON
+    return decode_pyrogram_string(session_string)
+
+
+@dataclass(frozen=True, slots=True)
+class ConvertedSession:
+    # Номер строки во входных данных, с нуля
+    index: int
+    session: TeleBridgeSession
+    format: SessionFormat
+    # Строка в целевом формате, None - без конвертации
+    output: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class SessionError:
+    index: int
+    reason: str
+
+
+Target: typing.TypeAlias = typing.Literal["telethon", "pyrogram"] | None
+
+
+def _convert(index: int, session_string: str, to: Target) -> ConvertedSession | SessionError:
+    try:
+        session, session_format = decode_session_string(session_string)
+        if to == "telethon":
+            output = session.to_telethon_string()
+        elif to == "pyrogram":
+            output = session.to_pyrogram_string()
+        else:
+            output = None
+    except (ValueError, struct.error) as e:
+        return SessionError(index, str(e))
+    return ConvertedSession(index, session, session_format, output)
+
+
+def iter_convert(
+        session_strings: typing.Iterable[str],
+        to: Target = None,
+) -> typing.Iterator[ConvertedSession | SessionError]:
+    """
+    Проверяет и разбирает строки Pyrogram и Telethon по одной, не накапливая их в памяти.
+    Ошибка одной строки не прерывает обработку, она отдаётся как SessionError.
+    """
+    for index, session_string in enumerate(session_strings):
+        yield _convert(index, session_string, to)
+
+
+def iter_convert_file(
+        path: str | os.PathLike,
+        to: Target = None,
+) -> typing.Iterator[ConvertedSession | SessionError]:
+    """Одна строка сессии на строку файла, пустые строки пропускаются, index - номер строки файла"""
+    with open(path, encoding="ascii", errors="replace") as f:
+        for line_number, line in enumerate(f):
+            if line := line.strip():
+                yield _convert(line_number, line, to)
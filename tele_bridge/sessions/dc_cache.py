@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import json
+import os
+import time
+import typing
+from dataclasses import dataclass
+
+from loguru import logger
+
+from .tele_bridge_session import TeleBridgeSession
+
+Address: typing.TypeAlias = tuple[str, int]
+
+
+@dataclass
+class DCEndpoint:
+    dc_id: int
+    ip: str
+    port: int
+    # seconds, время TCP подключения при последней проверке
+    latency: float | None = None
+    updated_at: float = 0
+
+
+class DCAddressCache:
+    """
+    Последний рабочий адрес DC каждого аккаунта и задержка подключения к нему.
+    apply() подставляет этот адрес в сессию клиента перед подключением.
+    warm_up() - только проверка: открывает и сразу закрывает TCP к каждому адресу
+    напрямую, без прокси, и запоминает задержку.
+    path - JSON файл, в который кэш сохраняется между запусками.
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None):
+        self.path = path
+        self.endpoints: dict[int, DCEndpoint] = {}
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    def get(self, account_id: int) -> DCEndpoint | None:
+        return self.endpoints.get(account_id)
+
+    def record(self, account_id: int, dc_id: int, ip: str, port: int, latency: float | None = None):
+        endpoint = self.endpoints.get(account_id)
+        if latency is None and endpoint is not None and (endpoint.dc_id, endpoint.ip, endpoint.port) == (dc_id, ip, port):
+            latency = endpoint.latency
+        self.endpoints[account_id] = DCEndpoint(dc_id, ip, port, latency, time.time())
+
+    def forget(self, account_id: int):
+        self.endpoints.pop(account_id, None)
+
+    def apply(self, account_id: int, client) -> bool:
+        """
+        Перед подключением переводит сессию клиента на последний рабочий адрес DC,
+        без записи в кэше - обратно на адрес из session_bridge. True - адрес сессии изменён.
+        Только для сессий с set_dc (Telethon), Pyrogram берёт адрес DC из своей таблицы.
+        """
+        session_bridge: TeleBridgeSession | None = getattr(client, "session_bridge", None)
+        session = getattr(client, "session", None)
+        # Сессия, перешедшая в другой DC, уже не соответствует session_bridge
+        if session_bridge is None or not hasattr(session, "set_dc") or session.dc_id != session_bridge.dc_id:
+            return False
+        ip, port = self._address(account_id, session_bridge)
+        current = session.server_address
+        # При смене IPv4/IPv6 Telethon сбросит сессию на DC по умолчанию
+        if (ip, port) == (current, session.port) or (":" in ip) != (":" in (current or ip)):
+            return False
+        session.set_dc(session.dc_id, ip, port)
+        logger.debug(f"[{account_id}] DC {session.dc_id} address set to {ip}:{port}")
+        return True
+
+    def _address(self, account_id: int, session: TeleBridgeSession) -> Address:
+        """Последний рабочий адрес, если аккаунт остался в DC сессии, иначе адрес из сессии"""
+        endpoint = self.endpoints.get(account_id)
+        if endpoint is None or endpoint.dc_id != session.dc_id:
+            return session.ip, session.port
+        return endpoint.ip, endpoint.port
+
+    def load(self):
+        with open(self.path) as f:
+            data = json.load(f)
+        self.endpoints = {int(account_id): DCEndpoint(**endpoint) for account_id, endpoint in data.items()}
+
+    def save(self):
+        if self.path is None:
+            return
+        data = {str(account_id): dataclasses.asdict(endpoint) for account_id, endpoint in self.endpoints.items()}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    async def probe(address: Address, timeout: float = 5) -> float | None:
+        """Время TCP подключения, None - адрес недоступен"""
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(timeout):
+                _, writer = await asyncio.open_connection(*address)
+        except (OSError, TimeoutError) as e:
+            logger.warning(f"DC {address[0]}:{address[1]} is unreachable: {e!r}")
+            return None
+        latency = time.monotonic() - started
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return latency
+
+    async def warm_up(
+            self,
+            sessions: typing.Mapping[int, TeleBridgeSession],
+            timeout: float = 5,
+            max_parallel: int = 50,
+    ) -> dict[Address, float | None]:
+        """
+        Проверяет каждый различный адрес один раз, все одновременно (не больше max_parallel),
+        и запоминает задержку для аккаунтов с доступным адресом
+        """
+        addresses: dict[Address, list[tuple[int, int]]] = {}
+        for account_id, session in sessions.items():
+            addresses.setdefault(self._address(account_id, session), []).append((account_id, session.dc_id))
+
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def limited(address: Address) -> float | None:
+            async with semaphore:
+                return await self.probe(address, timeout)
+
+        started = time.monotonic()
+        latencies = dict(zip(addresses, await asyncio.gather(*(limited(address) for address in addresses))))
+        for address, latency in latencies.items():
+            if latency is None:
+                continue
+            for account_id, dc_id in addresses[address]:
+                self.record(account_id, dc_id, *address, latency)
+        logger.info(
+            f"Probed {len(latencies)} DC addresses for {len(sessions)} accounts "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        return latencies
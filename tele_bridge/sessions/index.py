@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import typing
+
+from .tele_bridge_session import TeleBridgeSession
+
+
+class DuplicateSessionError(ValueError):
+    def __init__(self, account_id: int, duplicate_of: int):
+        self.account_id = account_id
+        self.duplicate_of = duplicate_of
+        super().__init__(f"Account {account_id} uses the same auth key as account {duplicate_of}")
+
+
+class SessionIndex:
+    """Аккаунты по отпечатку сессии, находит один auth key под разными аккаунтами"""
+
+    def __init__(self):
+        self.accounts: dict[str, int] = {}
+        self.fingerprints: dict[int, str] = {}
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def __contains__(self, session: TeleBridgeSession) -> bool:
+        return session.fingerprint() in self.accounts
+
+    def find(self, session: TeleBridgeSession) -> int | None:
+        """account_id, под которым уже есть этот auth key"""
+        return self.accounts.get(session.fingerprint())
+
+    def add(self, account_id: int, session: TeleBridgeSession):
+        """DuplicateSessionError - auth key уже занят другим аккаунтом"""
+        fingerprint = session.fingerprint()
+        owner = self.accounts.get(fingerprint)
+        if owner is not None and owner != account_id:
+            raise DuplicateSessionError(account_id, owner)
+        self.remove(account_id)
+        self.accounts[fingerprint] = account_id
+        self.fingerprints[account_id] = fingerprint
+
+    def add_many(self, sessions: typing.Iterable[tuple[int, TeleBridgeSession]]) -> dict[int, int]:
+        """Добавляет все сессии, кроме дублей; возвращает {account_id дубля: account_id владельца}"""
+        duplicates = {}
+        for account_id, session in sessions:
+            try:
+                self.add(account_id, session)
+            except DuplicateSessionError as e:
+                duplicates[account_id] = e.duplicate_of
+        return duplicates
+
+    def remove(self, account_id: int):
+        fingerprint = self.fingerprints.pop(account_id, None)
+        if fingerprint is not None:
+            self.accounts.pop(fingerprint, None)
@@ -1,12 +1,10 @@
 from __future__ import annotations
 
 import base64
-import ipaddress
+import hashlib
 import struct
 from dataclasses import dataclass
 
-from pyrogram.session.internals import DataCenter
-
 
 @dataclass
 class TeleBridgeSession:
@@ -22,68 +20,21 @@ class TeleBridgeSession:
 
     @classmethod
     def from_pyrogram_string(cls, session_string: str):
-        from pyrogram.storage import MemoryStorage
-
-        if len(session_string) in [MemoryStorage.SESSION_STRING_SIZE, MemoryStorage.SESSION_STRING_SIZE_64]:
-            dc_id, test_mode, auth_key, user_id, is_bot = struct.unpack(
-                (MemoryStorage.OLD_SESSION_STRING_FORMAT
-                 if len(session_string) == MemoryStorage.SESSION_STRING_SIZE else
-                 MemoryStorage.OLD_SESSION_STRING_FORMAT_64),
-                base64.urlsafe_b64decode(session_string + "=" * (-len(session_string) % 4))
-            )
-            server_address, port = DataCenter(
-                dc_id, False, False, False
-            )
-            return cls(
-                dc_id=dc_id,
-                api_id=0,
-                test_mode=test_mode,
-                auth_key=auth_key,
-                user_id=user_id,
-                is_bot=is_bot,
-                ip=server_address,
-                port=port
-            )
+        from .converter import decode_pyrogram_string
 
-        dc_id, api_id, test_mode, auth_key, user_id, is_bot = struct.unpack(
-            MemoryStorage.SESSION_STRING_FORMAT,
-            base64.urlsafe_b64decode(session_string + "=" * (-len(session_string) % 4))
-        )
-        server_address, port = DataCenter(
-            dc_id, False, False, False
-        )
-        return cls(
-            dc_id=dc_id,
-            api_id=api_id,
-            test_mode=test_mode,
-            auth_key=auth_key,
-            user_id=user_id,
-            is_bot=is_bot,
-            ip=server_address,
-            port=port
-        )
+        session, _ = decode_pyrogram_string(session_string)
+        return session
 
     @classmethod
     def from_telethon_string(cls, session_string: str):
-        from telethon.sessions import StringSession
-        session = StringSession(session_string)
-        return cls(
-            dc_id=session._dc_id,
-            auth_key=session._auth_key.key,
-            ip=session._server_address,
-            port=session._port,
-        )
+        from .converter import decode_telethon_string
+
+        return decode_telethon_string(session_string)
 
     def to_telethon_string(self):
-        from telethon.sessions import StringSession
-        from telethon.crypto import AuthKey
+        from .converter import encode_telethon_string
 
-        session = StringSession()
-        session._dc_id = self.dc_id
-        session._port = self.port
-        session._auth_key = AuthKey(self.auth_key)
-        session._server_address = ipaddress.ip_address(self.ip).compressed
-        return session.save()
+        return encode_telethon_string(self)
 
     def to_pyrogram_string(self):
         from pyrogram.storage import MemoryStorage
@@ -99,6 +50,10 @@ class TeleBridgeSession:
         )
         return base64.urlsafe_b64encode(packed).decode().rstrip("=")
 
+    def fingerprint(self) -> str:
+        """Одинаков у сессий с одним auth key, сам ключ по нему не восстановить"""
+        return hashlib.sha256(self.dc_id.to_bytes(2, "big") + self.auth_key).hexdigest()
+
     def base64_auth_key(self):
         return base64.urlsafe_b64encode(self.auth_key).decode('ascii')
 
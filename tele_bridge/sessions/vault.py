@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import ipaddress
+import os
+import sqlite3
+import struct
+import typing
+
+import tgcrypto
+
+from .tele_bridge_session import TeleBridgeSession
+
+FORMAT_VERSION = 1
+# version, dc_id, flags, api_id, port, user_id
+HEADER = struct.Struct(">BBBIHq")
+AUTH_KEY_SIZE = 256
+NONCE_SIZE = 16
+TAG_SIZE = 32
+
+FLAG_TEST_MODE = 1
+FLAG_IS_BOT = 2
+FLAG_IPV6 = 4
+
+
+class SessionVaultError(Exception):
+    pass
+
+
+class SessionVault:
+    """
+    SQLite хранилище TeleBridgeSession по account_id с индексом по user_id.
+    Запись - компактный бинарный блоб: заголовок, IP (4 или 16 байт) и auth key,
+    зашифрованный AES-256-CTR со случайным nonce. HMAC-SHA256 подписывает запись
+    вместе с account_id, поэтому блоб нельзя незаметно подменить или перенести
+    на другой аккаунт. key - 32 байта секрета, из него выводятся ключи шифрования и подписи.
+    """
+
+    def __init__(self, path: str | os.PathLike, key: bytes):
+        if len(key) != 32:
+            raise ValueError("Vault key must be 32 bytes")
+        self._enc_key = hmac.digest(key, b"tele-bridge vault encryption", hashlib.sha256)
+        self._mac_key = hmac.digest(key, b"tele-bridge vault authentication", hashlib.sha256)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                account_id INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sessions_user_id ON sessions (user_id);
+            """
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def __contains__(self, account_id: int) -> bool:
+        return self.db.execute("SELECT 1 FROM sessions WHERE account_id = ?", (account_id,)).fetchone() is not None
+
+    def close(self):
+        self.db.close()
+
+    def _ctr(self, data: bytes, nonce: bytes) -> bytes:
+        # tgcrypto продвигает iv и state на месте, поэтому передаются копии
+        return tgcrypto.ctr256_encrypt(data, self._enc_key, bytearray(nonce), bytearray(1))
+
+    def _sign(self, account_id: int, payload: bytes) -> bytes:
+        return hmac.digest(self._mac_key, struct.pack(">q", account_id) + payload, hashlib.sha256)
+
+    def encode(self, account_id: int, session: TeleBridgeSession) -> bytes:
+        if len(session.auth_key) != AUTH_KEY_SIZE:
+            raise ValueError(f"Auth key must be {AUTH_KEY_SIZE} bytes")
+        ip = ipaddress.ip_address(session.ip)
+        flags = (
+                FLAG_TEST_MODE * bool(session.test_mode)
+                | FLAG_IS_BOT * bool(session.is_bot)
+                | FLAG_IPV6 * (ip.version == 6)
+        )
+        nonce = os.urandom(NONCE_SIZE)
+        payload = b"".join((
+            HEADER.pack(FORMAT_VERSION, session.dc_id, flags, session.api_id, session.port, session.user_id),
+            ip.packed,
+            nonce,
+            self._ctr(session.auth_key, nonce),
+        ))
+        return payload + self._sign(account_id, payload)
+
+    def decode(self, account_id: int, data: bytes) -> TeleBridgeSession:
+        payload, tag = data[:-TAG_SIZE], data[-TAG_SIZE:]
+        if not hmac.compare_digest(tag, self._sign(account_id, payload)):
+            raise SessionVaultError(f"Session of account {account_id} is corrupted or the vault key is wrong")
+        version, dc_id, flags, api_id, port, user_id = HEADER.unpack_from(payload)
+        if version != FORMAT_VERSION:
+            raise SessionVaultError(f"Unsupported session format version {version}")
+        offset = HEADER.size
+        ip_size = 16 if flags & FLAG_IPV6 else 4
+        ip = ipaddress.ip_address(payload[offset:offset + ip_size])
+        offset += ip_size
+        nonce = payload[offset:offset + NONCE_SIZE]
+        encrypted = payload[offset + NONCE_SIZE:]
+        return TeleBridgeSession(
+            dc_id=dc_id,
+            auth_key=self._ctr(encrypted, nonce),
+            ip=ip.compressed,
+            port=port,
+            is_bot=bool(flags & FLAG_IS_BOT),
+            test_mode=bool(flags & FLAG_TEST_MODE),
+            api_id=api_id,
+            user_id=user_id,
+        )
+
+    def save(self, account_id: int, session: TeleBridgeSession):
+        self.save_many([(account_id, session)])
+
+    def save_many(self, sessions: typing.Iterable[tuple[int, TeleBridgeSession]]):
+        """Все сессии пишутся одной транзакцией"""
+        rows = ((account_id, session.user_id, self.encode(account_id, session)) for account_id, session in sessions)
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO sessions (account_id, user_id, data) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def get(self, account_id: int) -> TeleBridgeSession | None:
+        row = self.db.execute("SELECT data FROM sessions WHERE account_id = ?", (account_id,)).fetchone()
+        return self.decode(account_id, row[0]) if row else None
+
+    def get_by_user_id(self, user_id: int) -> dict[int, TeleBridgeSession]:
+        rows = self.db.execute("SELECT account_id, data FROM sessions WHERE user_id = ?", (user_id,))
+        return {account_id: self.decode(account_id, data) for account_id, data in rows}
+
+    def load_many(self, account_ids: typing.Iterable[int] | None = None) -> dict[int, TeleBridgeSession]:
+        """None - все сессии"""
+        if account_ids is None:
+            rows = self.db.execute("SELECT account_id, data FROM sessions")
+            return {account_id: self.decode(account_id, data) for account_id, data in rows}
+
+        sessions = {}
+        account_ids = list(account_ids)
+        # Ограничение SQLite на число параметров запроса
+        for start in range(0, len(account_ids), 500):
+            chunk = account_ids[start:start + 500]
+            rows = self.db.execute(
+                f"SELECT account_id, data FROM sessions WHERE account_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            sessions.update((account_id, self.decode(account_id, data)) for account_id, data in rows)
+        return sessions
+
+    def delete(self, account_id: int):
+        with self.db:
+            self.db.execute("DELETE FROM sessions WHERE account_id = ?", (account_id,))
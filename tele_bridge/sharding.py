@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import multiprocessing
+import os
+import queue
+import struct
+import typing
+from dataclasses import dataclass, field
+from multiprocessing.process import BaseProcess
+
+from loguru import logger
+
+from .bases.account import AccountProtocol
+from .bases.message import MessageObject
+from .observer import Observer
+from .pool import DispatcherPool, PoolOpts
+from .record import MessageRecord
+from .sessions.converter import decode_session_string
+from .sessions.index import DuplicateSessionError, SessionIndex
+
+if typing.TYPE_CHECKING:
+    from .dispatcher import Dispatcher
+
+# Фабрика должна быть объявлена на уровне модуля, чтобы её можно было передать в процесс
+DispatcherFactory: typing.TypeAlias = typing.Callable[
+    [AccountProtocol],
+    typing.Union["Dispatcher", typing.Awaitable["Dispatcher"]]
+]
+# Для альбома вызывается как on_message(head, album=[все части])
+EventHandler: typing.TypeAlias = typing.Callable[..., typing.Awaitable[typing.Any]]
+
+
+def shard_for(account_id: int, shards: int) -> int:
+    return account_id % shards
+
+
+@dataclass
+class ShardOpts:
+    workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    # seconds
+    restart_delay: float = 5
+    poll_interval: float = 1
+    # Сколько сообщений может ждать родительский процесс, сверх - отбрасываются в шарде
+    queue_maxsize: int = 10_000
+    pool_opts: PoolOpts = field(default_factory=PoolOpts)
+
+
+class _ForwardObserver(Observer):
+
+    def __init__(self, account_id: int, events: multiprocessing.Queue):
+        self.account_id = account_id
+        self.events = events
+
+    async def trigger(self, message: MessageObject, *args, album: list[MessageObject] | None = None, **kwargs):
+        # Ошибка разбора одного сообщения не должна прерывать остальных наблюдателей
+        try:
+            head = MessageRecord.from_message(message, self.account_id).encode()
+            parts = tuple(MessageRecord.from_message(part, self.account_id).encode() for part in album or ())
+        except Exception as e:
+            logger.warning(f"[{self.account_id}] Message was not forwarded, record build failed: {e!r}")
+            return
+        try:
+            self.events.put_nowait((head, parts))
+        except queue.Full:
+            logger.warning(f"[{self.account_id}] IPC queue is full, message dropped")
+
+
+async def _run_shard(
+        shard: int,
+        accounts: list[AccountProtocol],
+        factory: DispatcherFactory,
+        events: multiprocessing.Queue,
+        stop_event: multiprocessing.Event,
+        pool_opts: PoolOpts,
+):
+    pool = DispatcherPool(pool_opts)
+    for account in accounts:
+        try:
+            dispatcher = factory(account)
+            if inspect.isawaitable(dispatcher):
+                dispatcher = await dispatcher
+        except Exception as e:
+            logger.error(f"[shard {shard}] [{account.id}] Dispatcher create failed: {e}")
+            continue
+        dispatcher.register(_ForwardObserver(account.id, events))
+        try:
+            await pool.add(dispatcher, start=False)
+        except DuplicateSessionError:
+            # Причина уже записана в лог пулом, остальные аккаунты шарда запускаются
+            continue
+
+    await pool.start_all()
+    logger.info(f"[shard {shard}] Started {len(pool)} dispatchers")
+    try:
+        await asyncio.to_thread(stop_event.wait)
+    finally:
+        await pool.close()
+
+
+def _shard_main(*args):
+    asyncio.run(_run_shard(*args))
+
+
+class ShardedRunner:
+    """Распределяет аккаунты по процессам и собирает сообщения от них в родительском процессе"""
+
+    def __init__(
+            self,
+            factory: DispatcherFactory,
+            accounts: typing.Iterable[AccountProtocol],
+            on_message: EventHandler,
+            opts: ShardOpts | None = None,
+    ):
+        self.factory = factory
+        self.on_message = on_message
+        self.opts = opts or ShardOpts()
+
+        self.shards: dict[int, list[AccountProtocol]] = {shard: [] for shard in range(self.opts.workers)}
+        # account_id дубля -> account_id владельца auth key. Пул шарда видит только свои аккаунты,
+        # поэтому дубли в разных шардах отсеиваются здесь
+        self.duplicates: dict[int, int] = {}
+        sessions = SessionIndex()
+        for account in accounts:
+            try:
+                session, _ = decode_session_string(account.session_string)
+            except (ValueError, struct.error):
+                # Неверную строку отклонит фабрика в шарде
+                session = None
+            if session is not None:
+                try:
+                    sessions.add(account.id, session)
+                except DuplicateSessionError as e:
+                    logger.error(f"[{account.id}] Skipped: auth key is already used by account {e.duplicate_of}")
+                    self.duplicates[account.id] = e.duplicate_of
+                    continue
+            self.shards[shard_for(account.id, self.opts.workers)].append(account)
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._events: multiprocessing.Queue = self._ctx.Queue(self.opts.queue_maxsize)
+        self._stop_events: dict[int, multiprocessing.Event] = {}
+        self.processes: dict[int, BaseProcess] = {}
+        self.restarts: dict[int, int] = {shard: 0 for shard in self.shards}
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = False
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    def _spawn(self, shard: int):
+        stop_event = self._ctx.Event()
+        process = self._ctx.Process(
+            target=_shard_main,
+            args=(shard, self.shards[shard], self.factory, self._events, stop_event, self.opts.pool_opts),
+            name=f"tele-bridge-shard-{shard}",
+            daemon=True,
+        )
+        process.start()
+        self._stop_events[shard] = stop_event
+        self.processes[shard] = process
+        logger.info(f"[shard {shard}] Worker started, pid {process.pid}, accounts {len(self.shards[shard])}")
+
+    async def start(self):
+        self._stopping = False
+        for shard, accounts in self.shards.items():
+            if accounts:
+                self._spawn(shard)
+        self._tasks = [
+            asyncio.create_task(self._supervise()),
+            asyncio.create_task(self._read_events()),
+        ]
+
+    async def stop(self, timeout: float = 30):
+        self._stopping = True
+        for stop_event in self._stop_events.values():
+            stop_event.set()
+        for shard, process in self.processes.items():
+            await asyncio.to_thread(process.join, timeout)
+            if process.is_alive():
+                logger.warning(f"[shard {shard}] Worker did not stop in {timeout}s, terminating")
+                process.terminate()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _supervise(self):
+        while not self._stopping:
+            await asyncio.sleep(self.opts.poll_interval)
+            for shard, process in list(self.processes.items()):
+                if process.is_alive() or self._stopping:
+                    continue
+                self.restarts[shard] += 1
+                logger.error(
+                    f"[shard {shard}] Worker exited with code {process.exitcode}. "
+                    f"Restart in {self.opts.restart_delay}s"
+                )
+                await asyncio.sleep(self.opts.restart_delay)
+                if not self._stopping:
+                    self._spawn(shard)
+
+    async def _read_events(self):
+        while True:
+            try:
+                head, parts = await asyncio.to_thread(self._events.get, True, self.opts.poll_interval)
+            except queue.Empty:
+                continue
+            record = MessageRecord.decode(head)
+            try:
+                if parts:
+                    await self.on_message(record, album=[MessageRecord.decode(part) for part in parts])
+                else:
+                    await self.on_message(record)
+            except Exception as e:
+                logger.exception(f"[{record.account_id}] Message event handler failed: {e}")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import typing
 from typing import Type
 
 from aiogram import types as aiogram_types
@@ -7,8 +8,12 @@ from telethon.tl.custom import Message as TelethonMessage
 from telethon.tl.types import MessageMediaPhoto, MessageMediaDocument
 
 from tele_bridge import TelethonClient
-from tele_bridge.bases.client_object import ClientObject
+from tele_bridge.albums import MAX_ALBUM_SIZE
+from tele_bridge.bases.client_object import ClientObject, STREAM_CHUNK_SIZE
+from tele_bridge.media_cache import MediaCache
 from tele_bridge.tele.message import TelethonMessageObject
+from tele_bridge.tele.parallel import ParallelDownloader
+from tele_bridge.tele.resolver import TelethonEntityResolver
 from tele_bridge.tele.try_get import TelethonChatGetterTry
 
 
@@ -17,9 +22,34 @@ class TelethonClientInterface(ClientObject):
     chat_getter_try: Type[TelethonChatGetterTry] = TelethonChatGetterTry
 
     client: TelethonClient
+    # Файлы меньше качаются обычным способом через одно соединение
+    parallel_min_size: int = 10 * 1024 * 1024
 
-    def __init__(self, client: TelethonClient):
-        super().__init__(client)
+    def __init__(
+            self,
+            client: TelethonClient,
+            media_cache: MediaCache | None = None,
+            download_connections: int = 1,
+    ):
+        super().__init__(client, media_cache)
+        self.entity_resolver = TelethonEntityResolver(client)
+        self.parallel_downloader = ParallelDownloader(client, download_connections) if download_connections > 1 else None
+
+    async def close(self):
+        if self.parallel_downloader is not None:
+            await self.parallel_downloader.close()
+
+    def _use_parallel(self, msg: TelethonMessageObject) -> bool:
+        return (
+                self.parallel_downloader is not None
+                and msg.m.document is not None
+                and (msg.get_media_file_size() or 0) >= self.parallel_min_size
+        )
+
+    async def _download_to(self, msg: TelethonMessageObject, path: str) -> str:
+        if self._use_parallel(msg):
+            return await self.parallel_downloader.download(msg.m.media, path)
+        return await self.client.download_media(msg.m.media, file=path)
 
     async def read_history(
             self,
@@ -45,74 +75,115 @@ class TelethonClientInterface(ClientObject):
             link_preview=not disable_web_page_preview,
         )
 
-    async def _get_media_posts_in_group(self, msg: TelethonMessageObject, max_amp=10) -> list[TelethonMessage]:
+    async def _fetch_messages(self, chat_id: int, message_ids: list[int]) -> list[TelethonMessageObject | None]:
+        messages = await self.client.get_messages(chat_id, ids=message_ids)
+        return [TelethonMessageObject(m) if m is not None else None for m in messages]
+
+    async def get_client_media_group(self, msg: TelethonMessageObject) -> list[TelethonMessage]:
         """
-        Searches for Telegram posts that are part of the same group of uploads
-        The search is conducted around the id of the original post with an amplitude
-        of `max_amp` both ways
-        Returns a list of [post] where each post has media and is in the same grouped_id
+        Части альбома сначала ищутся в recent_messages. Если группа там не собрана
+        целиком, одним запросом берутся соседние id в пределах MAX_ALBUM_SIZE от известных частей.
         """
         chat_id = msg.get_chat_id()
         message_id = msg.get_message_id()
         grouped_id = msg.get_media_group_id()
-
-        if grouped_id is None:
-            return [msg] if msg.has_media() is not None else []
-
-        search_ids = [i for i in range(message_id - max_amp, message_id + max_amp + 1)]
-        posts = await self.client.get_messages(chat_id, ids=search_ids)
-        media = []
-        for post in posts:
-            if post is not None and post.grouped_id == grouped_id and post.media is not None:
-                media.append(post)
-        return media
-
-    async def get_client_media_group(self, msg: TelethonMessageObject) -> list[TelethonMessage]:
-        chat_id = msg.get_chat_id()
-        message_id = msg.get_message_id()
         if message_id <= 0:
             raise ValueError("Passed message_id is negative or equal to zero.")
-
-        messages = await self.client.get_messages(
-            chat_id,
-            ids=[msg_id for msg_id in range(message_id - 9, message_id + 10)]
-        )
-
-        # There can be maximum 10 items in a media group.
-        # If/else condition to fix the problem of getting correct `media_group_id` when `message_id` is less than 10.
-        media_group_id = messages[9].grouped_id if len(messages) == 19 else messages[message_id - 1].grouped_id
-
-        messages = [m for m in messages if m]
-
-        if media_group_id is None:
-            raise ValueError("The message doesn't belong to a media group")
-
-        return list(msg for msg in messages if msg.grouped_id == media_group_id)
-
-    async def get_media_group(self, message: TelethonMessageObject) -> list[aiogram_types.InputMedia]:
+        if grouped_id is None:
+            return [msg.m] if msg.has_media() else []
+
+        buffered = self.recent_messages.get_group(chat_id, grouped_id)
+        found: dict[int, TelethonMessage] = {m.get_message_id(): m.m for m in buffered}
+        found[message_id] = msg.m
+        if len(found) < MAX_ALBUM_SIZE and not self.recent_messages.is_sealed(chat_id, grouped_id):
+            await self._widen_media_group(chat_id, grouped_id, found)
+        return [found[post_id] for post_id in sorted(found) if found[post_id].media is not None]
+
+    async def _widen_media_group(self, chat_id: int, grouped_id: int, found: dict[int, TelethonMessage]):
+        # В альбоме не больше MAX_ALBUM_SIZE частей, поэтому окно вокруг известных частей обычно покрывает его целиком
+        lower = max(1, max(found) - MAX_ALBUM_SIZE + 1)
+        upper = min(found) + MAX_ALBUM_SIZE - 1
+        ids = [post_id for post_id in range(lower, upper + 1) if post_id not in found]
+        while ids:
+            posts = await self.client.get_messages(chat_id, ids=ids)
+            for post in posts:
+                if post is not None and post.grouped_id == grouped_id:
+                    found[post.id] = post
+
+            # Расширяем только туда, где крайний id окна ещё из группы (между частями были чужие сообщения)
+            remaining = MAX_ALBUM_SIZE - len(found)
+            if remaining <= 0:
+                return
+            ids = []
+            if lower > 1 and lower in found:
+                ids += range(max(1, lower - remaining), lower)
+                lower = max(1, lower - remaining)
+            if upper in found:
+                ids += range(upper + 1, upper + remaining + 1)
+                upper += remaining
+
+    async def _download_input_media(self, _message: TelethonMessage, spool: bool) -> aiogram_types.InputMedia | None:
+        if isinstance(_message.media, MessageMediaPhoto):
+            filename = "photo.jpg"
+            media_class = aiogram_types.InputMediaPhoto
+        elif isinstance(_message.media, MessageMediaDocument):
+            filename = _message.file.name or f"document{_message.file.ext or ''}"
+            media_class = aiogram_types.InputMediaDocument
+        else:
+            return None
+
+        if spool:
+            path = await self.client.download_media(_message.media, file=self.make_spool_path(filename))
+            buffer = aiogram_types.FSInputFile(path, filename=filename)
+        else:
+            media = await self.client.download_media(_message.media, file=bytes)
+            buffer = aiogram_types.BufferedInputFile(file=media, filename=filename)
+        return media_class(media=buffer)
+
+    async def get_media_group(
+            self,
+            message: TelethonMessageObject,
+            spool: bool = False,
+    ) -> list[aiogram_types.InputMedia]:
         messages = await self.get_client_media_group(message)
-        medias = []
-        for _message in messages:
-            print(_message)
-            if isinstance(_message.media, MessageMediaPhoto):
-                media = await self.client.download_media(_message.media, file=bytes)
-                buffer = aiogram_types.BufferedInputFile(file=media, filename="photo.jpg")
-                medias.append(aiogram_types.InputMediaPhoto(media=buffer))
-            elif isinstance(_message.media, MessageMediaDocument):
-                media = await self.client.download_media(_message.media, file=bytes)
-                buffer = aiogram_types.BufferedInputFile(file=media,
-                                                         filename=_message.media.document.attributes[0].file_name)
-                medias.append(aiogram_types.InputMediaDocument(media=buffer))
-        return medias
+        messages = [
+            _message for _message in messages
+            if not self.is_too_big(_message.file.size if _message.file else None, _message.id)
+        ]
+        medias = await self._gather_downloads(self._download_input_media(_message, spool) for _message in messages)
+        return [media for media in medias if media is not None]
 
     async def download_media(self, file_id: str) -> bytes:
         media = await self.client.download_media(file_id, file=bytes)
         return media
 
     async def download_media_from_msg(self, msg: TelethonMessageObject) -> bytes:
+        cached = await self._cached_download(msg, lambda path: self._download_to(msg, path))
+        if cached is not None:
+            return cached
+        if self._use_parallel(msg):
+            return b"".join([chunk async for chunk in self.parallel_downloader.iter_download(msg.m.media)])
         return await self.client.download_media(msg.m.media, file=bytes)
 
+    async def stream_media(
+            self,
+            msg: TelethonMessageObject,
+            chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> typing.AsyncIterator[bytes]:
+        if not msg.has_media():
+            return
+        if self._use_parallel(msg):
+            async for chunk in self._rechunk(self.parallel_downloader.iter_download(msg.m.media), chunk_size):
+                yield chunk
+            return
+        # Telethon сам собирает части запросов в chunk_size
+        async for chunk in self.client.iter_download(
+                msg.m.media,
+                chunk_size=chunk_size,
+                request_size=min(chunk_size, STREAM_CHUNK_SIZE),
+        ):
+            yield chunk
+
     async def get_media_group_messages(self, message: TelethonMessageObject) -> list[TelethonMessageObject]:
-        # messages = await self.get_client_media_group(message)
-        messages = await self._get_media_posts_in_group(message)
+        messages = await self.get_client_media_group(message)
         return [TelethonMessageObject(m) for m in messages]
@@ -1,11 +1,11 @@
 from __future__ import annotations
-from __future__ import annotations
 
 from aiogram import types as aiogram_types
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from pyrogram import enums as pyro_enums
 from pyrogram import types as pyro_types
 from pyrogram import utils as pyro_utils
+from telethon import utils as telethon_utils
 from telethon.tl.custom import Message as TelethonMessage
 from telethon.tl.types import (
     Poll,
@@ -15,10 +15,12 @@ from telethon.tl.types import (
     User, MessageReplyHeader
 )
 
-from tele_bridge.bases.message import MessageObject
+from tele_bridge.bases.message import MessageObject, memoized
 
 
 class TelethonMessageObjectMixin:
+    __slots__ = ()
+
     @classmethod
     def _parse_poll(cls, message: TelethonMessage) -> pyro_types.Poll | None:
         media_poll = message.poll
@@ -78,41 +80,47 @@ class TelethonMessageObjectMixin:
 
 
 class TelethonMessageObject(MessageObject, TelethonMessageObjectMixin):
+    __slots__ = ()
+    m: TelethonMessage
 
-    def __init__(self, message: TelethonMessage):
-        super().__init__(message)
-        self.m = message
+    def _user_sender(self) -> User | None:
+        # Не кэшируется: отправитель может подгрузиться позже
+        sender = self.m.sender
+        return sender if isinstance(sender, User) else None
 
+    @memoized
     def get_text(self):
         return self.m.raw_text
 
+    @memoized
     def get_html_text(self):
         return self.m.text
 
     def have_from_user(self):
-        if isinstance(self.m.sender, User):
+        if self._user_sender():
             return True
 
     def get_first_name(self):
-        if isinstance(self.m.sender, User):
-            return self.m.sender.first_name
+        if sender := self._user_sender():
+            return sender.first_name
 
     def get_last_name(self):
-        if isinstance(self.m.sender, User):
-            return self.m.sender.last_name
+        if sender := self._user_sender():
+            return sender.last_name
 
     def get_chat_id(self):
         return self.m.chat_id
 
     def get_chat_username(self):
-        return self.m.chat.username
+        # Не кэшируется: у групп (Chat) нет username, чат может подгрузиться позже
+        return getattr(self.m.chat, "username", None)
 
     def get_user_username(self):
-        if isinstance(self.m.sender, User):
-            return self.m.sender.username
+        if sender := self._user_sender():
+            return sender.username
 
     def get_user_id(self):
-        if isinstance(self.m.sender, User):
+        if self._user_sender():
             return self.m.sender_id
 
     def get_message_id(self):
@@ -122,6 +130,12 @@ class TelethonMessageObject(MessageObject, TelethonMessageObjectMixin):
         if isinstance(self.m.reply_to, MessageReplyHeader):
             return self.m.reply_to.reply_to_msg_id
 
+    def get_forward_origin(self) -> tuple[int, int] | None:
+        fwd_from = self.m.fwd_from
+        if fwd_from and fwd_from.from_id and fwd_from.channel_post:
+            return telethon_utils.get_peer_id(fwd_from.from_id), fwd_from.channel_post
+        return None
+
     def get_message_link(self):
         username = self.get_chat_username()
         msg_id = self.get_message_id()
@@ -137,12 +151,14 @@ class TelethonMessageObject(MessageObject, TelethonMessageObjectMixin):
     def get_media_group_id(self):
         return self.m.grouped_id
 
+    @memoized
     def get_poll(self) -> pyro_types.Poll:
         return self._parse_poll(self.m)
 
     def get_media_file_size(self):
         return self.m.file.size if self.m.file else None
 
+    @memoized
     def get_media_file_id(self) -> str | None:
         if self.m.photo:
             return self.m.photo.id
@@ -152,6 +168,7 @@ class TelethonMessageObject(MessageObject, TelethonMessageObjectMixin):
 
         return self.m.file.id if self.m.file else None
 
+    @memoized
     def get_media_type(self):
         media_type = None
         if self.m.photo:
@@ -186,6 +203,15 @@ class TelethonMessageObject(MessageObject, TelethonMessageObjectMixin):
     def get_file_name(self) -> str | None:
         return self.m.file.name if self.m.file else None
 
+    @memoized
+    def get_media_unique_id(self) -> str | None:
+        if self.m.photo:
+            return f"photo:{self.m.photo.id}:{self.m.photo.access_hash}"
+        if self.m.document:
+            return f"document:{self.m.document.id}:{self.m.document.access_hash}"
+        return None
+
+    @memoized
     def get_reply_markup(self) -> aiogram_types.InlineKeyboardButton | None:
         if isinstance(self.m.reply_markup, ReplyInlineMarkup):
             inline_builder = InlineKeyboardBuilder()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import typing
+
+from loguru import logger
+from telethon import functions, types, utils
+from telethon.crypto import AuthKey
+from telethon.network import MTProtoSender
+from telethon.tl.alltlobjects import LAYER
+
+if typing.TYPE_CHECKING:
+    from tele_bridge.tele.client import TelethonClient
+
+# Максимальный размер части в upload.getFile
+PART_SIZE = 512 * 1024
+
+
+class ParallelDownloader:
+    """Скачивает файл по нескольким соединениям к его DC, соединения живут до close()"""
+
+    def __init__(self, client: TelethonClient, connections: int = 4, part_size: int = PART_SIZE):
+        if part_size % 4096 or not 0 < part_size <= PART_SIZE:
+            raise ValueError(f"part_size must be a multiple of 4096 not greater than {PART_SIZE}")
+        self.client = client
+        self.connections = connections
+        self.part_size = part_size
+        self._auth_keys: dict[int, AuthKey] = {}
+        self._senders: dict[int, list[MTProtoSender]] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    def _init_request(self, query) -> functions.InvokeWithLayerRequest:
+        # Копия, чтобы не менять общий _init_request клиента
+        init_request = copy.copy(self.client._init_request)
+        init_request.query = query
+        return functions.InvokeWithLayerRequest(LAYER, init_request)
+
+    async def _create_sender(self, dc_id: int) -> MTProtoSender:
+        if dc_id == self.client.session.dc_id:
+            auth_key = self.client.session.auth_key
+        else:
+            auth_key = self._auth_keys.get(dc_id)
+
+        dc = await self.client._get_dc(dc_id)
+        sender = MTProtoSender(auth_key, loggers=self.client._log)
+        await sender.connect(self.client._connection(
+            dc.ip_address,
+            dc.port,
+            dc.id,
+            loggers=self.client._log,
+            proxy=self.client._proxy,
+            local_addr=self.client._local_addr,
+        ))
+        if auth_key is None:
+            auth = await self.client(functions.auth.ExportAuthorizationRequest(dc_id))
+            await sender.send(self._init_request(
+                functions.auth.ImportAuthorizationRequest(id=auth.id, bytes=auth.bytes)
+            ))
+            self._auth_keys[dc_id] = sender.auth_key
+        else:
+            await sender.send(self._init_request(functions.help.GetConfigRequest()))
+        return sender
+
+    async def _get_senders(self, dc_id: int, count: int) -> list[MTProtoSender]:
+        async with self._locks.setdefault(dc_id, asyncio.Lock()):
+            senders = self._senders.setdefault(dc_id, [])
+            senders[:] = [sender for sender in senders if sender.is_connected()]
+            missing = count - len(senders)
+            if missing > 0 and dc_id not in self._auth_keys and dc_id != self.client.session.dc_id:
+                # Первое соединение экспортирует авторизацию, остальные берут его ключ
+                senders.append(await self._create_sender(dc_id))
+                missing -= 1
+            if missing > 0:
+                senders.extend(await asyncio.gather(*(self._create_sender(dc_id) for _ in range(missing))))
+                logger.debug(f"Opened {len(senders)} download connections to DC {dc_id}")
+            return senders[:count]
+
+    async def iter_download(self, media, file_size: int | None = None) -> typing.AsyncIterator[bytes]:
+        info = utils._get_file_info(media)
+        dc_id = info.dc_id or self.client.session.dc_id
+        file_size = file_size or info.size
+        if not file_size:
+            raise ValueError("File size is unknown, parallel download is not possible")
+
+        parts = (file_size + self.part_size - 1) // self.part_size
+        senders = await self._get_senders(dc_id, min(self.connections, parts))
+        loop = asyncio.get_running_loop()
+        results = [loop.create_future() for _ in range(parts)]
+        indexes = iter(range(parts))
+        window = asyncio.Semaphore(2 * len(senders))
+
+        async def worker(sender: MTProtoSender):
+            while True:
+                # Слот берётся до номера части, иначе старшие части могут занять всё окно
+                await window.acquire()
+                index = next(indexes, None)
+                if index is None:
+                    window.release()
+                    return
+                request = functions.upload.GetFileRequest(
+                    info.location,
+                    offset=index * self.part_size,
+                    limit=self.part_size,
+                )
+                try:
+                    result = await self.client._call(sender, request)
+                    if not isinstance(result, types.upload.File):
+                        raise TypeError(f"Unexpected getFile result {type(result).__name__}")
+                except Exception as e:
+                    results[index].set_exception(e)
+                    return
+                results[index].set_result(result.bytes)
+
+        workers = [asyncio.create_task(worker(sender)) for sender in senders]
+        try:
+            for result in results:
+                yield await result
+                window.release()
+        finally:
+            for task in workers:
+                task.cancel()
+            for result in results:
+                if result.done() and not result.cancelled():
+                    result.exception()
+                else:
+                    result.cancel()
+
+    async def download(self, media, file: str | typing.BinaryIO, file_size: int | None = None) -> str | typing.BinaryIO:
+        """file - путь или открытый бинарный файл"""
+        if isinstance(file, str):
+            with open(file, "wb") as f:
+                await self.download(media, f, file_size)
+            return file
+        async for chunk in self.iter_download(media, file_size):
+            file.write(chunk)
+        return file
+
+    async def close(self):
+        for senders in self._senders.values():
+            for sender in senders:
+                await sender.disconnect()
+        self._senders.clear()
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import typing
+
+from cachetools import TTLCache
+from loguru import logger
+from telethon import functions, types, utils
+
+if typing.TYPE_CHECKING:
+    from tele_bridge.tele.client import TelethonClient
+
+PeerID = int
+
+
+class TelethonEntityResolver:
+    """
+    Чаты и пользователи аккаунта. Одновременные запросы одного пира объединяются,
+    промахи копятся window секунд и запрашиваются одним вызовом на тип пира.
+    """
+
+    def __init__(
+            self,
+            client: TelethonClient,
+            window: float = 0.05,
+            batch_size: int = 100,
+            maxsize: int = 10_000,
+            ttl: int = 60 * 60,
+    ):
+        self.client = client
+        self.window = window
+        self.batch_size = batch_size
+        self.cache: TTLCache[PeerID, typing.Any] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: dict[PeerID, asyncio.Future] = {}
+        self._pending: dict[PeerID, types.TypeInputPeer] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    def get_cached(self, peer_id: PeerID):
+        return self.cache.get(peer_id)
+
+    def remember(self, entity):
+        # UserEmpty - пользователь недоступен, его future завершится ошибкой и сработает запасной путь
+        if entity is not None and not isinstance(entity, types.UserEmpty) and not getattr(entity, "min", False):
+            self.cache[utils.get_peer_id(entity)] = entity
+
+    async def resolve(self, input_peer: types.TypeInputPeer):
+        peer_id = utils.get_peer_id(input_peer)
+        if (entity := self.cache.get(peer_id)) is not None:
+            return entity
+
+        future = self._inflight.get(peer_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[peer_id] = future
+            self._pending[peer_id] = input_peer
+            if self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush())
+                self._flush_task.add_done_callback(self._flush_done)
+        return await asyncio.shield(future)
+
+    def _take_pending(self) -> tuple[dict[PeerID, asyncio.Future], dict[PeerID, types.TypeInputPeer]]:
+        """Забирает накопленные пиры вместе с их future"""
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+        return {peer_id: self._inflight[peer_id] for peer_id in pending if peer_id in self._inflight}, pending
+
+    def _fail_pending(self, futures: dict[PeerID, asyncio.Future]):
+        """Ожидающие не должны висеть вечно, если запрос отменён или упал с BaseException"""
+        for peer_id, future in futures.items():
+            if future.done():
+                continue
+            if self._inflight.get(peer_id) is future:
+                del self._inflight[peer_id]
+            future.set_exception(ConnectionError(f"Resolve of peer {peer_id} was interrupted"))
+            future.exception()
+
+    def _flush_done(self, task: asyncio.Task):
+        # Задача, отменённая до первого шага, не выполняет finally в _flush
+        if self._flush_task is task:
+            futures, _ = self._take_pending()
+            self._fail_pending(futures)
+
+    async def _flush(self):
+        futures: dict[PeerID, asyncio.Future] = {}
+        try:
+            await asyncio.sleep(self.window)
+            futures, pending = self._take_pending()
+
+            users, channels, chats = {}, {}, {}
+            for peer_id, input_peer in pending.items():
+                if isinstance(input_peer, (types.InputPeerUser, types.InputPeerUserFromMessage)):
+                    users[peer_id] = utils.get_input_user(input_peer)
+                elif isinstance(input_peer, (types.InputPeerChannel, types.InputPeerChannelFromMessage)):
+                    channels[peer_id] = utils.get_input_channel(input_peer)
+                elif isinstance(input_peer, types.InputPeerChat):
+                    chats[peer_id] = input_peer.chat_id
+                else:
+                    self._set_result(peer_id, exception=TypeError(f"Cannot resolve {type(input_peer).__name__}"))
+
+            await asyncio.gather(
+                self._fetch(users, self._get_users),
+                self._fetch(channels, self._get_channels),
+                self._fetch(chats, self._get_chats),
+            )
+        finally:
+            self._fail_pending(futures)
+
+    async def _fetch(self, peers: dict[PeerID, typing.Any], request: typing.Callable):
+        peer_ids = list(peers)
+        for i in range(0, len(peer_ids), self.batch_size):
+            chunk = peer_ids[i:i + self.batch_size]
+            try:
+                entities = await request([peers[peer_id] for peer_id in chunk])
+            except Exception as e:
+                logger.warning(f"Batch resolve of {len(chunk)} peers failed: {e}")
+                for peer_id in chunk:
+                    self._set_result(peer_id, exception=e)
+                continue
+
+            for entity in entities:
+                self.remember(entity)
+            for peer_id in chunk:
+                entity = self.cache.get(peer_id)
+                if entity is None:
+                    self._set_result(peer_id, exception=ValueError(f"Peer {peer_id} not resolved"))
+                else:
+                    self._set_result(peer_id, entity)
+
+    def _set_result(self, peer_id: PeerID, entity=None, exception: Exception | None = None):
+        future = self._inflight.pop(peer_id, None)
+        if future is None or future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+            # Все ожидающие могли быть отменены, помечаем исключение полученным
+            future.exception()
+        else:
+            future.set_result(entity)
+
+    async def _get_users(self, input_users: list[types.TypeInputUser]) -> list:
+        return await self.client(functions.users.GetUsersRequest(input_users))
+
+    async def _get_channels(self, input_channels: list[types.TypeInputChannel]) -> list:
+        result = await self.client(functions.channels.GetChannelsRequest(input_channels))
+        return result.chats
+
+    async def _get_chats(self, chat_ids: list[int]) -> list:
+        result = await self.client(functions.messages.GetChatsRequest(chat_ids))
+        return result.chats
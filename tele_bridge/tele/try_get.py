@@ -1,41 +1,31 @@
 from __future__ import annotations
 
-import typing
-
-from cachetools import TTLCache
-from loguru import logger
 from telethon.errors import ChannelPrivateError
 
-from tele_bridge.bases.try_get import ChatGetterTry
+from tele_bridge.bases.try_get import ChatGetterTry, GET_CHAT_ERRORS_BLOCKED_DISPATCHERS  # noqa: F401
 from tele_bridge.tele.message import TelethonMessageObject
+from tele_bridge.tele.resolver import TelethonEntityResolver
 
 UserID = ChatID = int
-GET_CHAT_ERRORS_BLOCKED_DISPATCHERS = TTLCache(maxsize=1000, ttl=60 * 3)
 
 
 class TelethonChatGetterTry(ChatGetterTry):
-
-    def __init__(
-            self,
-            get_type: typing.Literal["chat", "sender"],
-            account_id: int
-    ):
-        super().__init__(get_type, account_id)
-        self.get_chat_errors = TTLCache(maxsize=5000, ttl=60 * 5)
-        self.get_input_chat_errors = TTLCache(maxsize=5000, ttl=60 * 3)
-        self.global_error_count = 0
-
-    def clear_cache(self):
-        self.get_chat_errors.clear()
-        self.get_input_chat_errors.clear()
-        self.global_error_count = 0
+    resolver: TelethonEntityResolver | None
 
     async def try_get_chat(self, message: TelethonMessageObject):
         message = message.m
-        if GET_CHAT_ERRORS_BLOCKED_DISPATCHERS.get(self.account_id):
+        if self.is_blocked():
             return
-        chat_id = message.chat_id
+        chat_id = message.chat_id if self.get_type == "chat" else message.sender_id
         get_chat_errors = self.get_chat_errors.get(chat_id)
+        if self.resolver is not None and chat_id is not None and not get_chat_errors:
+            try:
+                return await self._resolve(message, chat_id)
+            except Exception:
+                self.get_chat_errors[chat_id] = True
+                self.global_error_count += 1
+                get_chat_errors = True
+
         if not get_chat_errors:
             try:
                 # return await message.get_chat()
@@ -59,7 +49,20 @@ class TelethonChatGetterTry(ChatGetterTry):
                 self.get_input_chat_errors[chat_id] = True
                 self.global_error_count += 1
 
-        if self.global_error_count > 50:
-            logger.warning(f"{self.account_id}. Too many errors. Self blocked get chat for 3 minutes")
-            GET_CHAT_ERRORS_BLOCKED_DISPATCHERS[self.account_id] = True
-            self.global_error_count = 0
+        self._check_errors()
+
+    async def _resolve(self, message, peer_id: int):
+        entity = getattr(message, self.get_type)
+        if entity is not None and not getattr(entity, "min", False):
+            self.resolver.remember(entity)
+            return entity
+
+        entity = self.resolver.get_cached(peer_id)
+        if entity is None:
+            input_peer = getattr(message, f"input_{self.get_type}")
+            if input_peer is None:
+                input_peer = await getattr(message, f"get_input_{self.get_type}")()
+            entity = await self.resolver.resolve(input_peer)
+        # Так message.chat / message.sender не будут запрашивать сущность повторно
+        setattr(message, f"_{self.get_type}", entity)
+        return entity
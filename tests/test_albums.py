@@ -0,0 +1,106 @@
+import asyncio
+
+from tele_bridge.albums import MAX_ALBUM_SIZE, MediaGroupAggregator
+from tele_bridge.intake import IntakeOpts, MessageIntake
+
+
+class FakeMessage:
+    def __init__(self, message_id: int, media_group_id: int | None = None, chat_id: int = 1, text: str | None = None):
+        self.message_id = message_id
+        self.media_group_id = media_group_id
+        self.chat_id = chat_id
+        self.text = text
+
+    def get_message_id(self):
+        return self.message_id
+
+    def get_media_group_id(self):
+        return self.media_group_id
+
+    def get_chat_id(self):
+        return self.chat_id
+
+    def get_text(self):
+        return self.text
+
+
+def test_not_an_album():
+    async def main():
+        aggregator = MediaGroupAggregator(lambda messages: None, window=0.01)
+        assert not aggregator.add(FakeMessage(1))
+
+    asyncio.run(main())
+
+
+def test_album_window():
+    albums = []
+
+    async def handler(messages):
+        albums.append([m.get_message_id() for m in messages])
+
+    async def main():
+        aggregator = MediaGroupAggregator(handler, window=0.05)
+        for message_id in (3, 1, 2):
+            assert aggregator.add(FakeMessage(message_id, media_group_id=10))
+        assert not albums
+        await asyncio.sleep(0.1)
+        # Опоздавшая часть уже отданного альбома забирается и отбрасывается
+        assert aggregator.add(FakeMessage(4, media_group_id=10))
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert albums == [[1, 2, 3]]
+
+
+def test_full_album_emitted_immediately():
+    albums = []
+
+    async def handler(messages):
+        albums.append(len(messages))
+
+    async def main():
+        aggregator = MediaGroupAggregator(handler, window=60)
+        for message_id in range(MAX_ALBUM_SIZE):
+            aggregator.add(FakeMessage(message_id, media_group_id=10))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await aggregator.stop()
+
+    asyncio.run(main())
+    assert albums == [MAX_ALBUM_SIZE]
+
+
+def test_flush_and_stop():
+    albums = []
+
+    async def handler(messages):
+        albums.append(messages[0].get_media_group_id())
+
+    async def main():
+        aggregator = MediaGroupAggregator(handler, window=60)
+        aggregator.add(FakeMessage(1, media_group_id=10))
+        await aggregator.stop(flush=True)
+        aggregator.add(FakeMessage(2, media_group_id=20))
+        await aggregator.stop()
+
+    asyncio.run(main())
+    assert albums == [10]
+
+
+def test_album_goes_through_chat_worker():
+    calls = []
+
+    async def handler(message, album=None):
+        calls.append((message.get_message_id(), album and [m.get_message_id() for m in album]))
+
+    async def main():
+        intake = MessageIntake(handler, IntakeOpts(workers=2, report_interval=0))
+        intake.start()
+        parts = [FakeMessage(1, media_group_id=10), FakeMessage(2, media_group_id=10)]
+        await intake.put(FakeMessage(0))
+        await intake.put(parts[0], album=parts)
+        await intake.put(FakeMessage(3))
+        await intake.stop(drain=True)
+
+    asyncio.run(main())
+    assert calls == [(0, None), (1, [1, 2]), (3, None)]
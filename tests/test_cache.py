@@ -0,0 +1,187 @@
+import asyncio
+
+import pytest
+
+from tele_bridge.cache import MethodCache, cached_method
+
+
+class Loader:
+    def __init__(self, delay: float = 0.01, error: Exception | None = None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.calls
+
+
+def test_single_flight():
+    cache = MethodCache(maxsize=10, ttl=60)
+    loader = Loader()
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(5)))
+
+    assert asyncio.run(main()) == [1] * 5
+    assert loader.calls == 1
+    assert (cache.stats.misses, cache.stats.hits) == (5, 0)
+
+
+def test_hit_after_load():
+    cache = MethodCache(maxsize=10, ttl=60)
+    loader = Loader(delay=0)
+
+    async def main():
+        await cache.get_or_load("key", loader)
+        return await cache.get_or_load("key", loader)
+
+    assert asyncio.run(main()) == 1
+    assert (cache.stats.misses, cache.stats.hits) == (1, 1)
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    cache = MethodCache(maxsize=10, ttl=60)
+    loader = Loader(delay=0.05)
+
+    async def main():
+        first = asyncio.ensure_future(cache.get_or_load("key", loader))
+        second = asyncio.ensure_future(cache.get_or_load("key", loader))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        value = await second
+        assert first.cancelled()
+        return value, await cache.get_or_load("key", loader)
+
+    assert asyncio.run(main()) == (1, 1)
+    assert loader.calls == 1
+
+
+def test_error_is_not_cached():
+    cache = MethodCache(maxsize=10, ttl=60)
+    loader = Loader(error=ConnectionError("network"))
+
+    async def main():
+        results = await asyncio.gather(
+            cache.get_or_load("key", loader),
+            cache.get_or_load("key", loader),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, ConnectionError) for result in results)
+        loader.error = None
+        return await cache.get_or_load("key", loader)
+
+    assert asyncio.run(main()) == 2
+    assert loader.calls == 2
+
+
+def test_stale_while_revalidate():
+    cache = MethodCache(maxsize=10, ttl=0.05, stale_ttl=60)
+    loader = Loader(delay=0.01)
+
+    async def main():
+        first = await cache.get_or_load("key", loader)
+        await asyncio.sleep(0.07)
+        stale = await cache.get_or_load("key", loader)
+        # Пока идёт обновление, второй запрос не запускает ещё одно
+        also_stale = await cache.get_or_load("key", loader)
+        await asyncio.sleep(0.02)
+        fresh = await cache.get_or_load("key", loader)
+        return first, stale, also_stale, fresh
+
+    assert asyncio.run(main()) == (1, 1, 1, 2)
+    assert loader.calls == 2
+    assert (cache.stats.stale_hits, cache.stats.refreshes, cache.stats.hits) == (2, 1, 1)
+
+
+def test_failed_refresh_keeps_stale_value():
+    cache = MethodCache(maxsize=10, ttl=0.01, stale_ttl=60)
+    loader = Loader(delay=0)
+
+    async def main():
+        await cache.get_or_load("key", loader)
+        await asyncio.sleep(0.02)
+        loader.error = ConnectionError("network")
+        stale = await cache.get_or_load("key", loader)
+        await asyncio.sleep(0.01)
+        return stale, await cache.get_or_load("key", loader)
+
+    assert asyncio.run(main()) == (1, 1)
+
+
+def test_evictions():
+    cache = MethodCache(maxsize=2, ttl=60)
+
+    async def main():
+        for key in range(5):
+            await cache.get_or_load(key, Loader(delay=0))
+
+    asyncio.run(main())
+    assert len(cache) == 2
+    assert cache.stats.evictions == 3
+
+
+def test_cached_method():
+    class Service:
+        def __init__(self):
+            self.cache = MethodCache(maxsize=10, ttl=60)
+            self.calls = 0
+
+        @cached_method("cache", "double")
+        async def double(self, value):
+            self.calls += 1
+            return value * 2
+
+    service = Service()
+
+    async def main():
+        return [await service.double(2), await service.double(2), await service.double(value=3)]
+
+    assert asyncio.run(main()) == [4, 4, 6]
+    assert service.calls == 2
+
+
+def test_invalidate():
+    cache = MethodCache(maxsize=10, ttl=60)
+    loader = Loader(delay=0)
+
+    async def main():
+        await cache.get_or_load("key", loader)
+        cache.invalidate("key")
+        return await cache.get_or_load("key", loader)
+
+    assert asyncio.run(main()) == 2
+
+
+@pytest.mark.parametrize("stale_ttl", [0, 60])
+def test_worker_survives_cancelled_waiter(stale_ttl):
+    """Воркер, ждущий тот же ключ, что и отменённый вызывающий, продолжает работу"""
+    cache = MethodCache(maxsize=10, ttl=60, stale_ttl=stale_ttl)
+    loader = Loader(delay=0.05)
+    processed = []
+
+    async def worker(queue: asyncio.Queue):
+        while True:
+            key = await queue.get()
+            processed.append(await cache.get_or_load(key, loader))
+            queue.task_done()
+
+    async def main():
+        queue = asyncio.Queue()
+        task = asyncio.create_task(worker(queue))
+        caller = asyncio.ensure_future(cache.get_or_load("key", loader))
+        await asyncio.sleep(0)
+        queue.put_nowait("key")
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        queue.put_nowait("key")
+        await asyncio.wait_for(queue.join(), 1)
+        alive = not task.done()
+        task.cancel()
+        return alive
+
+    assert asyncio.run(main())
+    assert processed == [1, 1]
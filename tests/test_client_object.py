@@ -0,0 +1,91 @@
+import asyncio
+
+from pyrogram import enums as pyro_enums
+from pyrogram import types as pyro_types
+
+from tele_bridge.pyro.client_object import PyrogramClientInterface
+from tele_bridge.pyro.message import PyrogramMessageObject
+from tele_bridge.tele.client_object import TelethonClientInterface
+from tele_bridge.tele.message import TelethonMessageObject
+from tests.test_message import make_message
+
+
+class FakeSender:
+    def __init__(self):
+        self.connected = True
+
+    async def disconnect(self):
+        self.connected = False
+
+
+def test_close_disconnects_parallel_senders():
+    client_object = TelethonClientInterface(None, download_connections=2)
+    senders = [FakeSender(), FakeSender()]
+    client_object.parallel_downloader._senders[2] = senders
+
+    asyncio.run(client_object.close())
+    assert not any(sender.connected for sender in senders)
+    assert not client_object.parallel_downloader._senders
+
+
+def test_close_without_parallel_downloader():
+    client_object = TelethonClientInterface(None)
+    assert client_object.parallel_downloader is None
+    asyncio.run(client_object.close())
+
+
+def test_fetched_messages_are_not_buffered_as_recent():
+    client_object = TelethonClientInterface(None)
+    fetched = []
+
+    async def fetch_messages(chat_id, message_ids):
+        fetched.append(message_ids)
+        return [TelethonMessageObject(make_message()) if message_id == 7 else None for message_id in message_ids]
+
+    client_object._fetch_messages = fetch_messages
+
+    async def main():
+        first = await client_object.get_messages(-42, [7, 8])
+        second = await client_object.get_messages(-42, [8, 7])
+        return first, second
+
+    (message, deleted), (deleted_again, cached) = asyncio.run(main())
+    assert message is cached and deleted is None and deleted_again is None
+    assert fetched == [[7, 8]]
+    assert client_object.recent_messages.get(-42, 7) is None
+    assert client_object.resolved_messages[(-42, 7)] is message
+
+
+class FakePyrogramClient:
+    def __init__(self, sizes: list[int]):
+        self.sizes = sizes
+
+    async def stream_media(self, message):
+        for index, size in enumerate(self.sizes):
+            yield bytes([index]) * size
+
+
+def stream_pyrogram(sizes: list[int], chunk_size: int, media=pyro_enums.MessageMediaType.DOCUMENT) -> list[bytes]:
+    client_object = PyrogramClientInterface(FakePyrogramClient(sizes))
+    message = PyrogramMessageObject(pyro_types.Message(id=1, media=media))
+
+    async def main():
+        return [chunk async for chunk in client_object.stream_media(message, chunk_size=chunk_size)]
+
+    return asyncio.run(main())
+
+
+def test_pyrogram_stream_rechunks():
+    mb = 1024 * 1024
+    sizes = [mb, mb, mb // 2]
+    chunks = stream_pyrogram(sizes, chunk_size=768 * 1024)
+    assert [len(chunk) for chunk in chunks] == [768 * 1024] * 3 + [256 * 1024]
+    assert b"".join(chunks) == b"".join(bytes([index]) * size for index, size in enumerate(sizes))
+
+    # Куски больше части Pyrogram склеиваются из нескольких частей
+    chunks = stream_pyrogram(sizes, chunk_size=2 * mb)
+    assert [len(chunk) for chunk in chunks] == [2 * mb, mb // 2]
+
+
+def test_pyrogram_stream_without_media():
+    assert stream_pyrogram([1024], chunk_size=512, media=None) == []
@@ -0,0 +1,102 @@
+import asyncio
+import base64
+import struct
+
+from pyrogram.storage import MemoryStorage
+
+from tele_bridge.sessions.converter import (
+    PYROGRAM_FORMATS,
+    ConvertedSession,
+    SessionError,
+    SessionFormat,
+    decode_pyrogram_string,
+    decode_session_string,
+    dc_address,
+    iter_convert,
+    iter_convert_file,
+)
+from tele_bridge.sessions.tele_bridge_session import TeleBridgeSession
+
+AUTH_KEY = bytes(range(256))
+
+
+def pyrogram_string(session_format: SessionFormat, dc_id: int = 2, user_id: int = 12345, is_bot: bool = False) -> str:
+    layout = next(layout for known, layout in PYROGRAM_FORMATS.values() if known is session_format)
+    if session_format is SessionFormat.PYROGRAM:
+        packed = layout.pack(dc_id, 777, False, AUTH_KEY, user_id, is_bot)
+    else:
+        packed = layout.pack(dc_id, False, AUTH_KEY, user_id, is_bot)
+    return base64.urlsafe_b64encode(packed).decode().rstrip("=")
+
+
+def test_pyrogram_formats():
+    for session_format in (SessionFormat.PYROGRAM_OLD, SessionFormat.PYROGRAM_OLD_64, SessionFormat.PYROGRAM):
+        session, detected = decode_pyrogram_string(pyrogram_string(session_format, dc_id=4, is_bot=True))
+        assert detected is session_format
+        assert (session.dc_id, session.auth_key, session.user_id, session.is_bot) == (4, AUTH_KEY, 12345, True)
+        assert (session.ip, session.port) == dc_address(4)
+    session, _ = decode_pyrogram_string(pyrogram_string(SessionFormat.PYROGRAM))
+    assert session.api_id == 777
+
+
+def test_pyrogram_matches_memory_storage():
+    session_string = pyrogram_string(SessionFormat.PYROGRAM, dc_id=5, user_id=2 ** 40)
+    session, _ = decode_pyrogram_string(session_string)
+
+    async def load():
+        storage = MemoryStorage("test", session_string)
+        await storage.open()
+        try:
+            return await storage.dc_id(), await storage.auth_key(), await storage.user_id(), await storage.api_id()
+        finally:
+            await storage.close()
+
+    assert asyncio.run(load()) == (session.dc_id, session.auth_key, session.user_id, session.api_id)
+
+
+def test_pyrogram_round_trip():
+    session = TeleBridgeSession(dc_id=1, auth_key=AUTH_KEY, ip="", port=0, api_id=5, user_id=42)
+    decoded, session_format = decode_pyrogram_string(session.to_pyrogram_string())
+    assert session_format is SessionFormat.PYROGRAM
+    assert (decoded.dc_id, decoded.auth_key, decoded.api_id, decoded.user_id) == (1, AUTH_KEY, 5, 42)
+
+
+def test_detects_format():
+    telethon_string = decode_pyrogram_string(pyrogram_string(SessionFormat.PYROGRAM))[0].to_telethon_string()
+    assert decode_session_string(telethon_string)[1] is SessionFormat.TELETHON
+    assert decode_session_string(pyrogram_string(SessionFormat.PYROGRAM_OLD))[1] is SessionFormat.PYROGRAM_OLD
+
+
+def test_errors():
+    bad_dc = base64.urlsafe_b64encode(
+        struct.pack(">BI?256sQ?", 99, 1, False, AUTH_KEY, 1, False)
+    ).decode().rstrip("=")
+    bad_base64 = "!" * 362
+    results = list(iter_convert(["short", bad_base64, bad_dc, pyrogram_string(SessionFormat.PYROGRAM)]))
+    assert [type(result) for result in results] == [SessionError, SessionError, SessionError, ConvertedSession]
+    assert "length" in results[0].reason
+    assert "base64" in results[1].reason
+    assert "DC" in results[2].reason
+    assert results[3].index == 3
+
+
+def test_convert_to_telethon():
+    result, = iter_convert([pyrogram_string(SessionFormat.PYROGRAM_OLD_64)], to="telethon")
+    assert result.format is SessionFormat.PYROGRAM_OLD_64
+    assert decode_session_string(result.output)[0].auth_key == AUTH_KEY
+
+
+def test_convert_file(tmp_path):
+    path = tmp_path / "sessions.txt"
+    path.write_text(f"{pyrogram_string(SessionFormat.PYROGRAM)}\n\nbroken\n")
+    results = list(iter_convert_file(path, to="pyrogram"))
+    assert [result.index for result in results] == [0, 2]
+    assert isinstance(results[0], ConvertedSession) and results[0].output
+    assert isinstance(results[1], SessionError)
+
+
+def test_bulk_convert():
+    strings = [pyrogram_string(SessionFormat.PYROGRAM, dc_id=i % 5 + 1, user_id=i) for i in range(10_000)]
+    results = list(iter_convert(strings, to="telethon"))
+    assert all(isinstance(result, ConvertedSession) for result in results)
+    assert [result.session.user_id for result in results] == list(range(10_000))
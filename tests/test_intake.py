@@ -0,0 +1,143 @@
+import asyncio
+
+from tele_bridge.intake import IntakeOpts, MessageIntake, OverflowPolicy
+from tests.test_albums import FakeMessage
+
+
+def run_intake(opts: IntakeOpts, messages: list[FakeMessage], delay: float = 0) -> tuple[list[int], MessageIntake]:
+    processed = []
+
+    async def handler(message):
+        if delay:
+            await asyncio.sleep(delay)
+        processed.append(message.get_message_id())
+
+    async def main():
+        intake = MessageIntake(handler, opts)
+        # Очередь заполняется до старта воркеров, чтобы сработала политика переполнения
+        for message in messages:
+            await intake.put(message)
+        intake.start()
+        await intake.stop(drain=True)
+        return intake
+
+    return processed, asyncio.run(main())
+
+
+def test_default_policy_is_block():
+    assert IntakeOpts().overflow == OverflowPolicy.BLOCK
+
+
+def test_drop_oldest():
+    opts = IntakeOpts(workers=1, maxsize=3, overflow=OverflowPolicy.DROP_OLDEST, report_interval=0)
+    processed, intake = run_intake(opts, [FakeMessage(i) for i in range(5)])
+    assert processed == [2, 3, 4]
+    assert intake.stats.dropped == 2
+    assert intake.stats.received == 5
+
+
+def test_spill_keeps_order():
+    opts = IntakeOpts(workers=1, maxsize=2, overflow=OverflowPolicy.SPILL, spill_maxsize=10, report_interval=0)
+    processed, intake = run_intake(opts, [FakeMessage(i) for i in range(6)])
+    assert processed == list(range(6))
+    assert intake.stats.spilled == 4
+    assert intake.stats.dropped == 0
+    assert intake.depth == 0
+
+
+def test_spill_overflow_drops_oldest_spilled():
+    opts = IntakeOpts(workers=1, maxsize=1, overflow=OverflowPolicy.SPILL, spill_maxsize=2, report_interval=0)
+    processed, intake = run_intake(opts, [FakeMessage(i) for i in range(5)])
+    assert processed == [0, 3, 4]
+    assert intake.stats.dropped == 2
+
+
+def test_block_waits_for_free_slot():
+    processed = []
+
+    async def handler(message):
+        processed.append(message.get_message_id())
+
+    async def main():
+        intake = MessageIntake(handler, IntakeOpts(workers=1, maxsize=1, report_interval=0))
+        await intake.put(FakeMessage(0))
+        blocked = asyncio.create_task(intake.put(FakeMessage(1)))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        intake.start()
+        await blocked
+        await intake.stop(drain=True)
+
+    asyncio.run(main())
+    assert processed == [0, 1]
+
+
+def test_per_chat_order_with_several_workers():
+    messages = [FakeMessage(i, chat_id=i % 3) for i in range(30)]
+    processed, intake = run_intake(IntakeOpts(workers=4, report_interval=0), messages, delay=0.001)
+    for chat_id in range(3):
+        chat_messages = [message_id for message_id in processed if message_id % 3 == chat_id]
+        assert chat_messages == sorted(chat_messages)
+    assert sorted(processed) == list(range(30))
+    assert intake.stats.processed == 30
+
+
+def test_handler_error_does_not_stop_worker():
+    processed = []
+
+    async def handler(message):
+        if message.get_message_id() == 1:
+            raise RuntimeError("broken")
+        processed.append(message.get_message_id())
+
+    async def main():
+        intake = MessageIntake(handler, IntakeOpts(workers=1, report_interval=0))
+        intake.start()
+        for i in range(3):
+            await intake.put(FakeMessage(i))
+        await intake.stop(drain=True)
+        return intake
+
+    intake = asyncio.run(main())
+    assert processed == [0, 2]
+    assert intake.stats.failed == 1
+
+
+def test_handler_cancelled_error_does_not_stop_worker():
+    processed = []
+
+    async def handler(message):
+        if message.get_message_id() == 1:
+            raise asyncio.CancelledError
+        processed.append(message.get_message_id())
+
+    async def main():
+        intake = MessageIntake(handler, IntakeOpts(workers=1, maxsize=1, report_interval=0))
+        intake.start()
+        for i in range(4):
+            await intake.put(FakeMessage(i))
+        await intake.stop(drain=True)
+        return intake
+
+    intake = asyncio.run(main())
+    assert processed == [0, 2, 3]
+    assert intake.stats.failed == 1
+
+
+def test_stop_cancels_busy_worker():
+    async def main():
+        event = asyncio.Event()
+
+        async def handler(message):
+            event.set()
+            await asyncio.sleep(60)
+
+        intake = MessageIntake(handler, IntakeOpts(workers=1, report_interval=0))
+        intake.start()
+        await intake.put(FakeMessage(0))
+        await event.wait()
+        await asyncio.wait_for(intake.stop(), 1)
+        return intake
+
+    intake = asyncio.run(main())
+    assert not intake.running
@@ -0,0 +1,66 @@
+import random
+import string
+
+from tele_bridge.keywords import KeywordMatcher
+
+
+def test_match_owners():
+    matcher = KeywordMatcher()
+    matcher.add("crypto", ["bitcoin", "ETH"])
+    matcher.add("jobs", ["вакансия", "python"])
+    assert matcher.match("Куплю Bitcoin, eth по курсу") == {"crypto"}
+    assert matcher.match("ВАКАНСИЯ: Python разработчик") == {"jobs"}
+    assert matcher.match("nothing here") == set()
+    assert matcher.match(None) == set()
+
+
+def test_overlapping_keywords():
+    matcher = KeywordMatcher()
+    matcher.add(1, ["he"])
+    matcher.add(2, ["she"])
+    matcher.add(3, ["hers"])
+    matcher.add(4, ["his"])
+    assert matcher.match("ushers") == {1, 2, 3}
+
+
+def test_shared_keyword():
+    matcher = KeywordMatcher()
+    matcher.add(1, ["sale"])
+    matcher.add(2, ["sale", "discount"])
+    assert matcher.match("big sale") == {1, 2}
+    matcher.remove(1)
+    assert matcher.match("big sale") == {2}
+
+
+def test_add_replaces_keywords():
+    matcher = KeywordMatcher()
+    matcher.add(1, ["old"])
+    assert matcher.match("old text") == {1}
+    matcher.add(1, ["new", ""])
+    assert matcher.match("old text") == set()
+    assert matcher.match("new text") == {1}
+    assert len(matcher) == 1
+
+
+def test_remove_all():
+    matcher = KeywordMatcher()
+    matcher.add(1, ["word"])
+    matcher.remove(1)
+    matcher.remove(2)
+    assert not matcher
+    assert matcher.match("word") == set()
+
+
+def test_many_keywords_match_naive_search():
+    rnd = random.Random(0)
+    alphabet = string.ascii_lowercase[:6]
+    matcher = KeywordMatcher()
+    keywords = {}
+    for owner in range(10_000):
+        keywords[owner] = ["".join(rnd.choices(alphabet, k=rnd.randint(3, 8))) for _ in range(2)]
+        matcher.add(owner, keywords[owner])
+
+    for _ in range(20):
+        text = "".join(rnd.choices(alphabet + " ", k=300))
+        expected = {owner for owner, words in keywords.items() if any(word in text for word in words)}
+        assert matcher.match(text) == expected
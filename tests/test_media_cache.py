@@ -0,0 +1,101 @@
+import asyncio
+
+from tele_bridge.media_cache import MediaCache
+
+
+def writer(data: bytes, calls: list | None = None, gate: asyncio.Event | None = None):
+    async def download(path: str):
+        if calls is not None:
+            calls.append(path)
+        if gate is not None:
+            await gate.wait()
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    return download
+
+
+def test_hit_after_download(tmp_path):
+    cache = MediaCache(tmp_path)
+    calls = []
+
+    async def main():
+        first = await cache.get_or_download("a", writer(b"payload", calls))
+        second = await cache.get_or_download("a", writer(b"other", calls))
+        return first, second
+
+    assert asyncio.run(main()) == (b"payload", b"payload")
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Индекс восстанавливается с диска
+    assert MediaCache(tmp_path).read("a") == b"payload"
+
+
+def test_single_flight(tmp_path):
+    cache = MediaCache(tmp_path)
+    calls = []
+
+    async def main():
+        gate = asyncio.Event()
+        waiters = [asyncio.create_task(cache.get_or_download("a", writer(b"payload", calls, gate))) for _ in range(5)]
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == [b"payload"] * 5
+    assert len(calls) == 1
+    assert cache.misses == 1
+    assert not cache._inflight
+
+
+def test_eviction_under_size_cap(tmp_path):
+    cache = MediaCache(tmp_path, max_bytes=20)
+
+    async def main():
+        for key in "abc":
+            await cache.get_or_download(key, writer(b"x" * 8))
+        cache.read("b")
+        await cache.get_or_download("d", writer(b"x" * 8))
+
+    asyncio.run(main())
+    assert "a" not in cache and "c" not in cache
+    assert "b" in cache and "d" in cache
+    assert cache.total_bytes == 16
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_result_survives_concurrent_eviction(tmp_path):
+    # Места хватает только на один файл: загрузка "b" вытесняет "a" раньше, чем ожидающий "a" проснётся
+    cache = MediaCache(tmp_path, max_bytes=10)
+
+    async def main():
+        gate = asyncio.Event()
+        first = asyncio.create_task(cache.get_or_download("a", writer(b"a" * 8, gate=gate)))
+        second = asyncio.create_task(cache.get_or_download("b", writer(b"b" * 8, gate=gate)))
+        await asyncio.sleep(0)
+        gate.set()
+        return await first, await second
+
+    assert asyncio.run(main()) == (b"a" * 8, b"b" * 8)
+    assert "a" not in cache
+    assert cache.total_bytes == 8
+
+
+def test_failed_download_leaves_no_part(tmp_path):
+    cache = MediaCache(tmp_path)
+
+    async def broken(path: str):
+        with open(path, "wb") as f:
+            f.write(b"half")
+        raise ConnectionError("lost")
+
+    async def main():
+        try:
+            await cache.get_or_download("a", broken)
+        except ConnectionError:
+            pass
+        return await cache.get_or_download("a", writer(b"full"))
+
+    assert asyncio.run(main()) == b"full"
+    assert [path.name.endswith(".part") for path in tmp_path.iterdir()] == [False]
@@ -0,0 +1,143 @@
+import asyncio
+import datetime
+import os
+
+from aiogram import types as aiogram_types
+from telethon.tl import types
+from telethon.tl.custom.message import Message
+
+from tele_bridge.albums import MAX_ALBUM_SIZE
+from tele_bridge.bases.client_object import MAX_MEDIA_SIZE, ClientObject
+from tele_bridge.tele.client_object import TelethonClientInterface
+from tele_bridge.tele.message import TelethonMessageObject
+
+
+def document_message(message_id: int, size: int, grouped_id: int | None = 77) -> Message:
+    document = types.Document(
+        id=message_id, access_hash=1, file_reference=b"", date=datetime.datetime(2024, 1, 1),
+        mime_type="video/mp4", size=size, dc_id=2,
+        attributes=[types.DocumentAttributeFilename(f"video{message_id}.mp4")],
+    )
+    return Message(
+        id=message_id, peer_id=types.PeerChannel(42), date=datetime.datetime(2024, 1, 1), message="",
+        media=types.MessageMediaDocument(document=document), grouped_id=grouped_id,
+    )
+
+
+class FakeClient:
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.downloaded: list[int] = []
+
+    async def download_media(self, media, file=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.running -= 1
+        self.downloaded.append(media.document.id)
+        data = b"x" * 16
+        if file is bytes:
+            return data
+        with open(file, "wb") as f:
+            f.write(data)
+        return file
+
+
+def make_client_object(messages: list[Message], max_downloads: int = 2) -> tuple[TelethonClientInterface, FakeClient]:
+    client = FakeClient()
+    client_object = TelethonClientInterface(client)
+    client_object.download_semaphore = asyncio.Semaphore(max_downloads)
+
+    async def get_client_media_group(msg):
+        return messages
+
+    client_object.get_client_media_group = get_client_media_group
+    return client_object, client
+
+
+def test_downloads_are_concurrent_and_limited():
+    messages = [document_message(i, 1024) for i in range(1, 7)]
+    client_object, client = make_client_object(messages, max_downloads=3)
+
+    medias = asyncio.run(client_object.get_media_group(TelethonMessageObject(messages[0])))
+    assert client.peak == 3
+    assert len(medias) == 6
+    assert all(isinstance(media, aiogram_types.InputMediaDocument) for media in medias)
+    assert [media.media.filename for media in medias] == [f"video{i}.mp4" for i in range(1, 7)]
+
+
+def test_too_big_items_are_skipped_before_download():
+    messages = [document_message(1, 1024), document_message(2, MAX_MEDIA_SIZE + 1), document_message(3, 1024)]
+    client_object, client = make_client_object(messages)
+
+    medias = asyncio.run(client_object.get_media_group(TelethonMessageObject(messages[0])))
+    assert len(medias) == 2
+    assert sorted(client.downloaded) == [1, 3]
+
+
+def test_spool_to_temp_files(tmp_path):
+    messages = [document_message(1, 1024), document_message(2, 1024)]
+    client_object, _ = make_client_object(messages)
+    client_object.spool_dir = str(tmp_path)
+
+    medias = asyncio.run(client_object.get_media_group(TelethonMessageObject(messages[0]), spool=True))
+    paths = [media.media.path for media in medias]
+    assert all(isinstance(media.media, aiogram_types.FSInputFile) for media in medias)
+    assert all(os.path.dirname(path) == str(tmp_path) and os.path.getsize(path) == 16 for path in paths)
+
+    ClientObject.remove_spooled(medias)
+    assert not any(os.path.exists(path) for path in paths)
+
+
+class HistoryClient:
+    """Отдаёт сообщения канала по id и считает запросы"""
+
+    def __init__(self, messages: list[Message]):
+        self.messages = {message.id: message for message in messages}
+        self.requests: list[list[int]] = []
+
+    async def get_messages(self, chat_id, ids):
+        self.requests.append(ids)
+        return [self.messages.get(post_id) for post_id in ids]
+
+
+def fetch_group(history: list[Message], message_id: int) -> tuple[list[int], HistoryClient]:
+    client = HistoryClient(history)
+    client_object = TelethonClientInterface(client)
+    message = TelethonMessageObject(client.messages[message_id])
+    group = asyncio.run(client_object.get_client_media_group(message))
+    return [post.id for post in group], client
+
+
+def album(ids, grouped_id: int = 77) -> list[Message]:
+    return [document_message(post_id, 1024, grouped_id) for post_id in ids]
+
+
+def test_album_fetched_in_one_request():
+    history = album(range(1, 10), grouped_id=1) + album(range(10, 15)) + album(range(15, 20), grouped_id=2)
+    ids, client = fetch_group(history, 12)
+    assert ids == list(range(10, 15))
+    assert len(client.requests) == 1
+    assert max(map(len, client.requests)) <= 2 * MAX_ALBUM_SIZE
+
+    ids, client = fetch_group(album(range(20, 30)), 20)
+    assert ids == list(range(20, 30))
+    assert len(client.requests) == 1
+
+
+def test_album_at_start_of_chat():
+    ids, client = fetch_group(album(range(1, 4)), 1)
+    assert ids == [1, 2, 3]
+    assert client.requests == [list(range(2, 11))]
+
+
+def test_widens_only_past_foreign_messages():
+    # Между частями альбома оказалось чужое сообщение, крайняя часть на границе окна
+    history = album([*range(10, 15), *range(16, 21)]) + [document_message(15, 1024, grouped_id=None)]
+    ids, client = fetch_group(history, 10)
+    assert ids == [*range(10, 15), *range(16, 21)]
+    assert len(client.requests) == 2
+    assert client.requests[1] == [20]
@@ -0,0 +1,79 @@
+import datetime
+
+from telethon.tl import types
+from telethon.tl.custom.message import Message
+
+from tele_bridge.tele.message import TelethonMessageObject
+
+
+def make_message(chat=None, **kwargs) -> Message:
+    message = Message(
+        id=7,
+        peer_id=types.PeerChat(42),
+        date=datetime.datetime(2024, 1, 1),
+        message="hi",
+        from_id=types.PeerUser(5),
+        **kwargs,
+    )
+    message._chat = chat
+    return message
+
+
+def test_snapshot_basic_group():
+    chat = types.Chat(
+        id=42,
+        title="group",
+        photo=types.ChatPhotoEmpty(),
+        participants_count=2,
+        date=datetime.datetime(2024, 1, 1),
+        version=1,
+    )
+    snapshot = TelethonMessageObject(make_message(chat)).snapshot()
+    assert snapshot["chat_username"] is None
+    assert snapshot["chat_id"] == -42
+    assert snapshot["message_link"] == "https://t.me/c/-42/7"
+
+
+def test_snapshot_unresolved_chat():
+    snapshot = TelethonMessageObject(make_message()).snapshot()
+    assert snapshot["chat_username"] is None
+    assert snapshot["text"] == "hi"
+
+
+def test_channel_username():
+    chat = types.Channel(
+        id=42,
+        title="channel",
+        photo=types.ChatPhotoEmpty(),
+        date=datetime.datetime(2024, 1, 1),
+        username="news",
+    )
+    message = TelethonMessageObject(make_message(chat))
+    assert message.get_message_link() == "https://t.me/news/7"
+
+
+def test_sender_loaded_later():
+    raw = make_message()
+    message = TelethonMessageObject(raw)
+    assert not message.have_from_user()
+
+    raw._sender = types.User(id=5, first_name="Ivan", username="ivan")
+    assert message.have_from_user()
+    assert message.get_first_name() == "Ivan"
+    assert message.get_user_username() == "ivan"
+
+
+def test_chat_loaded_later():
+    raw = make_message()
+    message = TelethonMessageObject(raw)
+    assert message.get_message_link() == "https://t.me/c/-42/7"
+
+    raw._chat = types.Channel(
+        id=42,
+        title="channel",
+        photo=types.ChatPhotoEmpty(),
+        date=datetime.datetime(2024, 1, 1),
+        username="news",
+    )
+    assert message.get_chat_username() == "news"
+    assert message.get_message_link() == "https://t.me/news/7"
@@ -0,0 +1,76 @@
+import asyncio
+import datetime
+import types
+
+from tele_bridge.methods import DialogsCheckpoint, Methods
+
+BASE = datetime.datetime(2024, 1, 1)
+
+
+def dialog(name: str, minutes: int | None, pinned: bool = False):
+    message = types.SimpleNamespace(date=BASE + datetime.timedelta(minutes=minutes)) if minutes is not None else None
+    return types.SimpleNamespace(name=name, message=message, pinned=pinned)
+
+
+class FakeClient:
+    def __init__(self, dialogs: list):
+        self.dialogs = dialogs
+        self.fetched = 0
+
+    async def iter_dialogs(self, limit=None):
+        for item in self.dialogs[:limit]:
+            self.fetched += 1
+            yield item
+
+
+class Account(Methods):
+    def __init__(self, dialogs: list):
+        self.client = FakeClient(dialogs)
+
+
+def changed(account: Account, checkpoint: DialogsCheckpoint | None = None, stop_after: int | None = None) -> list[str]:
+    async def main():
+        names = []
+        async for item in account.iter_changed_dialogs(checkpoint):
+            names.append(item.name)
+            if stop_after is not None and len(names) >= stop_after:
+                break
+        return names
+
+    return asyncio.run(main())
+
+
+def test_first_run_returns_all_and_sets_checkpoint():
+    account = Account([dialog("a", 30), dialog("b", 20), dialog("c", None)])
+    assert changed(account) == ["a", "b", "c"]
+    assert account.dialogs_checkpoint.offset_date == BASE + datetime.timedelta(minutes=30)
+
+
+def test_stops_at_first_unchanged_dialog():
+    checkpoint = DialogsCheckpoint(offset_date=BASE + datetime.timedelta(minutes=20))
+    account = Account([dialog("new", 40), dialog("newer", 25), dialog("old", 20), dialog("older", 10)])
+    assert changed(account, checkpoint) == ["new", "newer"]
+    assert account.client.fetched == 3
+    assert checkpoint.offset_date == BASE + datetime.timedelta(minutes=40)
+
+
+def test_pinned_unchanged_dialogs_are_skipped():
+    checkpoint = DialogsCheckpoint(offset_date=BASE + datetime.timedelta(minutes=20))
+    account = Account([dialog("pinned", 5, pinned=True), dialog("new", 30), dialog("old", 10)])
+    assert changed(account, checkpoint) == ["new"]
+
+
+def test_nothing_changed_keeps_checkpoint():
+    checkpoint = DialogsCheckpoint(offset_date=BASE + datetime.timedelta(minutes=20))
+    account = Account([dialog("old", 20), dialog("older", 10)])
+    assert changed(account, checkpoint) == []
+    assert checkpoint.offset_date == BASE + datetime.timedelta(minutes=20)
+
+
+def test_interrupted_pass_does_not_move_checkpoint():
+    checkpoint = DialogsCheckpoint(offset_date=BASE)
+    account = Account([dialog("a", 30), dialog("b", 20)])
+    assert changed(account, checkpoint, stop_after=1) == ["a"]
+    assert checkpoint.offset_date == BASE
+    assert changed(account, checkpoint) == ["a", "b"]
+    assert checkpoint.offset_date == BASE + datetime.timedelta(minutes=30)
@@ -0,0 +1,106 @@
+import asyncio
+import types
+
+import pytest
+
+from tele_bridge.dispatcher import Dispatcher
+from tele_bridge.observer import LATENCY_BUCKETS, Observable, Observer
+from tele_bridge.tele.client_object import TelethonClientInterface
+from tests.test_albums import FakeMessage
+
+
+class Recorder(Observer):
+    def __init__(self, name: str, log: list, delay: float = 0, error: Exception | None = None):
+        self.name = name
+        self.log = log
+        self.delay = delay
+        self.error = error
+
+    async def trigger(self, message, *args, **kwargs):
+        self.log.append(("start", self.name))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        self.log.append(("end", self.name))
+
+    def __repr__(self):
+        return self.name
+
+
+def test_dispatcher_options():
+    client_object = TelethonClientInterface(None)
+    account = types.SimpleNamespace(id=1)
+    dispatcher = Dispatcher(account, client_object, concurrent=True, observer_timeout=2.5)
+    assert dispatcher.concurrent is True
+    assert dispatcher.observer_timeout == 2.5
+    assert Dispatcher(account, client_object).concurrent is False
+
+
+def test_serial_dispatch_order_and_error():
+    log = []
+    observable = Observable()
+    observable.register(Recorder("low", log), priority=0)
+    observable.register(Recorder("high", log, error=RuntimeError("broken")), priority=10)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(observable.trigger(FakeMessage(1)))
+    # Ошибка наблюдателя с высоким приоритетом прерывает рассылку
+    assert log == [("start", "high")]
+
+
+def test_concurrent_dispatch():
+    log = []
+    observable = Observable(concurrent=True)
+    observable.register(Recorder("first", log, delay=0.02), priority=1)
+    observable.register(Recorder("second", log, delay=0.01, error=RuntimeError("broken")), priority=1)
+    observable.register(Recorder("last", log), priority=0)
+
+    asyncio.run(observable.trigger(FakeMessage(1)))
+    # Наблюдатели одного приоритета работают одновременно, следующая группа ждёт их
+    assert log[:2] == [("start", "first"), ("start", "second")]
+    assert log[2:] == [("end", "first"), ("start", "last"), ("end", "last")]
+    stats = observable.observer_stats()
+    assert [stats[observer].errors for observer in stats] == [0, 1, 0]
+
+
+def test_observer_timeout():
+    log = []
+    observable = Observable(concurrent=True, timeout=0.01)
+    slow = Recorder("slow", log, delay=1)
+    fast = Recorder("fast", log)
+    observable.register(slow)
+    observable.register(fast)
+
+    asyncio.run(observable.trigger(FakeMessage(1)))
+    stats = observable.observer_stats()
+    assert stats[slow].timeouts == 1
+    assert stats[fast].timeouts == 0
+    assert ("end", "fast") in log and ("end", "slow") not in log
+
+
+def test_serial_timeout_raises():
+    observable = Observable()
+    observable.register(Recorder("slow", [], delay=1), timeout=0.01)
+    with pytest.raises(TimeoutError):
+        asyncio.run(observable.trigger(FakeMessage(1)))
+
+
+def test_latency_histogram():
+    observable = Observable()
+    fast = Recorder("fast", [])
+    slow = Recorder("slow", [], delay=0.03)
+    observable.register(fast)
+    observable.register(slow)
+
+    async def main():
+        for _ in range(3):
+            await observable.trigger(FakeMessage(1))
+
+    asyncio.run(main())
+    stats = observable.observer_stats()
+    assert stats[fast].calls == stats[slow].calls == 3
+    assert len(stats[fast].histogram) == len(LATENCY_BUCKETS) + 1
+    assert sum(stats[fast].histogram[:2]) == 3
+    # 0.03s попадает в корзину (0.025, 0.05]
+    assert stats[slow].histogram[LATENCY_BUCKETS.index(0.05)] == 3
+    assert stats[slow].total_time >= 0.09
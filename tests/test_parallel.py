@@ -0,0 +1,78 @@
+import asyncio
+import io
+import random
+import types
+
+import pytest
+from telethon.tl import types as tl_types
+
+from tele_bridge.tele.parallel import ParallelDownloader
+
+PART_SIZE = 4096
+
+
+class FakeSender:
+    def is_connected(self):
+        return True
+
+    async def disconnect(self):
+        pass
+
+
+class FakeClient:
+    def __init__(self, data: bytes, fail_offset: int | None = None):
+        self.data = data
+        self.fail_offset = fail_offset
+        self.session = types.SimpleNamespace(dc_id=2)
+        self.used: set[FakeSender] = set()
+
+    async def _call(self, sender, request):
+        self.used.add(sender)
+        await asyncio.sleep(random.uniform(0, 0.005))
+        if request.offset == self.fail_offset:
+            raise ConnectionError("part failed")
+        return tl_types.upload.File(
+            type=tl_types.storage.FilePartial(),
+            mtime=0,
+            bytes=self.data[request.offset:request.offset + request.limit],
+        )
+
+
+def make_document(size: int) -> tl_types.Document:
+    return tl_types.Document(
+        id=1, access_hash=2, file_reference=b"", date=None, mime_type="application/octet-stream",
+        size=size, dc_id=2, attributes=[],
+    )
+
+
+def make_downloader(client: FakeClient, connections: int = 4) -> ParallelDownloader:
+    downloader = ParallelDownloader(client, connections, part_size=PART_SIZE)
+    downloader._senders[2] = [FakeSender() for _ in range(connections)]
+    return downloader
+
+
+def test_parts_are_yielded_in_order():
+    data = random.Random(0).randbytes(PART_SIZE * 20 + 100)
+    client = FakeClient(data)
+    downloader = make_downloader(client)
+    file = io.BytesIO()
+    asyncio.run(downloader.download(make_document(len(data)), file))
+    assert file.getvalue() == data
+    assert len(client.used) == 4
+
+
+def test_part_error_is_raised():
+    data = bytes(PART_SIZE * 8)
+    downloader = make_downloader(FakeClient(data, fail_offset=PART_SIZE * 5))
+
+    async def main():
+        async for _ in downloader.iter_download(make_document(len(data))):
+            pass
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(main())
+
+
+def test_invalid_part_size():
+    with pytest.raises(ValueError):
+        ParallelDownloader(None, part_size=1000)
@@ -0,0 +1,263 @@
+import asyncio
+import os
+import types
+
+from telethon.sessions import StringSession
+
+from tele_bridge.pool import DispatcherPool, DispatcherState, PoolOpts
+from tele_bridge.sessions.dc_cache import DCAddressCache
+from tele_bridge.sessions.tele_bridge_session import TeleBridgeSession
+
+
+def make_session(port: int, dc_id: int = 2, key: bytes = b"\x01") -> TeleBridgeSession:
+    return TeleBridgeSession(dc_id=dc_id, auth_key=key * 256, ip="127.0.0.1", port=port)
+
+
+class FakeDispatcher:
+    def __init__(self, account_id: int, session: TeleBridgeSession, proxy_url: str | None = None, fail: int = 0):
+        self.account = types.SimpleNamespace(id=account_id)
+        self.client = types.SimpleNamespace(session_bridge=session, proxy_url=proxy_url)
+        self.fail = fail
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def restart(self):
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("restart failed")
+
+
+async def serve() -> tuple[asyncio.Server, int]:
+    server = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_warm_up_is_off_by_default():
+    assert PoolOpts().warm_up is False
+
+
+def test_probe_and_save(tmp_path):
+    path = tmp_path / "dc.json"
+
+    async def main():
+        server, port = await serve()
+        async with server:
+            cache = DCAddressCache(path)
+            latencies = await cache.warm_up({1: make_session(port), 2: make_session(port, key=b"\x02")}, timeout=1)
+        cache.save()
+        return port, latencies
+
+    port, latencies = asyncio.run(main())
+    assert list(latencies) == [("127.0.0.1", port)]
+    loaded = DCAddressCache(path)
+    assert len(loaded) == 2
+    assert loaded.get(1).port == port and loaded.get(1).latency is not None
+
+
+def test_unreachable_address_is_not_recorded():
+    async def main():
+        server, port = await serve()
+        server.close()
+        await server.wait_closed()
+        cache = DCAddressCache()
+        return cache, await cache.warm_up({1: make_session(port)}, timeout=1)
+
+    cache, latencies = asyncio.run(main())
+    assert list(latencies.values()) == [None]
+    assert cache.get(1) is None
+
+
+def test_pool_warm_up_skips_proxied_accounts():
+    async def main():
+        server, port = await serve()
+        async with server:
+            pool = DispatcherPool(PoolOpts(warm_up=True, stagger=0))
+            await pool.add(FakeDispatcher(1, make_session(port)), start=False)
+            await pool.add(FakeDispatcher(2, make_session(port, key=b"\x02"), "socks5://proxy:1080"), start=False)
+            await pool.warm_up()
+        return pool
+
+    pool = asyncio.run(main())
+    assert pool.dc_cache.get(1).latency is not None
+    assert pool.dc_cache.get(2) is None
+
+
+def test_restart_records_endpoint():
+    async def main():
+        pool = DispatcherPool(PoolOpts(restart_backoff=0.01))
+        await pool.add(FakeDispatcher(1, make_session(443), fail=1), start=False)
+        return pool, await pool.restart(1)
+
+    pool, state = asyncio.run(main())
+    assert state == DispatcherState.RUNNING
+    assert (pool.dc_cache.get(1).dc_id, pool.dc_cache.get(1).port) == (2, 443)
+
+
+def test_cache_file_is_optional(tmp_path):
+    cache = DCAddressCache(tmp_path / "missing.json")
+    assert len(cache) == 0
+    cache.record(1, 2, "127.0.0.1", 443)
+    cache.save()
+    assert os.path.exists(tmp_path / "missing.json")
+
+
+class CountingDispatcher(FakeDispatcher):
+    running = 0
+    peak = 0
+
+    def __init__(self, account_id: int, fail_stop: bool = False):
+        super().__init__(account_id, make_session(443, key=bytes([account_id])))
+        self.fail_stop = fail_stop
+
+    async def start(self):
+        cls = type(self)
+        cls.running += 1
+        cls.peak = max(cls.peak, cls.running)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            cls.running -= 1
+
+    async def stop(self):
+        if self.fail_stop:
+            raise RuntimeError("stop failed")
+
+
+def test_max_parallel_bound():
+    class Dispatcher(CountingDispatcher):
+        running = peak = 0
+
+    async def main():
+        pool = DispatcherPool(PoolOpts(max_parallel=3, stagger=0))
+        for account_id in range(1, 11):
+            await pool.add(Dispatcher(account_id), start=False)
+        return await pool.start_all()
+
+    states = asyncio.run(main())
+    assert set(states.values()) == {DispatcherState.RUNNING}
+    assert Dispatcher.peak == 3
+
+
+def test_stagger_does_not_hold_slots(monkeypatch):
+    sleeping = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        if delay and delay >= 0.05:
+            sleeping.append(pool._semaphore._value)
+        await real_sleep(delay)
+
+    monkeypatch.setattr("tele_bridge.pool.random.uniform", lambda low, high: high)
+    monkeypatch.setattr("tele_bridge.pool.asyncio.sleep", sleep)
+    pool = DispatcherPool(PoolOpts(max_parallel=1, stagger=0.05))
+
+    async def main():
+        for account_id in range(1, 4):
+            await pool.add(CountingDispatcher(account_id), start=False)
+        await pool.start_all()
+
+    asyncio.run(main())
+    # Все три ждут задержку одновременно, ни одна не занимает единственный слот
+    assert sleeping == [1, 1, 1]
+
+
+def test_stop_all_and_failed_stop():
+    async def main():
+        pool = DispatcherPool(PoolOpts(stagger=0))
+        await pool.add(CountingDispatcher(1))
+        await pool.add(CountingDispatcher(2, fail_stop=True))
+        return pool, await pool.stop_all()
+
+    pool, states = asyncio.run(main())
+    assert states == {1: DispatcherState.STOPPED, 2: DispatcherState.FAILED}
+    assert isinstance(pool.errors[2], RuntimeError)
+
+
+def test_failed_start_schedules_restart():
+    async def main():
+        pool = DispatcherPool(PoolOpts(stagger=0, restart_backoff=0.01))
+        dispatcher = FakeDispatcher(1, make_session(443))
+
+        async def start():
+            raise ConnectionError("start failed")
+
+        dispatcher.start = start
+        await pool.add(dispatcher)
+        assert pool.get_state(1) == DispatcherState.FAILED
+        assert 1 in pool._restart_tasks
+        await pool._restart_tasks[1]
+        return pool
+
+    pool = asyncio.run(main())
+    assert pool.get_state(1) == DispatcherState.RUNNING
+    assert not pool._restart_tasks
+
+
+class TelethonLikeDispatcher(FakeDispatcher):
+    """Сессия Telethon, restart запоминает адрес, с которым клиент подключался бы"""
+
+    def __init__(self, account_id: int, session: TeleBridgeSession, fail: int = 0):
+        super().__init__(account_id, session, fail=fail)
+        self.client.session = StringSession(session.to_telethon_string())
+        self.connects: list[tuple[str, int]] = []
+
+    async def start(self):
+        await self.restart()
+
+    async def restart(self):
+        self.connects.append((self.client.session.server_address, self.client.session.port))
+        await super().restart()
+
+
+def test_restore_uses_cached_endpoint(tmp_path):
+    path = tmp_path / "dc.json"
+    previous = DCAddressCache(path)
+    previous.record(1, 2, "10.0.0.1", 8443)
+    previous.save()
+
+    async def main():
+        pool = DispatcherPool(PoolOpts(stagger=0), dc_cache=DCAddressCache(path))
+        dispatcher = TelethonLikeDispatcher(1, make_session(443))
+        await pool.add(dispatcher, start=False)
+        await pool.start_all()
+        await pool.restart(1)
+        return dispatcher
+
+    dispatcher = asyncio.run(main())
+    assert dispatcher.connects == [("10.0.0.1", 8443), ("10.0.0.1", 8443)]
+
+
+def test_failed_connect_falls_back_to_session_address():
+    async def main():
+        cache = DCAddressCache()
+        cache.record(1, 2, "10.0.0.1", 8443)
+        pool = DispatcherPool(PoolOpts(restart_backoff=0.01), dc_cache=cache)
+        dispatcher = TelethonLikeDispatcher(1, make_session(443), fail=1)
+        await pool.add(dispatcher, start=False)
+        return pool, dispatcher, await pool.restart(1)
+
+    pool, dispatcher, state = asyncio.run(main())
+    assert state == DispatcherState.RUNNING
+    assert dispatcher.connects == [("10.0.0.1", 8443), ("127.0.0.1", 443)]
+    assert (pool.dc_cache.get(1).ip, pool.dc_cache.get(1).port) == ("127.0.0.1", 443)
+
+
+def test_apply_skips_other_dc_and_pyrogram():
+    cache = DCAddressCache()
+    cache.record(1, 4, "10.0.0.1", 8443)
+    client = TelethonLikeDispatcher(1, make_session(443)).client
+    assert not cache.apply(1, client)
+    assert client.session.server_address == "127.0.0.1"
+
+    cache.record(1, 2, "2001:db8::1", 443)
+    assert not cache.apply(1, client)
+
+    cache.record(1, 2, "10.0.0.1", 8443)
+    assert not cache.apply(1, FakeDispatcher(1, make_session(443)).client)
+    assert cache.apply(1, client)
+    assert (client.session.dc_id, client.session.server_address, client.session.port) == (2, "10.0.0.1", 8443)
+    assert client.session.auth_key.key == make_session(443).auth_key
@@ -0,0 +1,56 @@
+import asyncio
+import queue
+
+from tele_bridge.record import MessageRecord
+from tele_bridge.sharding import _ForwardObserver
+from tele_bridge.tele.message import TelethonMessageObject
+from tests.test_message import make_message
+
+
+class BrokenMessage(TelethonMessageObject):
+    __slots__ = ()
+
+    def get_text(self):
+        raise RuntimeError("broken")
+
+
+def test_record_round_trip():
+    record = MessageRecord.from_message(TelethonMessageObject(make_message()), account_id=3)
+    assert record.chat_id == -42
+    assert record.message_id == 7
+    assert record.account_id == 3
+    assert record.text == "hi"
+    assert record.chat_username is None
+    assert MessageRecord.decode(record.encode()) == record
+
+
+def test_record_unicode_text():
+    record = MessageRecord(chat_id=1, message_id=2, text="привет 👋", has_media=True)
+    assert MessageRecord.decode(record.encode()) == record
+
+
+def test_forward_observer_album():
+    events = queue.Queue()
+    observer = _ForwardObserver(3, events)
+    head = TelethonMessageObject(make_message())
+    asyncio.run(observer.trigger(head, album=[head, TelethonMessageObject(make_message())]))
+
+    encoded_head, parts = events.get_nowait()
+    assert MessageRecord.decode(encoded_head).message_id == 7
+    assert len(parts) == 2
+
+
+def test_forward_observer_does_not_raise():
+    events = queue.Queue()
+    observer = _ForwardObserver(3, events)
+    asyncio.run(observer.trigger(BrokenMessage(make_message())))
+    assert events.empty()
+
+
+def test_forward_observer_queue_full():
+    events = queue.Queue(maxsize=1)
+    observer = _ForwardObserver(3, events)
+    message = TelethonMessageObject(make_message())
+    asyncio.run(observer.trigger(message))
+    asyncio.run(observer.trigger(message))
+    assert events.qsize() == 1
@@ -0,0 +1,117 @@
+import asyncio
+
+from tele_bridge.tele.client_object import TelethonClientInterface
+
+
+class Post:
+    def __init__(self, chat_id: int, message_id: int, reply_to: int | None = None, forward_origin=None):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.reply_to = reply_to
+        self.forward_origin = forward_origin
+
+    def get_chat_id(self):
+        return self.chat_id
+
+    def get_message_id(self):
+        return self.message_id
+
+    def get_reply_to_message_id(self):
+        return self.reply_to
+
+    def get_forward_origin(self):
+        return self.forward_origin
+
+    def __repr__(self):
+        return f"Post({self.chat_id}, {self.message_id})"
+
+
+def make_client_object(posts: list[Post], failing_chats=()) -> tuple[TelethonClientInterface, list]:
+    history = {(post.chat_id, post.message_id): post for post in posts}
+    client_object = TelethonClientInterface(None)
+    requests = []
+
+    async def fetch_messages(chat_id, message_ids):
+        requests.append((chat_id, message_ids))
+        if chat_id in failing_chats:
+            raise ConnectionError("chat unavailable")
+        return [history.get((chat_id, message_id)) for message_id in message_ids]
+
+    client_object._fetch_messages = fetch_messages
+    return client_object, requests
+
+
+def thread() -> list[Post]:
+    return [
+        Post(1, 1), Post(1, 2, reply_to=1), Post(1, 3, reply_to=2), Post(1, 4, reply_to=3),
+        Post(2, 10), Post(2, 11, reply_to=10),
+    ]
+
+
+def ids(chain: list[Post]) -> list[int]:
+    return [post.message_id for post in chain]
+
+
+def test_one_request_per_chat_and_level():
+    posts = thread()
+    client_object, requests = make_client_object(posts)
+    chains = asyncio.run(client_object.get_reply_chains([posts[3], posts[5], posts[1], posts[0]]))
+
+    assert [ids(chain) for chain in chains] == [[3, 2, 1], [10], [1], []]
+    # Третий уровень (2 -> 1) уже найден на первом и берётся из resolved_messages
+    assert requests == [(1, [3, 1]), (2, [10]), (1, [2])]
+
+
+def test_depth_limit():
+    posts = thread()
+    client_object, requests = make_client_object(posts)
+    assert ids(asyncio.run(client_object.get_reply_chain(posts[3], depth=2))) == [3, 2]
+    assert len(requests) == 2
+
+
+def test_resolved_messages_are_reused():
+    posts = thread()
+    client_object, requests = make_client_object(posts)
+
+    async def main():
+        first = await client_object.get_reply_chain(posts[3])
+        second = await client_object.get_reply_chain(posts[3])
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert ids(first) == ids(second) == [3, 2, 1]
+    assert len(requests) == 3
+
+
+def test_deleted_and_failed_replies():
+    posts = [Post(1, 5, reply_to=4), Post(2, 5, reply_to=4)]
+    client_object, requests = make_client_object(posts, failing_chats={2})
+
+    async def main():
+        first = await client_object.get_reply_chains(posts)
+        second = await client_object.get_reply_chains(posts)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == second == [[], []]
+    # Удалённое сообщение кэшируется, ошибка - нет
+    assert requests == [(1, [4]), (2, [4]), (2, [4])]
+
+
+def test_forward_origins():
+    channel_posts = [Post(-100, 50), Post(-100, 51), Post(-200, 7)]
+    client_object, requests = make_client_object(channel_posts)
+    messages = [
+        Post(1, 1, forward_origin=(-100, 50)),
+        Post(1, 2),
+        Post(1, 3, forward_origin=(-100, 51)),
+        Post(1, 4, forward_origin=(-200, 7)),
+        Post(1, 5, forward_origin=(-200, 8)),
+        Post(1, 6, forward_origin=(-100, 50)),
+    ]
+
+    origins = asyncio.run(client_object.get_forward_origins(messages))
+    assert [origin and (origin.chat_id, origin.message_id) for origin in origins] == [
+        (-100, 50), None, (-100, 51), (-200, 7), None, (-100, 50),
+    ]
+    assert sorted(requests) == [(-200, [7, 8]), (-100, [50, 51])]
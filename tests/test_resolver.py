@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from telethon.tl import types
+
+from tele_bridge.tele.resolver import TelethonEntityResolver
+
+
+def make_resolver(fail: BaseException | None = None) -> tuple[TelethonEntityResolver, list]:
+    resolver = TelethonEntityResolver(None, window=0.01)
+    calls = []
+
+    async def get_users(input_users):
+        calls.append(("users", [user.user_id for user in input_users]))
+        if fail is not None:
+            raise fail
+        return [
+            types.UserEmpty(id=user.user_id) if user.user_id == 404 else types.User(id=user.user_id)
+            for user in input_users
+        ]
+
+    async def get_channels(input_channels):
+        calls.append(("channels", [channel.channel_id for channel in input_channels]))
+        return [
+            types.Channel(id=channel.channel_id, title="channel", photo=types.ChatPhotoEmpty(), date=None)
+            for channel in input_channels
+        ]
+
+    resolver._get_users = get_users
+    resolver._get_channels = get_channels
+    return resolver, calls
+
+
+def user(user_id: int) -> types.InputPeerUser:
+    return types.InputPeerUser(user_id, access_hash=1)
+
+
+def test_batching():
+    resolver, calls = make_resolver()
+
+    async def main():
+        return await asyncio.gather(
+            resolver.resolve(user(1)),
+            resolver.resolve(user(2)),
+            resolver.resolve(types.InputPeerChannel(10, access_hash=1)),
+        )
+
+    first, second, channel = asyncio.run(main())
+    assert (first.id, second.id, channel.id) == (1, 2, 10)
+    assert sorted(calls) == [("channels", [10]), ("users", [1, 2])]
+
+
+def test_single_flight_and_cache():
+    resolver, calls = make_resolver()
+
+    async def main():
+        first, second = await asyncio.gather(resolver.resolve(user(1)), resolver.resolve(user(1)))
+        assert first is second
+        return await resolver.resolve(user(1))
+
+    assert asyncio.run(main()).id == 1
+    assert calls == [("users", [1])]
+
+
+def test_user_empty_is_not_cached():
+    resolver, calls = make_resolver()
+
+    async def main():
+        with pytest.raises(ValueError):
+            await resolver.resolve(user(404))
+        with pytest.raises(ValueError):
+            await resolver.resolve(user(404))
+
+    asyncio.run(main())
+    assert len(calls) == 2
+    assert resolver.get_cached(404) is None
+
+
+def test_failed_fetch():
+    resolver, calls = make_resolver(fail=ConnectionError("network"))
+
+    async def main():
+        return await asyncio.gather(resolver.resolve(user(1)), resolver.resolve(user(2)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert not resolver._inflight
+
+
+def test_cancelled_fetch_fails_waiters():
+    resolver, _ = make_resolver(fail=asyncio.CancelledError())
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(resolver.resolve(user(1)), resolver.resolve(user(2)), return_exceptions=True),
+            timeout=1,
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert not resolver._inflight and not resolver._pending
+
+
+def test_cancelled_flush_fails_waiters():
+    resolver, calls = make_resolver()
+    resolver.window = 60
+
+    async def main():
+        waiter = asyncio.ensure_future(resolver.resolve(user(1)))
+        await asyncio.sleep(0)
+        resolver._flush_task.cancel()
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(waiter, timeout=1)
+
+    asyncio.run(main())
+    assert calls == []
+    assert resolver._flush_task is None
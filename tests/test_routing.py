@@ -0,0 +1,118 @@
+import asyncio
+import random
+
+from pyrogram import enums as pyro_enums
+
+from tele_bridge.observer import Observable, Observer
+from tele_bridge.routing import ObserverFilter, RoutingIndex
+
+
+class Message:
+    def __init__(self, chat_id=1, user_id=None, text=None, media_type=None):
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.text = text
+        self.media_type = media_type
+
+    def get_chat_id(self):
+        return self.chat_id
+
+    def get_user_id(self):
+        return self.user_id
+
+    def get_text(self):
+        return self.text
+
+    def has_media(self):
+        return self.media_type is not None
+
+    def get_media_type(self):
+        return self.media_type
+
+
+def make_index() -> RoutingIndex:
+    index = RoutingIndex()
+    index.add("all")
+    index.add("chat", ObserverFilter(chat_ids=[1, 2]))
+    index.add("sender", ObserverFilter(sender_ids=[10]))
+    index.add("keywords", ObserverFilter(keywords=["Sale"]))
+    index.add("chat_photos", ObserverFilter(chat_ids=[1], media_types=[pyro_enums.MessageMediaType.PHOTO]))
+    index.add("chat_keywords", ObserverFilter(chat_ids=[2], keywords=["urgent"]))
+    index.add("media", ObserverFilter(has_media=True))
+    return index
+
+
+def test_match():
+    index = make_index()
+    assert sorted(index.match(Message(chat_id=3))) == ["all"]
+    assert sorted(index.match(Message(chat_id=1))) == ["all", "chat"]
+    assert sorted(index.match(Message(chat_id=3, user_id=10, text="big SALE"))) == ["all", "keywords", "sender"]
+    assert sorted(index.match(Message(chat_id=1, media_type=pyro_enums.MessageMediaType.PHOTO))) == [
+        "all", "chat", "chat_photos", "media",
+    ]
+    assert sorted(index.match(Message(chat_id=1, text="urgent"))) == ["all", "chat"]
+    assert sorted(index.match(Message(chat_id=2, text="URGENT"))) == ["all", "chat", "chat_keywords"]
+
+
+def test_remove_and_replace():
+    index = make_index()
+    index.remove("chat")
+    index.remove("keywords")
+    index.remove("missing")
+    assert sorted(index.match(Message(chat_id=1, text="sale"))) == ["all"]
+    assert 1 in index.by_chat and 2 in index.by_chat
+
+    index.add("sender", ObserverFilter(chat_ids=[5]))
+    assert index.match(Message(chat_id=3, user_id=10)) == ["all"]
+    assert sorted(index.match(Message(chat_id=5))) == ["all", "sender"]
+    assert 10 not in index.by_sender
+    assert len(index) == 5
+
+
+def test_matches_linear_filter_check():
+    rnd = random.Random(0)
+    index = RoutingIndex()
+    filters = {}
+    words = ["alpha", "beta", "gamma", "delta"]
+    for observer in range(500):
+        kind = rnd.randrange(4)
+        if kind == 0:
+            observer_filter = ObserverFilter(chat_ids=rnd.sample(range(20), 2))
+        elif kind == 1:
+            observer_filter = ObserverFilter(sender_ids=rnd.sample(range(20), 2), has_media=rnd.choice([True, None]))
+        elif kind == 2:
+            observer_filter = ObserverFilter(keywords=rnd.sample(words, 1), chat_ids=rnd.choice([None, [1, 2]]))
+        else:
+            observer_filter = None
+        filters[observer] = observer_filter
+        index.add(observer, observer_filter)
+
+    for _ in range(200):
+        message = Message(
+            chat_id=rnd.randrange(20),
+            user_id=rnd.randrange(20),
+            text=" ".join(rnd.sample(words, 2)).upper(),
+            media_type=rnd.choice([None, pyro_enums.MessageMediaType.PHOTO]),
+        )
+        expected = {
+            observer for observer, observer_filter in filters.items()
+            if observer_filter is None or observer_filter.check(message)
+        }
+        assert set(index.match(message)) == expected
+
+
+def test_observable_dispatch_uses_filters():
+    calls = []
+
+    class Named(Observer):
+        def __init__(self, name):
+            self.name = name
+
+        async def trigger(self, message, *args, **kwargs):
+            calls.append(self.name)
+
+    observable = Observable()
+    observable.register(Named("chat"), observer_filter=ObserverFilter(chat_ids=[1]))
+    observable.register(Named("other"), observer_filter=ObserverFilter(chat_ids=[2]))
+    asyncio.run(observable.dispatch(Message(chat_id=1)))
+    assert calls == ["chat"]
@@ -0,0 +1,66 @@
+import ipaddress
+import random
+
+import pytest
+from telethon.crypto import AuthKey
+from telethon.sessions import StringSession
+
+from tele_bridge.sessions.converter import decode_telethon_string, encode_telethon_string
+from tele_bridge.sessions.tele_bridge_session import TeleBridgeSession
+
+
+def random_sessions(count: int, ipv6: bool, seed: int) -> list[TeleBridgeSession]:
+    rnd = random.Random(seed)
+    sessions = []
+    for _ in range(count):
+        if ipv6:
+            ip = ipaddress.IPv6Address(rnd.getrandbits(128)).compressed
+        else:
+            ip = ipaddress.IPv4Address(rnd.getrandbits(32)).compressed
+        sessions.append(TeleBridgeSession(
+            dc_id=rnd.randint(1, 5),
+            auth_key=rnd.randbytes(256),
+            ip=ip,
+            port=rnd.randint(1, 65535),
+        ))
+    return sessions
+
+
+def telethon_save(session: TeleBridgeSession) -> str:
+    string_session = StringSession()
+    string_session.set_dc(session.dc_id, session.ip, session.port)
+    string_session.auth_key = AuthKey(session.auth_key)
+    return string_session.save()
+
+
+@pytest.mark.parametrize("ipv6", [False, True], ids=["ipv4", "ipv6"])
+def test_matches_string_session(ipv6):
+    for session in random_sessions(2000, ipv6, seed=int(ipv6)):
+        session_string = encode_telethon_string(session)
+        assert session_string == telethon_save(session)
+
+        loaded = StringSession(session_string)
+        assert (loaded.dc_id, loaded.server_address, loaded.port) == (session.dc_id, session.ip, session.port)
+        assert loaded.auth_key.key == session.auth_key
+
+        assert decode_telethon_string(session_string) == session
+
+
+def test_session_methods_use_native_codec():
+    session, = random_sessions(1, ipv6=False, seed=2)
+    session_string = session.to_telethon_string()
+    assert session_string == telethon_save(session)
+    assert TeleBridgeSession.from_telethon_string(session_string) == session
+
+
+@pytest.mark.parametrize("session_string", [
+    "",
+    "2" + "A" * 352,
+    "1" + "A" * 100,
+    "1" + "!" * 352,
+    "1" + "A" * 352,
+    encode_telethon_string(TeleBridgeSession(dc_id=2, auth_key=bytes(256), ip="127.0.0.1", port=443)),
+], ids=["empty", "version", "length", "base64", "padding", "no-auth-key"])
+def test_invalid_strings(session_string):
+    with pytest.raises(ValueError):
+        decode_telethon_string(session_string)
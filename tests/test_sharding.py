@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import types
+
+import pytest
+
+from tele_bridge.pool import DispatcherPool, PoolOpts
+from tele_bridge.sessions.index import DuplicateSessionError
+from tele_bridge.sharding import ShardedRunner, ShardOpts, _run_shard
+from tests.test_pool import FakeDispatcher, make_session
+
+
+def make_account(account_id: int, key: bytes) -> types.SimpleNamespace:
+    session_string = make_session(443, key=key).to_telethon_string()
+    return types.SimpleNamespace(id=account_id, phone_number="", session_string=session_string)
+
+
+class ShardDispatcher(FakeDispatcher):
+    started: list[int] = []
+
+    def __init__(self, account):
+        super().__init__(account.id, make_session(443, key=account.key))
+        self.observers = []
+
+    def register(self, observer):
+        self.observers.append(observer)
+
+    async def start(self):
+        self.started.append(self.account.id)
+
+
+def test_pool_refuses_duplicate_auth_key():
+    async def main():
+        pool = DispatcherPool(PoolOpts(stagger=0))
+        await pool.add(FakeDispatcher(1, make_session(443)), start=False)
+        with pytest.raises(DuplicateSessionError) as error:
+            await pool.add(FakeDispatcher(2, make_session(443)), start=False)
+        # Тот же аккаунт с тем же ключом заменяется без ошибки
+        await pool.add(FakeDispatcher(1, make_session(443)), start=False)
+        return pool, error.value
+
+    pool, error = asyncio.run(main())
+    assert (error.account_id, error.duplicate_of) == (2, 1)
+    assert list(pool) == [1]
+
+
+def test_runner_drops_duplicates_across_shards():
+    accounts = [make_account(1, b"\x01"), make_account(2, b"\x01"), make_account(3, b"\x02"), make_account(4, b"\x03")]
+    accounts.append(types.SimpleNamespace(id=5, phone_number="", session_string="broken"))
+    runner = ShardedRunner(lambda account: None, accounts, on_message=None, opts=ShardOpts(workers=2))
+
+    assert runner.duplicates == {2: 1}
+    assert {shard: [account.id for account in shard_accounts] for shard, shard_accounts in runner.shards.items()} == {
+        0: [4], 1: [1, 3, 5],
+    }
+
+
+def test_shard_survives_duplicate():
+    accounts = [
+        types.SimpleNamespace(id=1, key=b"\x01"),
+        types.SimpleNamespace(id=2, key=b"\x01"),
+        types.SimpleNamespace(id=3, key=b"\x02"),
+    ]
+    stop_event = threading.Event()
+    stop_event.set()
+    ShardDispatcher.started = []
+
+    asyncio.run(_run_shard(0, accounts, ShardDispatcher, None, stop_event, PoolOpts(stagger=0)))
+    assert ShardDispatcher.started == [1, 3]
@@ -0,0 +1,89 @@
+import asyncio
+import types
+
+from tele_bridge.bases.try_get import GET_CHAT_ERRORS_BLOCKED_DISPATCHERS
+from tele_bridge.pyro.try_get import PyrogramChatGetterTry
+
+
+class FakeStorage:
+    def __init__(self, peers: dict[int, str], broken: bool = False):
+        self.peers = peers
+        self.broken = broken
+
+    async def get_peer_by_id(self, peer_id: int):
+        if self.broken:
+            raise RuntimeError("storage is broken")
+        return self.peers[peer_id]
+
+
+class FakeClient:
+    def __init__(self, storage: FakeStorage, resolve_fails: bool = False):
+        self.storage = storage
+        self.resolve_fails = resolve_fails
+        self.resolved: list[int] = []
+
+    async def resolve_peer(self, peer_id: int):
+        self.resolved.append(peer_id)
+        if self.resolve_fails:
+            raise ConnectionError("network")
+        return f"resolved:{peer_id}"
+
+
+def make_message(client: FakeClient, chat_id: int = -100, user_id: int | None = 5):
+    m = types.SimpleNamespace(
+        _client=client,
+        chat=types.SimpleNamespace(id=chat_id),
+        from_user=types.SimpleNamespace(id=user_id) if user_id else None,
+        sender_chat=None,
+    )
+    return types.SimpleNamespace(m=m)
+
+
+def test_storage_hit_skips_network():
+    client = FakeClient(FakeStorage({-100: "stored"}))
+    getter = PyrogramChatGetterTry("chat", account_id=1)
+    assert asyncio.run(getter.try_get_chat(make_message(client))) == "stored"
+    assert client.resolved == []
+
+
+def test_storage_miss_resolves_peer():
+    client = FakeClient(FakeStorage({}))
+    getter = PyrogramChatGetterTry("sender", account_id=2)
+    assert asyncio.run(getter.try_get_chat(make_message(client))) == "resolved:5"
+    assert client.resolved == [5]
+    assert not getter.get_chat_errors
+
+
+def test_no_sender():
+    client = FakeClient(FakeStorage({}))
+    getter = PyrogramChatGetterTry("sender", account_id=3)
+    assert asyncio.run(getter.try_get_chat(make_message(client, user_id=None))) is None
+    assert client.resolved == []
+
+
+def test_errors_are_cached():
+    client = FakeClient(FakeStorage({}, broken=True), resolve_fails=True)
+    getter = PyrogramChatGetterTry("chat", account_id=4)
+    message = make_message(client)
+    asyncio.run(getter.try_get_chat(message))
+    asyncio.run(getter.try_get_chat(message))
+    assert client.resolved == [-100]
+    assert getter.global_error_count == 2
+
+
+def test_self_block_after_many_errors():
+    client = FakeClient(FakeStorage({}, broken=True), resolve_fails=True)
+    getter = PyrogramChatGetterTry("chat", account_id=5)
+
+    async def main():
+        for chat_id in range(-1, -27, -1):
+            await getter.try_get_chat(make_message(client, chat_id=chat_id))
+
+    try:
+        asyncio.run(main())
+        assert getter.is_blocked()
+        resolved = len(client.resolved)
+        asyncio.run(getter.try_get_chat(make_message(client, chat_id=-500)))
+        assert len(client.resolved) == resolved
+    finally:
+        GET_CHAT_ERRORS_BLOCKED_DISPATCHERS.pop(5, None)
@@ -0,0 +1,96 @@
+import os
+import sqlite3
+
+import pytest
+
+from tele_bridge.sessions.tele_bridge_session import TeleBridgeSession
+from tele_bridge.sessions.vault import SessionVault, SessionVaultError
+
+KEY = bytes(range(32))
+
+
+def make_session(seed: int, ip: str = "149.154.167.51", user_id: int = 100) -> TeleBridgeSession:
+    return TeleBridgeSession(
+        dc_id=seed % 5 + 1,
+        auth_key=bytes((seed + i) % 256 for i in range(256)),
+        ip=ip,
+        port=443,
+        is_bot=bool(seed % 2),
+        test_mode=False,
+        api_id=seed,
+        user_id=user_id,
+    )
+
+
+def test_round_trip(tmp_path):
+    sessions = {
+        1: make_session(1),
+        2: make_session(2, ip="2001:67c:4e8:f002::a", user_id=200),
+    }
+    with SessionVault(tmp_path / "vault.db", KEY) as vault:
+        vault.save_many(sessions.items())
+        assert len(vault) == 2
+        assert 1 in vault and 3 not in vault
+        assert vault.get(3) is None
+
+    with SessionVault(tmp_path / "vault.db", KEY) as vault:
+        assert vault.load_many() == sessions
+        assert vault.get(2) == sessions[2]
+
+
+def test_auth_key_is_encrypted(tmp_path):
+    session = make_session(1)
+    with SessionVault(tmp_path / "vault.db", KEY) as vault:
+        vault.save(1, session)
+        data, = vault.db.execute("SELECT data FROM sessions").fetchone()
+    assert session.auth_key not in data
+    assert session.auth_key[:32] not in data
+
+
+def test_bulk_load_and_user_index(tmp_path):
+    sessions = [(account_id, make_session(account_id, user_id=account_id % 3)) for account_id in range(1200)]
+    with SessionVault(tmp_path / "vault.db", KEY) as vault:
+        vault.save_many(sessions)
+        loaded = vault.load_many(range(0, 1200, 2))
+        assert len(loaded) == 600
+        assert loaded[10] == sessions[10][1]
+        assert set(vault.get_by_user_id(1)) == {account_id for account_id, _ in sessions if account_id % 3 == 1}
+        vault.delete(10)
+        assert vault.get(10) is None
+
+
+def test_wrong_key(tmp_path):
+    with SessionVault(tmp_path / "vault.db", KEY) as vault:
+        vault.save(1, make_session(1))
+    with SessionVault(tmp_path / "vault.db", os.urandom(32)) as vault:
+        with pytest.raises(SessionVaultError):
+            vault.get(1)
+
+
+def test_blob_bound_to_account(tmp_path):
+    with SessionVault(tmp_path / "vault.db", KEY) as vault:
+        vault.save(1, make_session(1))
+        vault.save(2, make_session(2))
+        with vault.db:
+            vault.db.execute("UPDATE sessions SET data = (SELECT data FROM sessions WHERE account_id = 1) WHERE account_id = 2")
+        with pytest.raises(SessionVaultError):
+            vault.get(2)
+
+
+def test_tampered_blob(tmp_path):
+    with SessionVault(tmp_path / "vault.db", KEY) as vault:
+        vault.save(1, make_session(1))
+        data = bytearray(vault.db.execute("SELECT data FROM sessions").fetchone()[0])
+        data[40] ^= 1
+        with vault.db:
+            vault.db.execute("UPDATE sessions SET data = ?", (sqlite3.Binary(data),))
+        with pytest.raises(SessionVaultError):
+            vault.get(1)
+
+
+def test_invalid_input(tmp_path):
+    with pytest.raises(ValueError):
+        SessionVault(tmp_path / "vault.db", b"short")
+    with SessionVault(tmp_path / "vault.db", KEY) as vault:
+        with pytest.raises(ValueError):
+            vault.save(1, TeleBridgeSession(dc_id=2, auth_key=b"\x00" * 10, ip="127.0.0.1", port=443))